@@ -1,87 +1,483 @@
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
-from app.utils.parse_pokemon_data import parse_pokemon_data
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, List, AsyncGenerator, AsyncIterable, Awaitable, Callable
+from app.utils.parse_pokemon_data import parse_pokemon_data, pokemon_version
+from app.utils.http_cache import cache_headers, etag_matches, make_etag
 from app.utils.prompts import strategy_prompt, team_creation_prompt
-from app.config.llm import llm
+from app.config.llm import GeminiLLM, ClientDisconnectedError, get_llm
+from app.utils.llm_cache import llm_response_cache
 from app.utils.generate_descriptions import generate_descriptions
-from app.config.logging import setup_logger
-from app.config.metrics import REQUEST_COUTNER
-import json
-from fastapi import Body
+from app.utils.prompt_builder import build_prompt
+from app.config.logging import setup_request_logger
+from app.config.env import settings
+from app.config.metrics import LLM_TOKENS, PROMPT_TOKENS_SAVED, STAGE_LATENCY
+from app.service.retrieval import DescriptionRetriever, get_description_retriever, estimate_tokens
+from app.service.search import PokedexSearchIndex, SearchQueryError, get_search_index
+from app.service.names import PokemonNameIndex, get_name_index
+from app.service.counters import CounterEngine, CounterQueryError, get_counter_engine
+from app.service.team import TeamOptimizer, TeamQueryError, get_team_optimizer
+from app.service.resilience import CircuitOpenError
+from fastapi import Body, Query
+import aiohttp
+import asyncio
+import math
+import time
 
 # Create routers
 pokemon_router = APIRouter()
 health_router = APIRouter()
 
 # Setup logger
-logger = setup_logger("api_endpoints")
+logger = setup_request_logger("api_endpoints")
 
-with open("all_pokemon_descriptions.json", "r") as f:
-    pokemon_descriptions = json.load(f)
+
+def build_context_prompt(
+    template: str,
+    retriever: DescriptionRetriever,
+    user_query: str,
+    response: Response,
+    path: str,
+    records: list | None = None
+) -> dict:
+    """Fill a prompt with the records relevant to the query (unless already chosen) and report its token usage."""
+    if records is None:
+        records = retriever.select_records(user_query)
+    built = build_prompt(template, user_query, records)
+
+    tokens_saved = max(0, retriever.full_context_tokens - built["context_tokens"])
+    PROMPT_TOKENS_SAVED.labels(path=path).inc(tokens_saved)
+    response.headers["X-Context-Pokemon"] = str(built["pokemon"])
+    response.headers["X-Context-Tokens"] = str(built["context_tokens"])
+    response.headers["X-Context-Tokens-Saved"] = str(tokens_saved)
+    response.headers["X-Prompt-Tokens"] = str(built["prompt_tokens"])
+    if built["dropped"]:
+        response.headers["X-Context-Dropped"] = str(built["dropped"])
+    logger.info(
+        f"Built prompt with {built['pokemon']} Pokemon (~{built['prompt_tokens']} tokens, "
+        f"{built['dropped']} dropped for the budget, ~{tokens_saved} saved)"
+    )
+    return built
+
+
+def counter_records(engine: CounterEngine, counters: dict) -> list:
+    """Records of a counter ranking's target and candidates, in rank order."""
+    names = [counters["target"]["pokemon_name"], *(c["pokemon_name"] for c in counters["counters"])]
+    return [engine.store.get(name) for name in names if name is not None]
+
+
+def team_records(optimizer: TeamOptimizer, teams: list[dict]) -> list:
+    """Records of every member of the candidate teams, each Pokemon once, best team first."""
+    names = dict.fromkeys(member["pokemon_name"] for team in teams for member in team["members"])
+    return [optimizer.store.get(name) for name in names]
+
+
+def format_sse(data: str, event: str | None = None) -> str:
+    """Encode one server-sent event, splitting multi-line data across data: fields."""
+    lines = [f"event: {event}"] if event else []
+    lines.extend(f"data: {line}" for line in data.split("\n"))
+    return "\n".join(lines) + "\n\n"
+
+
+def stream_llm_response(
+    chunks: AsyncIterable[str],
+    response: Response,
+    label: str,
+    on_complete: Callable[[str], Awaitable[None]] | None = None
+) -> StreamingResponse:
+    """Stream an LLM answer to the client as server-sent events."""
+    async def events() -> AsyncGenerator[str, None]:
+        try:
+            parts = []
+            async for chunk in chunks:
+                parts.append(chunk)
+                yield format_sse(chunk)
+            logger.info(f"Successfully streamed {label}")
+            if on_complete is not None:
+                await on_complete("".join(parts))
+            yield format_sse("[DONE]", event="done")
+        except asyncio.TimeoutError:
+            logger.error(f"Timed out streaming {label}")
+            yield format_sse(f"{label.capitalize()} generation timed out", event="error")
+        except Exception as e:
+            logger.error(f"Error streaming {label}: {str(e)}", exc_info=True)
+            yield format_sse(str(e), event="error")
+
+    headers = {key: value for key, value in response.headers.items() if key.startswith("x-")}
+    headers["Cache-Control"] = "no-cache"
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
+
+async def single_chunk(text: str) -> AsyncGenerator[str, None]:
+    yield text
+
+
+async def cached_llm_answer(template: str, user_query: str, response: Response, label: str, context: str = "") -> str | None:
+    """Return a cached answer for this query, marking the response as a hit or miss."""
+    cached = await llm_response_cache.get(template, user_query, context)
+    if cached is None:
+        response.headers["X-LLM-Cache"] = "miss"
+        return None
+    answer, layer = cached
+    response.headers["X-LLM-Cache"] = layer
+    logger.info(f"Serving {label} from the {layer} LLM response cache")
+    return answer
+
+
+async def record_llm_answer(template: str, user_query: str, prompt: str, answer: str | None, label: str, context: str = "") -> None:
+    """Count the answer's tokens and cache it for later similar queries."""
+    LLM_TOKENS.labels(endpoint=label, direction="response").inc(estimate_tokens(answer or ""))
+    await llm_response_cache.set(template, user_query, prompt, answer, context)
+
+
+def lookup_http_error(e: Exception) -> HTTPException:
+    """HTTP error for a failed Pokemon lookup: upstream outages are 5xx, everything else is "not found"."""
+    if isinstance(e, CircuitOpenError):
+        return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))})
+    if isinstance(e, asyncio.TimeoutError):
+        return HTTPException(status_code=504, detail="Timed out waiting for PokeAPI")
+    if isinstance(e, aiohttp.ClientError):
+        return HTTPException(status_code=502, detail=f"PokeAPI request failed: {str(e)}")
+    return HTTPException(status_code=404, detail=str(e))
+
+
+async def pokemon_etag(*pokemon_names: str) -> str | None:
+    """ETag of a lookup response for these Pokemon, or None if one of them has to be loaded first."""
+    versions = [await pokemon_version(name) for name in pokemon_names]
+    if None in versions:
+        return None
+    return make_etag(*versions)
+
+
+def not_modified(request: Request, response: Response, etag: str | None) -> Response | None:
+    """A 304 if the client already has the response tagged ``etag``; checked before any parsing or generation."""
+    if etag is None or not etag_matches(request.headers.get("if-none-match"), etag):
+        return None
+    return Response(status_code=304, headers={**response.headers, **cache_headers(etag)})
+
+
+def describe_pokemon(pokemon_data: dict) -> str:
+    with STAGE_LATENCY.labels(stage="generate_descriptions").time():
+        return generate_descriptions(pokemon_data)
+
+
+async def lookup_pokemon(pokemon_name: str) -> Dict[str, Any]:
+    """Look up a single Pokemon, reporting a failure for this name instead of raising."""
+    try:
+        pokemon_data = await parse_pokemon_data(pokemon_name)
+        return {"name": pokemon_name, "description": describe_pokemon(pokemon_data), "data": dict(pokemon_data), "error": None}
+    except Exception as e:
+        logger.error(f"Error processing Pokemon {pokemon_name}: {str(e)}")
+        return {"name": pokemon_name, "description": None, "data": None, "error": str(e)}
 
 # Pokemon endpoints
+@pokemon_router.get("/search")
+async def search_pokemon(
+    response: Response,
+    q: str | None = Query(None, description="Free text; words naming a type, role, ability or move become filters"),
+    types: List[str] = Query([], alias="type", description="Type filter, repeat to AND, 'fire|water' to OR"),
+    abilities: List[str] = Query([], alias="ability"),
+    moves: List[str] = Query([], alias="move"),
+    roles: List[str] = Query([], alias="role"),
+    stats: List[str] = Query([], alias="stat", description="Range predicate such as 'speed>=100'"),
+    sort: str = Query("pokemon_id", description="Stat to sort by, '-' prefix for descending"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(settings.SEARCH_DEFAULT_LIMIT, ge=1, le=settings.SEARCH_MAX_LIMIT),
+    index: PokedexSearchIndex = Depends(get_search_index)
+) -> Dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        result = index.search(
+            terms={"type": types, "ability": abilities, "move": moves, "role": roles},
+            predicates=stats,
+            query=q,
+            sort=sort,
+            offset=offset,
+            limit=limit
+        )
+    except SearchQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    elapsed = time.perf_counter() - start
+    elapsed_ms = elapsed * 1000
+    STAGE_LATENCY.labels(stage="search").observe(elapsed)
+    response.headers["Server-Timing"] = f"search;dur={elapsed_ms:.3f}"
+    logger.info(f"Search matched {result['total']} Pokemon in {elapsed_ms:.3f}ms")
+
+    return {
+        "total": result["total"],
+        "offset": offset,
+        "limit": limit,
+        "filters": result["filters"],
+        "ignored_terms": result["ignored_terms"],
+        "results": [index.summary(position) for position in result["positions"]],
+    }
+
+@pokemon_router.get("/autocomplete")
+async def autocomplete_pokemon(
+    q: str = Query(..., min_length=1, max_length=50),
+    limit: int = Query(settings.AUTOCOMPLETE_DEFAULT_LIMIT, ge=1, le=settings.AUTOCOMPLETE_MAX_LIMIT),
+    names: PokemonNameIndex = Depends(get_name_index)
+) -> Dict[str, Any]:
+    completions = names.complete(q, limit)
+    # Fall back to typo correction when nothing starts with the input
+    suggestions = [] if completions else [name for _, name in names.suggest(q, min(limit, settings.NAME_SUGGESTION_LIMIT))]
+    return {"query": q, "completions": completions, "suggestions": suggestions}
+
+@pokemon_router.get("/counters")
+async def get_counters(
+    pokemon: str | None = Query(None, description="Pokemon to counter; its types are used"),
+    types: List[str] = Query([], alias="type", description="Type combination to counter when no Pokemon is given"),
+    limit: int = Query(settings.COUNTERS_DEFAULT_LIMIT, ge=1, le=settings.COUNTERS_MAX_LIMIT),
+    include_forms: bool = Query(False, description="Also rank megas, regional and other alternate forms"),
+    engine: CounterEngine = Depends(get_counter_engine),
+    names: PokemonNameIndex = Depends(get_name_index)
+) -> Dict[str, Any]:
+    if pokemon is not None:
+        resolved_name, suggestions = names.resolve(pokemon, settings.NAME_SUGGESTION_LIMIT)
+        if resolved_name is None or resolved_name not in engine.store:
+            raise HTTPException(
+                status_code=404,
+                detail={"message": f"Pokemon {pokemon} not found", "suggestions": suggestions}
+            )
+        pokemon = resolved_name
+    try:
+        return engine.rank(pokemon, types, limit, include_forms)
+    except CounterQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@pokemon_router.get("/team-optimizer")
+async def optimize_team(
+    response: Response,
+    types: List[str] = Query([], alias="type", description="Types the team must include, repeat for several"),
+    roles: List[str] = Query([], alias="role", description="Roles the team must include, e.g. 'sweeper'"),
+    include: List[str] = Query([], description="Pokemon that must be on the team"),
+    exclude: List[str] = Query([], description="Banned Pokemon"),
+    min_speed: int = Query(0, ge=0, description="Minimum base speed of every added member"),
+    include_forms: bool = Query(False, description="Also consider megas, regional and other alternate forms"),
+    limit: int = Query(settings.TEAM_CANDIDATES, ge=1, le=settings.TEAM_BEAM_WIDTH),
+    optimizer: TeamOptimizer = Depends(get_team_optimizer)
+) -> Dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        teams = optimizer.optimize(types, roles, include, exclude, min_speed, include_forms, limit)
+    except TeamQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    elapsed = time.perf_counter() - start
+    STAGE_LATENCY.labels(stage="team_optimize").observe(elapsed)
+    response.headers["Server-Timing"] = f"team;dur={elapsed * 1000:.3f}"
+    logger.info(f"Optimized {len(teams)} teams in {elapsed * 1000:.3f}ms")
+    return {"teams": teams}
+
 @pokemon_router.get("/{pokemon_name}")
 async def get_pokemon(
-    pokemon_name: str
+    pokemon_name: str,
+    request: Request,
+    response: Response,
+    names: PokemonNameIndex = Depends(get_name_index)
 ) -> str:
-    REQUEST_COUTNER.labels(method="GET", path="/pokemon/{pokemon_name}", status="200").inc()
     logger.info(f"GET request for Pokemon: {pokemon_name}")
+    pokemon_name = pokemon_name.lower()
+    resolved_name, suggestions = names.resolve(pokemon_name, settings.NAME_SUGGESTION_LIMIT)
+    if suggestions:
+        logger.info(f"Ambiguous Pokemon name {pokemon_name}, suggesting {suggestions}")
+        raise HTTPException(
+            status_code=404,
+            detail={"message": f"Pokemon {pokemon_name} not found", "suggestions": suggestions}
+        )
+    if resolved_name is not None and resolved_name != pokemon_name:
+        logger.info(f"Resolved Pokemon name {pokemon_name} to {resolved_name}")
+        response.headers["X-Resolved-Pokemon"] = resolved_name
+        pokemon_name = resolved_name
+
+    etag = await pokemon_etag(pokemon_name)
+    cached = not_modified(request, response, etag)
+    if cached is not None:
+        logger.info(f"Pokemon {pokemon_name} not modified")
+        return cached
+
     try:
-        pokemon_name = pokemon_name.lower()
         pokemon_data = await parse_pokemon_data(pokemon_name)
-        pokemon_description = generate_descriptions(pokemon_data)
+        pokemon_description = describe_pokemon(pokemon_data)
         logger.info(f"Successfully generated description for Pokemon: {pokemon_name}")
+        # Names fetched from PokeAPI only get a version once loaded
+        etag = etag or await pokemon_etag(pokemon_name)
+        if etag is not None:
+            response.headers.update(cache_headers(etag))
         return pokemon_description
     
     except Exception as e:
         logger.error(f"Error processing request for Pokemon {pokemon_name}: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=404, detail=str(e))
+        raise lookup_http_error(e)
 
 @pokemon_router.get("/compare/{pokemon1}/{pokemon2}")
 async def compare_pokemon(
     pokemon1: str,
-    pokemon2: str
+    pokemon2: str,
+    request: Request,
+    response: Response
 ) -> str:
-    REQUEST_COUTNER.labels(method="GET", path="/pokemon/compare/{pokemon1}/{pokemon2}", status="200").inc()
     logger.info(f"Compare request received for Pokemon: {pokemon1} and {pokemon2}")
+    etag = await pokemon_etag(pokemon1, pokemon2)
+    cached = not_modified(request, response, etag)
+    if cached is not None:
+        logger.info(f"Comparison of {pokemon1} and {pokemon2} not modified")
+        return cached
+
     try:
-        p1_data = await parse_pokemon_data(pokemon1)
-        p2_data = await parse_pokemon_data(pokemon2)
-        p1_description = generate_descriptions(p1_data)
-        p2_description = generate_descriptions(p2_data)
+        p1_data, p2_data = await asyncio.gather(
+            parse_pokemon_data(pokemon1),
+            parse_pokemon_data(pokemon2)
+        )
+        p1_description = describe_pokemon(p1_data)
+        p2_description = describe_pokemon(p2_data)
         comparison_string = f"{p1_description}\n\n{p2_description}"
         logger.info(f"Successfully generated comparison for Pokemon: {pokemon1} and {pokemon2}")
+        etag = etag or await pokemon_etag(pokemon1, pokemon2)
+        if etag is not None:
+            response.headers.update(cache_headers(etag))
         return comparison_string
     except Exception as e:
         logger.error(f"Error comparing Pokemon {pokemon1} and {pokemon2}: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=404, detail=str(e))
+        raise lookup_http_error(e)
+
+@pokemon_router.post("/compare")
+async def compare_many_pokemon(
+    pokemon_names: List[str] = Body(..., min_length=1, max_length=settings.COMPARE_MAX_POKEMON)
+) -> Dict[str, Any]:
+    logger.info(f"Compare request received for {len(pokemon_names)} Pokemon: {pokemon_names}")
+    lookups = await asyncio.gather(*(lookup_pokemon(name.lower()) for name in pokemon_names))
+    results = [{key: value for key, value in r.items() if key != "data"} for r in lookups]
+    comparison_string = "\n\n".join(r["description"] for r in results if r["description"] is not None)
+    logger.info(f"Compared {sum(r['error'] is None for r in results)}/{len(results)} Pokemon")
+    return {"results": results, "comparison": comparison_string}
+
+@pokemon_router.post("/batch")
+async def get_pokemon_batch(
+    pokemon_names: List[str | int] = Body(..., min_length=1, max_length=settings.BATCH_MAX_POKEMON)
+) -> Dict[str, Any]:
+    queries = [str(name).strip().lower() for name in pokemon_names]
+    unique_queries = list(dict.fromkeys(queries))
+    logger.info(f"Batch request received for {len(queries)} Pokemon ({len(unique_queries)} unique)")
+
+    lookups = await asyncio.gather(*(lookup_pokemon(query) for query in unique_queries))
+    by_query = dict(zip(unique_queries, lookups))
+    results = [
+        {"query": query, "description": by_query[query]["description"], "data": by_query[query]["data"], "error": by_query[query]["error"]}
+        for query in queries
+    ]
+    logger.info(f"Resolved {sum(r['error'] is None for r in lookups)}/{len(lookups)} unique Pokemon in batch")
+    return {"results": results}
 
 @pokemon_router.post("/strategy")
 async def get_strategy(
-    user_query: str = Body(...)
+    request: Request,
+    response: Response,
+    user_query: str = Body(...),
+    stream: bool = Query(False, description="Stream the answer as server-sent events"),
+    local: bool = Query(False, description="Answer counter questions from the type chart without calling the LLM"),
+    llm: GeminiLLM = Depends(get_llm),
+    retriever: DescriptionRetriever = Depends(get_description_retriever),
+    engine: CounterEngine = Depends(get_counter_engine)
 ) ->  str | None:
-    REQUEST_COUTNER.labels(method="POST", path="/pokemon/strategy", status="200").inc()
     logger.info(f"Strategy request received with query: {user_query}")
     try:
-        strategy_prompt_template = strategy_prompt.format(user_query=user_query, pokemon_description=pokemon_descriptions)
-        response = llm.generate_content(strategy_prompt_template)
+        with STAGE_LATENCY.labels(stage="counter_rank").time():
+            target_pokemon, target_types = engine.find_target(user_query)
+            counters = None
+            if target_pokemon is not None or target_types:
+                # The target itself takes one context slot
+                counters = engine.rank(target_pokemon, target_types, limit=settings.RETRIEVAL_TOP_K - 1)
+                response.headers["X-Counter-Target"] = target_pokemon or "/".join(target_types)
+        if local and counters is not None:
+            response.headers["X-Strategy-Source"] = "counters"
+            strategy = engine.describe({**counters, "counters": counters["counters"][:settings.COUNTERS_DEFAULT_LIMIT]})
+            logger.info(f"Answered strategy query locally from the type chart for {response.headers['X-Counter-Target']}")
+            return stream_llm_response(single_chunk(strategy), response, "strategy") if stream else strategy
+
+        strategy = await cached_llm_answer(strategy_prompt, user_query, response, "strategy")
+        if strategy is not None:
+            return stream_llm_response(single_chunk(strategy), response, "strategy") if stream else strategy
+
+        with STAGE_LATENCY.labels(stage="prompt_build").time():
+            # Counter questions get the ranked counters as context instead of keyword matches
+            built = build_context_prompt(
+                strategy_prompt, retriever, user_query, response, "/pokemon/strategy",
+                counter_records(engine, counters) if counters is not None else None
+            )
+            strategy_prompt_template = built["prompt"]
+        LLM_TOKENS.labels(endpoint="strategy", direction="prompt").inc(built["prompt_tokens"])
+        if stream:
+            return stream_llm_response(
+                llm.stream_content(strategy_prompt_template), response, "strategy",
+                on_complete=lambda answer: record_llm_answer(strategy_prompt, user_query, strategy_prompt_template, answer, "strategy")
+            )
+        strategy = await llm.generate_content(strategy_prompt_template, is_disconnected=request.is_disconnected)
+        await record_llm_answer(strategy_prompt, user_query, strategy_prompt_template, strategy, "strategy")
         logger.info("Successfully generated strategy")
-        return response
+        return strategy
+    except ClientDisconnectedError:
+        logger.info("Client disconnected, strategy generation cancelled")
+        raise HTTPException(status_code=499, detail="Client closed request")
+    except asyncio.TimeoutError:
+        logger.error("Timed out generating strategy")
+        raise HTTPException(status_code=504, detail="Strategy generation timed out")
     except Exception as e:
         logger.error(f"Error generating strategy: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 @pokemon_router.post("/team-building")
 async def get_team(
-    user_query: str = Body(...)
+    request: Request,
+    response: Response,
+    user_query: str = Body(...),
+    stream: bool = Query(False, description="Stream the answer as server-sent events"),
+    local: bool = Query(False, description="Build the team with the local optimizer without calling the LLM"),
+    candidates: bool = Query(False, description="Send the optimizer's candidate teams to the LLM instead of keyword matches"),
+    llm: GeminiLLM = Depends(get_llm),
+    retriever: DescriptionRetriever = Depends(get_description_retriever),
+    optimizer: TeamOptimizer = Depends(get_team_optimizer)
 ) ->  str | None:
-    REQUEST_COUTNER.labels(method="POST", path="/pokemon/team-building", status="200").inc()
     logger.info(f"Team building request received with query: {user_query}")
     try:
-        team_creation_prompt_template = team_creation_prompt.format(user_query=user_query, pokemon_description=pokemon_descriptions)
-        response = llm.generate_content(team_creation_prompt_template)
+        teams = None
+        if local or candidates:
+            with STAGE_LATENCY.labels(stage="team_optimize").time():
+                teams = optimizer.optimize(**TeamOptimizer.parse_constraints(user_query), limit=settings.TEAM_CANDIDATES)
+        if local:
+            response.headers["X-Team-Source"] = "optimizer"
+            team = TeamOptimizer.describe(teams)
+            logger.info("Built team locally with the team optimizer")
+            return stream_llm_response(single_chunk(team), response, "team") if stream else team
+
+        # Answers built on optimizer candidates are cached apart from keyword-context answers
+        context = "candidates" if candidates else ""
+        team = await cached_llm_answer(team_creation_prompt, user_query, response, "team", context)
+        if team is not None:
+            return stream_llm_response(single_chunk(team), response, "team") if stream else team
+
+        with STAGE_LATENCY.labels(stage="prompt_build").time():
+            built = build_context_prompt(
+                team_creation_prompt, retriever, user_query, response, "/pokemon/team-building",
+                team_records(optimizer, teams) if teams is not None else None
+            )
+            team_creation_prompt_template = built["prompt"]
+        LLM_TOKENS.labels(endpoint="team", direction="prompt").inc(built["prompt_tokens"])
+        if stream:
+            return stream_llm_response(
+                llm.stream_content(team_creation_prompt_template), response, "team",
+                on_complete=lambda answer: record_llm_answer(team_creation_prompt, user_query, team_creation_prompt_template, answer, "team", context)
+            )
+        team = await llm.generate_content(team_creation_prompt_template, is_disconnected=request.is_disconnected)
+        await record_llm_answer(team_creation_prompt, user_query, team_creation_prompt_template, team, "team", context)
         logger.info("Successfully generated team")
-        return response
+        return team
+    except ClientDisconnectedError:
+        logger.info("Client disconnected, team generation cancelled")
+        raise HTTPException(status_code=499, detail="Client closed request")
+    except asyncio.TimeoutError:
+        logger.error("Timed out generating team")
+        raise HTTPException(status_code=504, detail="Team generation timed out")
+    except TeamQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error generating team: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -89,6 +485,5 @@ async def get_team(
 # Health check endpoint
 @health_router.get("")
 async def health_check() -> Dict[str, str]:
-    REQUEST_COUTNER.labels(method="GET", path="/health", status="200").inc()
     logger.info("Health check request received")
     return {"status": "healthy"}
@@ -5,6 +5,103 @@ class Settings(BaseSettings):
 
     POKEMON_API_URL: str = "https://pokeapi.co/api/v2"
     GEMINI_API_KEY: str = "..."
+    POKEDEX_DATA_PATH: str = "all_parsed_data.json"
+    POKEMON_DESCRIPTIONS_PATH: str = "all_pokemon_descriptions.json"
+    # Binary snapshot compiled from the two files above; JSON is loaded when it is missing or stale ("" disables)
+    POKEDEX_SNAPSHOT_PATH: str = "pokedex.snapshot"
+
+    # Context selection for LLM prompts: "bm25" sends the top-K matches, "all" sends everything that fits the budget below
+    RETRIEVAL_MODE: str = "bm25"
+    RETRIEVAL_TOP_K: int = 25
+
+    # Estimated token cap on a whole LLM prompt (least relevant Pokemon are cut first) and how context is encoded: "table" or "prose"
+    PROMPT_TOKEN_BUDGET: int = 2000
+    PROMPT_CONTEXT_FORMAT: str = "table"
+
+    # Upper bounds on names accepted by the N-way compare and batch lookup endpoints
+    COMPARE_MAX_POKEMON: int = 12
+    BATCH_MAX_POKEMON: int = 100
+
+    # Page size of the search/filter endpoint when none is given, and the largest page allowed
+    SEARCH_DEFAULT_LIMIT: int = 20
+    SEARCH_MAX_LIMIT: int = 100
+
+    # Name autocompletion page size and cap, and how many "did you mean" names a failed lookup suggests
+    AUTOCOMPLETE_DEFAULT_LIMIT: int = 10
+    AUTOCOMPLETE_MAX_LIMIT: int = 50
+    NAME_SUGGESTION_LIMIT: int = 5
+
+    # Counters returned by the type-chart counter endpoint when none is given, and the most allowed
+    COUNTERS_DEFAULT_LIMIT: int = 10
+    COUNTERS_MAX_LIMIT: int = 50
+
+    # Team optimizer: partial teams kept per beam-search step, candidates considered, teams returned
+    TEAM_BEAM_WIDTH: int = 32
+    TEAM_POOL_SIZE: int = 200
+    TEAM_CANDIDATES: int = 3
+
+    # Gemini calls: concurrent in-flight limit, per-call timeout and client-disconnect polling
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_TIMEOUT_SECONDS: float = 60.0
+    LLM_DISCONNECT_POLL_SECONDS: float = 0.5
+
+    # Where the Pokemon and LLM answer caches live: "memory" (per worker process) or "sqlite" (one file
+    # shared by every worker on the host)
+    CACHE_BACKEND: str = "memory"
+    CACHE_SQLITE_PATH: str = "cache.sqlite3"
+    # How long a shared cache read or write waits for another worker's write before counting as a miss
+    CACHE_SQLITE_BUSY_TIMEOUT_SECONDS: float = 0.2
+
+    # Cache of LLM answers for repeated or near-identical strategy/team queries
+    LLM_CACHE_MAXSIZE: int = 512
+    LLM_CACHE_TTL_SECONDS: float = 86400.0
+    LLM_CACHE_SIMILARITY_ENABLED: bool = False
+    LLM_CACHE_SIMILARITY_THRESHOLD: float = 0.8
+
+    # Shared PokeAPI HTTP session: connection pool, DNS cache, keep-alive and timeouts (seconds)
+    HTTP_POOL_LIMIT: int = 100
+    HTTP_POOL_LIMIT_PER_HOST: int = 20
+    HTTP_DNS_CACHE_TTL: int = 300
+    HTTP_KEEPALIVE_TIMEOUT: float = 30.0
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_READ_TIMEOUT: float = 10.0
+    HTTP_TOTAL_TIMEOUT: float = 30.0
+
+    # PokeAPI lookups: per-attempt time limit, jittered retries, circuit breaker and hedging (seconds; 0 disables hedging)
+    POKEAPI_ATTEMPT_TIMEOUT: float = 8.0
+    POKEAPI_RETRIES: int = 2
+    POKEAPI_RETRY_BACKOFF: float = 0.2
+    POKEAPI_RETRY_BACKOFF_MAX: float = 2.0
+    POKEAPI_BREAKER_FAILURES: int = 5
+    POKEAPI_BREAKER_RESET_SECONDS: float = 30.0
+    POKEAPI_HEDGE_DELAY: float = 0.0
+
+    # Cache of PokeAPI lookups for names missing from the local Pokedex (TTLs in seconds; expired entries are
+    # still served for POKEMON_CACHE_STALE_SECONDS while they are refreshed or PokeAPI is failing)
+    POKEMON_CACHE_MAXSIZE: int = 1024
+    POKEMON_CACHE_TTL_SECONDS: float = 3600.0
+    POKEMON_CACHE_NEGATIVE_TTL_SECONDS: float = 300.0
+    POKEMON_CACHE_STALE_SECONDS: float = 86400.0
+
+    # Background refresh of expired PokeAPI lookups (concurrent refreshes), and a warmer that refreshes the
+    # POKEMON_WARM_TOP_N most requested names ahead of expiry every POKEMON_WARM_INTERVAL_SECONDS (0 disables)
+    POKEMON_REFRESH_CONCURRENCY: int = 4
+    POKEMON_WARM_INTERVAL_SECONDS: float = 300.0
+    POKEMON_WARM_TOP_N: int = 50
+    POKEMON_POPULARITY_TRACKED: int = 1000
+
+    # HTTP caching of Pokemon lookups (Cache-Control max-age in seconds) and the smallest response body
+    # worth gzipping (bytes)
+    HTTP_CACHE_MAX_AGE_SECONDS: int = 3600
+    GZIP_MINIMUM_SIZE: int = 1024
+
+    # Logging: level, "text" or "json" lines, rotating file settings and the fraction of per-request info logs kept
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "text"
+    LOG_DIR: str = "logs"
+    LOG_FILE_MAX_BYTES: int = 10485760  # 10MB
+    LOG_FILE_BACKUP_COUNT: int = 5
+    LOG_REQUEST_SAMPLE_RATE: float = 1.0
 
 
 
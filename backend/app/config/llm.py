@@ -1,22 +1,137 @@
-from typing import Generator, AsyncGenerator
-from google import genai
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Any, Generator, AsyncGenerator, Awaitable, Callable
 from app.config.env import settings
+from app.config.metrics import STAGE_LATENCY, UPSTREAM_ERRORS
+
+
+class ClientDisconnectedError(Exception):
+    """Raised when generation is abandoned because the HTTP client went away."""
 
 
 class GeminiLLM:
-    def __init__(self):
-        self.gemini_client = genai.Client(api_key=settings.GEMINI_API_KEY)
-
-    def generate_content(self, prompt: str) -> str | None:
-        response = self.gemini_client.models.generate_content(
-            model='gemini-2.0-flash',
-            contents=prompt
-        )
+    def __init__(self, max_concurrency: int | None = None, timeout: float | None = None):
+        self._gemini_client = None
+        self.timeout = timeout or settings.LLM_TIMEOUT_SECONDS
+        self.max_concurrency = max_concurrency or settings.LLM_MAX_CONCURRENCY
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    @property
+    def gemini_client(self) -> Any:
+        """The genai client, created on first use.
+
+        google-genai takes around half a second to import, so it is loaded
+        here rather than when this module is imported.
+        """
+        if self._gemini_client is None:
+            from google import genai
+            self._gemini_client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        return self._gemini_client
+
+    @gemini_client.setter
+    def gemini_client(self, client: Any) -> None:
+        self._gemini_client = client
+
+    async def generate_content(
+        self,
+        prompt: str,
+        is_disconnected: Callable[[], Awaitable[bool]] | None = None
+    ) -> str | None:
+        """Generate a response without blocking the event loop.
+
+        At most ``max_concurrency`` calls run at once, each call is bounded by
+        ``timeout`` seconds (raising ``asyncio.TimeoutError``), and if
+        ``is_disconnected`` reports that the client has gone away the call is
+        cancelled and ``ClientDisconnectedError`` is raised.
+        """
+        queued_at = time.perf_counter()
+        async with self._semaphore:
+            STAGE_LATENCY.labels(stage="llm_queue").observe(time.perf_counter() - queued_at)
+            call = asyncio.wait_for(
+                self.gemini_client.aio.models.generate_content(
+                    model='gemini-2.0-flash',
+                    contents=prompt
+                ),
+                timeout=self.timeout
+            )
+            with STAGE_LATENCY.labels(stage="llm_generate").time(), self._count_errors():
+                if is_disconnected is None:
+                    response = await call
+                else:
+                    response = await self._cancel_on_disconnect(call, is_disconnected)
         return response.text
 
+    @staticmethod
+    @contextmanager
+    def _count_errors() -> Generator[None, None, None]:
+        """Count Gemini timeouts and failures; a client disconnect is not an upstream error."""
+        try:
+            yield
+        except ClientDisconnectedError:
+            raise
+        except asyncio.TimeoutError:
+            UPSTREAM_ERRORS.labels(upstream="gemini", kind="timeout").inc()
+            raise
+        except Exception:
+            UPSTREAM_ERRORS.labels(upstream="gemini", kind="error").inc()
+            raise
+
+    @staticmethod
+    async def _cancel_on_disconnect(call: Awaitable, is_disconnected: Callable[[], Awaitable[bool]]):
+        task = asyncio.ensure_future(call)
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=settings.LLM_DISCONNECT_POLL_SECONDS)
+                if done:
+                    return task.result()
+                if await is_disconnected():
+                    raise ClientDisconnectedError("Client disconnected before generation finished")
+        finally:
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
     async def stream_content(self, prompt: str) -> AsyncGenerator[str | None, None]:
-        for chunk in self.gemini_client.models.generate_content_stream(model='gemini-2.0-flash',contents=prompt):
-            yield chunk.text
+        """Stream response chunks from the async client as they are generated.
+
+        Shares the concurrency limit with ``generate_content``; the whole
+        stream must finish within ``timeout`` seconds.
+        """
+        queued_at = time.perf_counter()
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            STAGE_LATENCY.labels(stage="llm_queue").observe(time.perf_counter() - queued_at)
+            deadline = started + self.timeout
+            with STAGE_LATENCY.labels(stage="llm_stream").time(), self._count_errors():
+                stream = await asyncio.wait_for(
+                    self.gemini_client.aio.models.generate_content_stream(
+                        model='gemini-2.0-flash',
+                        contents=prompt
+                    ),
+                    timeout=self.timeout
+                )
+                chunks = aiter(stream)
+                first_chunk = True
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(anext(chunks), timeout=max(0.0, deadline - loop.time()))
+                    except StopAsyncIteration:
+                        break
+                    if chunk.text:
+                        if first_chunk:
+                            STAGE_LATENCY.labels(stage="llm_first_chunk").observe(loop.time() - started)
+                            first_chunk = False
+                        yield chunk.text
+
+
+_llm: GeminiLLM | None = None
 
 
-llm = GeminiLLM()
+def get_llm() -> GeminiLLM:
+    """Return the process-wide LLM client; endpoints receive it through ``Depends(get_llm)``."""
+    global _llm
+    if _llm is None:
+        _llm = GeminiLLM()
+    return _llm
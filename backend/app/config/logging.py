@@ -1,35 +1,148 @@
+import atexit
+import copy
+import json
 import logging
+import queue
+import random
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from app.config.env import settings
+
+log_dir = Path(settings.LOG_DIR)
+
+# Attributes every LogRecord has; anything else on a record came from ``extra=``
+_RECORD_ATTRIBUTES = set(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime"}
+
+
+class LazyRotatingFileHandler(RotatingFileHandler):
+    """Rotating file handler that creates its directory and file on the first record, not at import."""
+
+    def __init__(self, filename: Path, **kwargs):
+        super().__init__(filename, delay=True, **kwargs)
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any ``extra=`` fields and the formatted traceback."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Puts records on the log queue without formatting them on the calling thread.
+
+    The stock ``QueueHandler`` formats the whole record (traceback included)
+    before enqueueing; here only the message arguments are merged, since they
+    may be mutated after the call. Formatting, tracebacks and file I/O happen
+    on the listener thread.
+
+    Until the listener is started, nothing drains the queue, so records are
+    written synchronously instead of piling up on it.
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if not _listener_started:
+            listener.handle(self.prepare(record))
+            return
+        super().emit(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """Passes only a ``rate`` fraction of records below WARNING; warnings and errors always pass."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or self.rate >= 1 or random.random() < self.rate
 
-# Create logs directory if it doesn't exist
-log_dir = Path("logs")
-log_dir.mkdir(exist_ok=True)
 
 # Configure logging format
-log_format = logging.Formatter(
-    '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+if settings.LOG_FORMAT == "json":
+    log_format = JsonFormatter()
+else:
+    log_format = logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
 
-# Create handlers
+# Create handlers; they only run on the listener thread
 console_handler = logging.StreamHandler(sys.stdout)
 console_handler.setFormatter(log_format)
 
-file_handler = RotatingFileHandler(
+file_handler = LazyRotatingFileHandler(
     log_dir / "app.log",
-    maxBytes=10485760,  # 10MB
-    backupCount=5
+    maxBytes=settings.LOG_FILE_MAX_BYTES,
+    backupCount=settings.LOG_FILE_BACKUP_COUNT
 )
 file_handler.setFormatter(log_format)
 
-# Configure root logger
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+queue_handler = DeferredQueueHandler(log_queue)
+listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+_listener_started = False
+
+
+def start_logging() -> None:
+    """Start the background thread that formats and writes queued records (idempotent).
+
+    Called by the FastAPI lifespan and the command line tools, never on
+    import; records logged before it starts, or after it stops, are written
+    on the calling thread.
+    """
+    global _listener_started
+    if not _listener_started:
+        listener.start()
+        _listener_started = True
+        atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Flush every queued record and stop the background thread."""
+    global _listener_started
+    if _listener_started:
+        listener.stop()
+        _listener_started = False
+
+
+# Configure named logger
 def setup_logger(name: str) -> logging.Logger:
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    
-    # Add handlers
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
-    
+    logger.setLevel(settings.LOG_LEVEL)
+
+    # Loggers are module-level and fetched by name, so only attach the queue once
+    if queue_handler not in logger.handlers:
+        logger.addHandler(queue_handler)
+
+    return logger
+
+
+def setup_request_logger(name: str = "access") -> logging.Logger:
+    """Logger for lines written on every request, sampled at ``LOG_REQUEST_SAMPLE_RATE``."""
+    logger = setup_logger(name)
+    if not any(isinstance(f, SamplingFilter) for f in logger.filters):
+        logger.addFilter(SamplingFilter(settings.LOG_REQUEST_SAMPLE_RATE))
     return logger
@@ -1,4 +1,4 @@
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 
 
 REQUEST_COUTNER = Counter(
@@ -11,4 +11,87 @@ REQUEST_COUTNER = Counter(
 REQUEST_HISTOGRAM = Histogram(
     "pokebase_request_duration_seconds",
     "Duration of requests to the pokebase API",
+    ["method", "path"]
+)
+
+# Hot-path stages: pokeapi_fetch, parse_pokemon_data, generate_descriptions, prompt_build,
+# llm_queue (waiting for a Gemini slot), llm_generate, llm_first_chunk and llm_stream
+STAGE_LATENCY = Histogram(
+    "pokebase_stage_duration_seconds",
+    "Time spent in each stage of request handling",
+    ["stage"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+
+UPSTREAM_ERRORS = Counter(
+    "pokebase_upstream_errors_total",
+    "Failed calls to upstream services (PokeAPI, Gemini) by kind of failure",
+    ["upstream", "kind"]
+)
+
+UPSTREAM_RETRIES = Counter(
+    "pokebase_upstream_retries_total",
+    "Upstream calls repeated after a timeout, dropped connection or 429/5xx answer",
+    ["upstream"]
+)
+
+UPSTREAM_HEDGES = Counter(
+    "pokebase_upstream_hedged_requests_total",
+    "Second copies of slow upstream requests sent to cut tail latency",
+    ["upstream"]
+)
+
+# 0 = closed (calls flow), 1 = half-open (one probe allowed), 2 = open (calls fail fast)
+CIRCUIT_STATE = Gauge(
+    "pokebase_circuit_breaker_state",
+    "State of the circuit breaker guarding each upstream",
+    ["upstream"]
+)
+
+LLM_TOKENS = Counter(
+    "pokebase_llm_tokens_total",
+    "Estimated tokens sent to (prompt) and received from (response) the LLM",
+    ["endpoint", "direction"]
+)
+
+PROMPT_TOKENS_SAVED = Counter(
+    "pokebase_prompt_tokens_saved_total",
+    "Estimated prompt tokens saved by retrieval-based context selection",
+    ["path"]
+)
+
+CACHE_HITS = Counter(
+    "pokebase_cache_hits_total",
+    "Number of cache lookups served from the cache",
+    ["cache"]
+)
+
+CACHE_MISSES = Counter(
+    "pokebase_cache_misses_total",
+    "Number of cache lookups that had to load the value",
+    ["cache"]
+)
+
+CACHE_EVICTIONS = Counter(
+    "pokebase_cache_evictions_total",
+    "Number of entries evicted from a cache to stay within its size limit",
+    ["cache"]
+)
+
+CACHE_STALE_SERVED = Counter(
+    "pokebase_cache_stale_served_total",
+    "Expired cache entries served while they are reloaded in the background or because reloading them failed",
+    ["cache"]
+)
+
+CACHE_REFRESHES = Counter(
+    "pokebase_cache_refreshes_total",
+    "Background reloads of expired or soon-to-expire cache entries by outcome (ok, error)",
+    ["cache", "outcome"]
+)
+
+LLM_CACHE_TOKENS_SAVED = Counter(
+    "pokebase_llm_cache_tokens_saved_total",
+    "Estimated prompt and response tokens not sent to the LLM thanks to the response cache",
+    ["layer"]
 )
@@ -1,17 +1,54 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from app.api.router import api_router
-from app.config.logging import setup_logger
+from app.config.llm import get_llm
+from app.config.logging import setup_logger, setup_request_logger, start_logging, stop_logging
+from app.config.env import settings
+from app.config.metrics import REQUEST_COUTNER, REQUEST_HISTOGRAM
+from app.service.pokedex import get_dataset_version, get_pokedex_store
+from app.service.names import get_name_index
+from app.service.search import get_search_index
+from app.service.counters import get_counter_engine
+from app.service.team import get_team_optimizer
+from app.service.pokemon import open_http_session, close_http_session
+from app.service.retrieval import get_description_retriever
+from app.service.warmer import start_pokemon_warmer, stop_pokemon_warmer
 from prometheus_fastapi_instrumentator import Instrumentator
+from contextlib import asynccontextmanager
+import logging
 import time
 
 logger = setup_logger("main")
+access_logger = setup_request_logger()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_logging()
+    # Load the local Pokedex once so lookups never wait on disk or PokeAPI
+    get_pokedex_store()
+    get_dataset_version()
+    get_description_retriever()
+    await get_name_index()
+    await get_search_index()
+    await get_counter_engine()
+    await get_team_optimizer()
+    # Build the Gemini client (and import google-genai) before serving rather than on the first LLM request
+    get_llm().gemini_client
+    await open_http_session()
+    await start_pokemon_warmer()
+    yield
+    await stop_pokemon_warmer()
+    await close_http_session()
+    stop_logging()
 
 
 app = FastAPI(
     title="Pokebase API",
     description="API for Pokebase application",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 
@@ -23,21 +60,48 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Compress large responses (batch, compare, search); event streams are never buffered for compression
+app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MINIMUM_SIZE)
 Instrumentator().instrument(app).expose(app=app, endpoint="/metrics")
 
+def route_label(request: Request) -> str:
+    """Route template for metric labels (e.g. /pokemon/{pokemon_name}); raw paths would explode cardinality."""
+    route = request.scope.get("route")
+    if route is None:
+        return "unmatched"
+    return route.path.removeprefix(api_router.prefix) or "/"
+
+
+def record_request(request: Request, status_code: int, process_time: float) -> None:
+    path = route_label(request)
+    REQUEST_COUTNER.labels(method=request.method, path=path, status=str(status_code)).inc()
+    REQUEST_HISTOGRAM.labels(method=request.method, path=path).observe(process_time)
+
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    start_time = time.time()
-
-    logger.info(f"Request: {request.method} {request.url.path}")
+    start_time = time.perf_counter()
 
     try:
         response = await call_next(request)
-        process_time = time.time() - start_time
-        logger.info(f"Response: {response.status_code} - Processed in {process_time:.2f}s")
-        return response
     except Exception as e:
-        logger.error(f"Error processing request: {str(e)}", exc_info = True)
+        record_request(request, 500, time.perf_counter() - start_time)
+        logger.error(f"Error processing request: {request.method} {request.url.path}: {str(e)}", exc_info = True)
         raise
+
+    process_time = time.perf_counter() - start_time
+    record_request(request, response.status_code, process_time)
+    # One line per request, sampled at LOG_REQUEST_SAMPLE_RATE (5xx responses are always logged)
+    access_logger.log(
+        logging.WARNING if response.status_code >= 500 else logging.INFO,
+        f"{request.method} {request.url.path} - {response.status_code} - Processed in {process_time:.2f}s",
+        extra={
+            "method": request.method,
+            "path": request.url.path,
+            "status": response.status_code,
+            "duration_ms": round(process_time * 1000, 2),
+        },
+    )
+    return response
 # Include the API router
 app.include_router(api_router)
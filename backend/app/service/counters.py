@@ -0,0 +1,254 @@
+import copy
+import re
+import numpy as np
+from app.config.logging import setup_logger
+from app.service.pokedex import PokedexStore, PokemonRecord, STAT_NAMES, get_pokedex_store
+from app.service.retrieval import TOKEN_PATTERN
+from app.utils.bulk_pokedex import as_numpy, stat_matrix
+from app.utils.type_chart import EFFECTIVENESS, TYPE_INDEX, TYPE_NAMES, defensive_profile
+
+logger = setup_logger("counters")
+
+# Chart index used to pad Pokemon with fewer types than the widest row
+PAD = len(TYPE_NAMES)
+
+# Chart with a padding column of ones: a missing second type does not change the multiplier
+PADDED_CHART = np.hstack([EFFECTIVENESS, np.ones((len(TYPE_NAMES), 1), dtype=np.float32)])
+
+# First alternate-form id in PokeAPI (megas, regional forms, gigantamax)
+FORM_ID_START = 10000
+
+# Score = offense + defense + STATS_WEIGHT * stat z-score (+ SPEED_BONUS when faster than the target)
+STATS_WEIGHT = 0.5
+SPEED_BONUS = 0.25
+
+# Multipliers are compared on a log2 scale, with immunities floored at 1/8
+MIN_MULTIPLIER = 0.125
+
+COUNTER_INTENT = re.compile(
+    r"\b(counters?|countering|beat|beats|beating|checks?|against|versus|vs|weak(?:ness|nesses)?|walls?|answers? to)\b"
+)
+
+# Clauses naming the Pokemon or types to counter *with*, which end the counter verb's object
+CLAUSE_BREAK = re.compile(r"\b(?:with|using|against|versus|vs)\b")
+
+# Words that may follow the verb when the target is its subject ("what is dragonite weak to")
+TRAILING_WORDS = {"to", "of", "for"}
+
+
+class CounterQueryError(ValueError):
+    """Raised when a counter request names no known Pokemon or type."""
+
+
+def format_multiplier(multiplier: float) -> str:
+    return f"{multiplier:g}x"
+
+
+class CounterEngine:
+    """Ranks every Pokemon in the store as a counter to a Pokemon or type combination.
+
+    Each Pokemon's types are held as a padded (n, width) matrix of chart
+    indices, from which an (18, n) matrix of the damage every attacking type
+    deals it is computed once. Ranking a target is then a handful of array
+    operations: how hard each candidate's own types hit the target, the
+    worst hit the target's types land on each candidate, and a stat term.
+    """
+
+    def __init__(self, store: PokedexStore):
+        self.store = store
+        self.size = len(store)
+
+        chart_index = np.array([TYPE_INDEX.get(t, PAD) for t in store.types.values] + [PAD], dtype=np.intp)
+        codes = as_numpy(store.type_lists.codes)
+        offsets = as_numpy(store.type_lists.offsets).astype(np.intp)
+        lengths = np.diff(offsets)
+        width = max(int(lengths.max()) if self.size else 0, 1)
+        self.type_slots = np.full((self.size, width), PAD, dtype=np.intp)
+        for slot in range(width):
+            rows = np.flatnonzero(lengths > slot)
+            self.type_slots[rows, slot] = chart_index[codes[offsets[rows] + slot]]
+
+        self.defense_profiles = PADDED_CHART[:, self.type_slots].prod(axis=2)
+
+        self.stats = stat_matrix(store).astype(np.float32)
+        self.is_form = as_numpy(store.pokemon_ids) >= FORM_ID_START
+        self._score_stats()
+
+    def _score_stats(self) -> None:
+        self.totals = self.stats.sum(axis=1)
+        spread = float(self.totals.std()) if self.size else 0.0
+        self.stat_scores = (self.totals - self.totals.mean()) / spread if spread else np.zeros(self.size, dtype=np.float32)
+        self.speeds = self.stats[:, STAT_NAMES.index("speed")]
+
+    def extended(self) -> "CounterEngine":
+        """A copy that also ranks Pokemon added to the store since this engine was built.
+
+        Only the new rows' type slots, defense profiles and stats are
+        computed; the stat z-scores are renormalised over the whole store.
+        """
+        engine = copy.copy(self)
+        positions = range(self.size, len(self.store))
+        records = [PokemonRecord(self.store, position) for position in positions]
+        engine.size = len(self.store)
+
+        slots = [[TYPE_INDEX.get(t, PAD) for t in record["types"]] for record in records]
+        width = max([self.type_slots.shape[1], *map(len, slots)])
+        new_slots = np.full((len(records), width), PAD, dtype=np.intp)
+        for row, indices in enumerate(slots):
+            new_slots[row, :len(indices)] = indices
+        old_slots = np.pad(self.type_slots, ((0, 0), (0, width - self.type_slots.shape[1])), constant_values=PAD)
+        engine.type_slots = np.vstack([old_slots, new_slots])
+        engine.defense_profiles = np.hstack([self.defense_profiles, PADDED_CHART[:, new_slots].prod(axis=2)])
+
+        new_stats = np.array(
+            [[max(record["stats"].get(stat, 0), 0) for stat in STAT_NAMES] for record in records], dtype=np.float32
+        ).reshape(len(records), len(STAT_NAMES))
+        engine.stats = np.vstack([self.stats, new_stats])
+        engine.is_form = np.append(self.is_form, [self.store.pokemon_ids[position] >= FORM_ID_START for position in positions])
+        engine._score_stats()
+        return engine
+
+    def target_types(self, position: int) -> list[str]:
+        return [TYPE_NAMES[index] for index in self.type_slots[position] if index != PAD]
+
+    def rank(
+        self,
+        pokemon: str | None = None,
+        types: list[str] | None = None,
+        limit: int = 10,
+        include_forms: bool = False
+    ) -> dict:
+        """Best counters to a Pokemon (by name) or to a type combination."""
+        position = None
+        if pokemon is not None:
+            position = self.store.position(pokemon)
+            if position is None:
+                raise CounterQueryError(f"Pokemon {pokemon} not found")
+            types = self.target_types(position)
+        types = [t.strip().lower() for t in types or []]
+        unknown = [t for t in types if t not in TYPE_INDEX]
+        if unknown:
+            raise CounterQueryError(f"Unknown type(s) {', '.join(unknown)}, expected one of {', '.join(TYPE_NAMES)}")
+        if not types:
+            raise CounterQueryError("Name a Pokemon or at least one type to counter")
+
+        target_profile = defensive_profile(types)
+        # Best multiplier each candidate's own (STAB) types deal to the target
+        offense = np.append(target_profile, 0.0)[self.type_slots].max(axis=1)
+        # Worst multiplier the target's types deal to each candidate
+        threat = self.defense_profiles[[TYPE_INDEX[t] for t in types]].max(axis=0)
+
+        scores = (
+            np.log2(np.maximum(offense, MIN_MULTIPLIER))
+            - np.log2(np.maximum(threat, MIN_MULTIPLIER))
+            + STATS_WEIGHT * self.stat_scores
+        )
+        if position is not None:
+            scores = scores + SPEED_BONUS * (self.speeds > self.speeds[position])
+            scores[position] = -np.inf
+        if not include_forms:
+            scores = np.where(self.is_form, -np.inf, scores)
+
+        limit = min(limit, int(np.isfinite(scores).sum()))
+        top = np.argpartition(-scores, limit - 1)[:limit] if limit else np.zeros(0, dtype=np.intp)
+        top = top[np.lexsort((top, -scores[top]))]
+
+        return {
+            "target": {
+                "pokemon_name": self.store.names.decode(self.store.name_codes[position]) if position is not None else None,
+                "types": types,
+                "weaknesses": {TYPE_NAMES[i]: float(m) for i, m in enumerate(target_profile) if m > 1},
+                "resistances": {TYPE_NAMES[i]: float(m) for i, m in enumerate(target_profile) if 0 < m < 1},
+                "immunities": [TYPE_NAMES[i] for i, m in enumerate(target_profile) if m == 0],
+            },
+            "counters": [
+                {
+                    "pokemon_name": self.store.names.decode(self.store.name_codes[i]),
+                    "types": self.target_types(i),
+                    "score": round(float(scores[i]), 3),
+                    "offense": float(offense[i]),
+                    "worst_damage_taken": float(threat[i]),
+                    "total": int(self.totals[i]),
+                }
+                for i in top
+            ],
+        }
+
+    def find_target(self, query: str) -> tuple[str | None, list[str]]:
+        """The Pokemon or types a "how do I counter X" style query asks about.
+
+        Only the object of the counter verb is the target, up to a "with",
+        "using" or "against" clause: "what fire pokemon counter grass types"
+        asks about grass and "counter dragon types with a steel type" about
+        dragon. When nothing follows the verb ("dragonite counters") the
+        subject is the target. A named Pokemon wins over type words
+        ("counter Dragonite's dragon moves").
+
+        Returns ``(None, [])`` when the query is not about countering
+        something, names nothing the store and type chart know, or names
+        more types than one Pokemon can have.
+        """
+        query = query.lower()
+        match = COUNTER_INTENT.search(query)
+        if match is None:
+            return None, []
+        tokens = self._target_tokens(CLAUSE_BREAK.split(query[match.end():], maxsplit=1)[0])
+        if not [token for token in tokens if token not in TRAILING_WORDS]:
+            tokens = self._target_tokens(CLAUSE_BREAK.split(query[:match.start()])[-1])
+        for i, token in enumerate(tokens):
+            for key in ("-".join(tokens[i:i + 2]), token):
+                if key in self.store:
+                    return key, []
+        types = []
+        for token in tokens:
+            token = token.removesuffix("-type").removesuffix("-types")
+            token = token if token in TYPE_INDEX else token.removesuffix("s")
+            if token in TYPE_INDEX and token not in types:
+                types.append(token)
+        if len(types) > 2:
+            return None, []
+        return None, types
+
+    @staticmethod
+    def _target_tokens(text: str) -> list[str]:
+        return [token for token in TOKEN_PATTERN.findall(text) if not token.isdigit()]
+
+    @staticmethod
+    def describe(result: dict) -> str:
+        """Plain-text answer for a ranking, in the same register as the LLM strategy answers."""
+        target = result["target"]
+        type_names = "/".join(target["types"])
+        if target["pokemon_name"]:
+            lines = [f"{target['pokemon_name'].capitalize()} is {type_names} type."]
+        else:
+            lines = [f"This is the {type_names} type matchup."]
+        weaknesses = sorted(target["weaknesses"].items(), key=lambda item: -item[1])
+        if weaknesses:
+            lines.append("It is weak to " + ", ".join(f"{t} ({format_multiplier(m)})" for t, m in weaknesses) + ".")
+        if target["resistances"]:
+            lines.append("It resists " + ", ".join(target["resistances"]) + ".")
+        if target["immunities"]:
+            lines.append("It is immune to " + ", ".join(target["immunities"]) + ".")
+        if result["counters"]:
+            counters = [
+                f"{c['pokemon_name'].capitalize()} ({'/'.join(c['types'])}, hits for {format_multiplier(c['offense'])}, "
+                f"takes at most {format_multiplier(c['worst_damage_taken'])})"
+                for c in result["counters"]
+            ]
+            lines.append("Recommended counters: " + "; ".join(counters) + ".")
+        return " ".join(lines)
+
+
+_counter_engine: CounterEngine | None = None
+
+
+async def get_counter_engine() -> CounterEngine:
+    """Return the process-wide counter engine, extending it with Pokemon written back to the store."""
+    global _counter_engine
+    store = get_pokedex_store()
+    if _counter_engine is None or _counter_engine.store is not store:
+        _counter_engine = CounterEngine(store)
+        logger.info(f"Built counter engine over {len(store)} Pokemon")
+    elif _counter_engine.size != len(store):
+        _counter_engine = _counter_engine.extended()
+    return _counter_engine
@@ -0,0 +1,235 @@
+import copy
+from bisect import bisect_left
+from typing import Iterator
+from app.config.logging import setup_logger
+from app.service.pokedex import PokedexStore, get_pokedex_store
+
+logger = setup_logger("names")
+
+# Largest edit distance a misspelt name is corrected across
+MAX_TYPOS = 2
+
+# Sorts after every character that can appear in a key, closing a prefix range
+PREFIX_END = "\uffff"
+
+
+def edit_distance(a: str, b: str, limit: int | None = None) -> int:
+    """Damerau-Levenshtein (optimal string alignment) distance; adjacent swaps cost 1.
+
+    With ``limit`` the computation stops early once every alignment exceeds it
+    and returns ``limit + 1``.
+    """
+    if a == b:
+        return 0
+    if limit is not None and abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    previous_previous: list[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+def deletes(term: str, distance: int) -> set[str]:
+    """Every string reachable from ``term`` by removing up to ``distance`` characters."""
+    variants = {term}
+    frontier = {term}
+    for _ in range(distance):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        variants |= frontier
+    return variants
+
+
+class DeletionIndex:
+    """SymSpell-style symmetric delete index for typo-tolerant lookup.
+
+    Each term is stored under every variant left after deleting up to
+    ``max_distance`` characters. Two strings within that edit distance always
+    share a variant, so a lookup only generates the query's own deletes,
+    gathers the terms filed under them and verifies that short candidate
+    list with a bounded edit distance, instead of comparing against every
+    term.
+    """
+
+    def __init__(self, terms: list[str] | None = None, max_distance: int = 2):
+        self.max_distance = max_distance
+        self.terms: list[str] = []
+        self.variants: dict[str, list[int]] = {}
+        for term in terms or []:
+            self.add(term)
+
+    def add(self, term: str) -> None:
+        index = len(self.terms)
+        self.terms.append(term)
+        for variant in deletes(term, self.max_distance):
+            self.variants.setdefault(variant, []).append(index)
+
+    def search(self, query: str, tolerance: int) -> list[tuple[int, str]]:
+        """(distance, term) pairs within ``tolerance`` of ``query``, closest first."""
+        tolerance = min(tolerance, self.max_distance)
+        candidates = {
+            index
+            for variant in deletes(query, tolerance)
+            for index in self.variants.get(variant, ())
+        }
+        matches = []
+        for index in candidates:
+            distance = edit_distance(query, self.terms[index], tolerance)
+            if distance <= tolerance:
+                matches.append((distance, self.terms[index]))
+        return sorted(matches)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+
+class PokemonNameIndex:
+    """Prefix completion and typo-tolerant lookup over Pokemon names and species.
+
+    Completion keys are every name and species plus each hyphen-separated
+    tail ("mime" for "mr-mime", "galar" for "meowth-galar"), held in one
+    sorted list so a prefix is a contiguous range found by two binary
+    searches. Every key maps to the canonical Pokemon name it stands for and
+    that Pokemon's store position, which ranks results (base forms first).
+    """
+
+    def __init__(self, store: PokedexStore):
+        self.store = store
+        self.size = len(store)
+        targets: dict[str, tuple[int, str]] = {}
+        tails: dict[str, tuple[int, str]] = {}
+        for position in range(self.size):
+            for key, target, whole in self._entries(position):
+                (targets if whole else tails).setdefault(key, target)
+
+        self.targets = targets
+        completion_keys = {**tails, **targets}
+        self.keys = sorted(completion_keys)
+        self.key_targets = [completion_keys[key] for key in self.keys]
+        # Tails are too short and generic ("alola", "mega") to be typo targets
+        self.typo_index = DeletionIndex(list(targets), max_distance=MAX_TYPOS)
+
+    def _entries(self, position: int) -> Iterator[tuple[str, tuple[int, str], bool]]:
+        """(key, (position, name), whole) for each completion key of one Pokemon; whole keys are typo targets too."""
+        name = self.store.names.decode(self.store.name_codes[position])
+        species = self.store.species.decode(self.store.species_codes[position])
+        if not name:
+            return
+        yield name, (position, name), True
+        if species:
+            # Like the store, a species stands for the first (default) form seen
+            yield species, (position, name), True
+        parts = name.split("-")
+        for start in range(1, len(parts)):
+            yield "-".join(parts[start:]), (position, name), False
+
+    def extended(self) -> "PokemonNameIndex":
+        """A copy that also covers Pokemon added to the store since this index was built.
+
+        Only the new keys are inserted, so a write-back from PokeAPI costs a
+        few list inserts instead of a rebuild. The typo index only grows and
+        is shared with this index, which ignores terms it does not know.
+        """
+        index = copy.copy(self)
+        index.size = len(self.store)
+        index.targets = dict(self.targets)
+        keys, key_targets = list(self.keys), list(self.key_targets)
+        for position in range(self.size, index.size):
+            for key, target, whole in self._entries(position):
+                i = bisect_left(keys, key)
+                present = i < len(keys) and keys[i] == key
+                if whole and key not in index.targets:
+                    index.targets[key] = target
+                    index.typo_index.add(key)
+                    if present:
+                        key_targets[i] = target  # was only a tail; whole names take precedence
+                if not present:
+                    keys.insert(i, key)
+                    key_targets.insert(i, target)
+        index.keys, index.key_targets = keys, key_targets
+        return index
+
+    def complete(self, prefix: str, limit: int = 10) -> list[str]:
+        """Pokemon whose name, species or a name part starts with ``prefix``."""
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + PREFIX_END, lo=start)
+        # Rank whole-name matches ahead of tail matches, then by store position
+        matches = sorted(
+            (self.keys[i] not in self.targets, *self.key_targets[i])
+            for i in range(start, end)
+        )
+        return list(dict.fromkeys(name for _, _, name in matches))[:limit]
+
+    @staticmethod
+    def tolerance(query: str) -> int:
+        """Typos allowed for a query: none for very short names, two for long ones."""
+        if len(query) <= 3:
+            return 0
+        return 1 if len(query) <= 7 else MAX_TYPOS
+
+    def suggest(self, query: str, limit: int = 5) -> list[tuple[int, str]]:
+        """(distance, Pokemon name) pairs for names close to ``query``, best first."""
+        query = query.strip().lower()
+        tolerance = self.tolerance(query)
+        if tolerance == 0:
+            return []
+        ranked = sorted(
+            (distance, self.targets[term][0], self.targets[term][1])
+            for distance, term in self.typo_index.search(query, tolerance)
+            if term in self.targets  # added by a newer, extended copy of this index
+        )
+        suggestions = {}
+        for distance, _, name in ranked:
+            suggestions.setdefault(name, distance)
+        return [(distance, name) for name, distance in suggestions.items()][:limit]
+
+    def resolve(self, query: str, limit: int = 5) -> tuple[str | None, list[str]]:
+        """Resolve a possibly misspelt name to a Pokemon without contacting PokeAPI.
+
+        Returns ``(name, [])`` when the query is a known name or has exactly
+        one closest match, ``(None, suggestions)`` when several names are
+        equally close, and ``(None, [])`` when nothing is close, in which
+        case the name may still be one PokeAPI knows and the local Pokedex
+        does not.
+        """
+        key = query.strip().lower()
+        if key in self.store or key.isdigit():
+            return key, []
+        suggestions = self.suggest(key, limit)
+        if not suggestions:
+            return None, []
+        best = [name for distance, name in suggestions if distance == suggestions[0][0]]
+        if len(best) == 1:
+            return best[0], []
+        return None, [name for _, name in suggestions]
+
+
+_name_index: PokemonNameIndex | None = None
+
+
+async def get_name_index() -> PokemonNameIndex:
+    """Return the process-wide name index, extending it with Pokemon written back to the store.
+
+    A coroutine so that, as a dependency, it runs on the event loop beside
+    PokedexStore.add rather than in the threadpool.
+    """
+    global _name_index
+    store = get_pokedex_store()
+    if _name_index is None or _name_index.store is not store:
+        _name_index = PokemonNameIndex(store)
+        logger.info(f"Built name index over {len(_name_index.targets)} names and {len(_name_index.keys)} completion keys")
+    elif _name_index.size != len(store):
+        _name_index = _name_index.extended()
+    return _name_index
@@ -0,0 +1,361 @@
+import hashlib
+import json
+import os
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Any, Iterator
+from app.config.env import settings
+from app.config.logging import setup_logger
+from app.service.snapshot import Snapshot, SnapshotError, SnapshotWriter, get_snapshot, writable_array
+
+logger = setup_logger("pokedex_store")
+
+STAT_NAMES = ("hp", "attack", "defense", "special-attack", "special-defense", "speed")
+
+# Same key order as all_parsed_data.json
+RECORD_FIELDS = (
+    "pokemon_name", "abilities", "moves", "types", "stats", "base_experience",
+    "pokemon_height", "pokemon_id", "pokemon_species", "pokemon_weight", "role_type",
+)
+
+# Stored in place of None in the integer columns
+MISSING = -1
+
+VOCABULARIES = ("names", "species", "moves", "abilities", "types", "roles")
+ARRAY_COLUMNS = ("name_codes", "species_codes", "pokemon_ids", "base_experience", "heights", "weights")
+CODE_LIST_COLUMNS = ("move_lists", "ability_lists", "hidden_flags", "type_lists", "role_lists")
+
+
+class Vocabulary:
+    """Interned string <-> small integer code mapping."""
+
+    def __init__(self, values: list[str] | None = None):
+        self.values: list[str] = []
+        self.codes: dict[str, int] = {}
+        for value in values or []:
+            self.encode(value)
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            value = sys.intern(value)
+            self.values.append(value)
+            self.codes[value] = code
+        return code
+
+    def decode(self, code: int) -> str:
+        return self.values[code]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class CodeListColumn:
+    """Variable-length lists of vocabulary codes packed into one array (CSR layout)."""
+
+    def __init__(self, typecode: str = "H"):
+        self.codes = array(typecode)
+        self.offsets = array("L", [0])
+
+    @classmethod
+    def from_buffers(cls, codes, offsets) -> "CodeListColumn":
+        """Wrap existing (e.g. memory-mapped) code and offset buffers without copying."""
+        column = cls.__new__(cls)
+        column.codes = codes
+        column.offsets = offsets
+        return column
+
+    def append(self, codes: list[int]) -> None:
+        self.codes.extend(codes)
+        self.offsets.append(len(self.codes))
+
+    def get(self, position: int):
+        return self.codes[self.offsets[position]:self.offsets[position + 1]]
+
+
+class PokemonRecord(Mapping):
+    """Read-only dict-like view of one record in a PokedexStore.
+
+    Fields are decoded from the store's columns on access, so the view
+    behaves like the parsed dict (``record["types"]``, ``.get``, ``.items``)
+    without keeping one around per Pokemon.
+    """
+
+    __slots__ = ("_store", "_position")
+
+    def __init__(self, store: "PokedexStore", position: int):
+        self._store = store
+        self._position = position
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in RECORD_FIELDS:
+            raise KeyError(key)
+        return self._store._field(self._position, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(RECORD_FIELDS)
+
+    def __len__(self) -> int:
+        return len(RECORD_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"PokemonRecord({self.to_dict()!r})"
+
+    def to_dict(self) -> dict:
+        return {key: self[key] for key in RECORD_FIELDS}
+
+
+class PokedexStore:
+    """Columnar in-memory store of parsed Pokemon records indexed by name, species and id.
+
+    Names, moves, abilities, types and roles are interned into vocabularies
+    and stored as integer codes; the six base stats and other numbers live in
+    typed arrays. Records are read back through ``PokemonRecord`` views.
+
+    A store loaded with ``from_snapshot`` reads its columns straight from a
+    memory-mapped snapshot; they are copied into arrays on the first ``add``.
+    """
+
+    def __init__(self, records: list[dict] | None = None):
+        self.names = Vocabulary()
+        self.species = Vocabulary()
+        self.moves = Vocabulary()
+        self.abilities = Vocabulary()
+        self.types = Vocabulary()
+        self.roles = Vocabulary()
+
+        self.name_codes = array("H")
+        self.species_codes = array("H")
+        self.pokemon_ids = array("l")
+        self.base_experience = array("l")
+        self.heights = array("l")
+        self.weights = array("l")
+        self.stats = {stat: array("h") for stat in STAT_NAMES}
+        self.move_lists = CodeListColumn("H")
+        self.ability_lists = CodeListColumn("H")
+        self.hidden_flags = CodeListColumn("B")
+        self.type_lists = CodeListColumn("B")
+        self.role_lists = CodeListColumn("B")
+
+        self._index: dict[str, int] = {}
+        self._frozen = False
+        for record in records or []:
+            self.add(record)
+        # Records from the bundled dataset; later ones were added at runtime (e.g. fetched from PokeAPI)
+        self.bundled_count = len(self)
+
+    @classmethod
+    def from_file(cls, path: str) -> "PokedexStore":
+        with open(path, "r") as f:
+            records = json.load(f)
+        store = cls(records)
+        logger.info(f"Loaded {len(store)} Pokemon records from {path}")
+        return store
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Snapshot) -> "PokedexStore":
+        """Load a store whose columns are read-only views into a memory-mapped snapshot."""
+        store = cls()
+        for name in VOCABULARIES:
+            setattr(store, name, Vocabulary(snapshot.strings(f"store.{name}")))
+        for name in ARRAY_COLUMNS:
+            setattr(store, name, snapshot.array(f"store.{name}"))
+        store.stats = {stat: snapshot.array(f"store.stats.{stat}") for stat in STAT_NAMES}
+        for name in CODE_LIST_COLUMNS:
+            setattr(store, name, CodeListColumn.from_buffers(
+                snapshot.array(f"store.{name}.codes"), snapshot.array(f"store.{name}.offsets")
+            ))
+        store._frozen = True
+        store.bundled_count = len(store)
+        for position in range(len(store)):
+            store._index_position(
+                position,
+                store.names.decode(store.name_codes[position]),
+                store._int_or_none(store.pokemon_ids[position]),
+                store.species.decode(store.species_codes[position]),
+            )
+        logger.info(f"Loaded {len(store)} Pokemon records from snapshot {snapshot.path}")
+        return store
+
+    def to_snapshot(self, writer: SnapshotWriter) -> None:
+        for name in VOCABULARIES:
+            writer.add_strings(f"store.{name}", getattr(self, name).values)
+        for name in ARRAY_COLUMNS:
+            writer.add_array(f"store.{name}", getattr(self, name))
+        for stat in STAT_NAMES:
+            writer.add_array(f"store.stats.{stat}", self.stats[stat])
+        for name in CODE_LIST_COLUMNS:
+            column = getattr(self, name)
+            writer.add_array(f"store.{name}.codes", column.codes)
+            writer.add_array(f"store.{name}.offsets", column.offsets)
+
+    def _thaw(self) -> None:
+        """Copy snapshot-backed columns into growable arrays (copy-on-write)."""
+        for name in ARRAY_COLUMNS:
+            setattr(self, name, writable_array(getattr(self, name)))
+        self.stats = {stat: writable_array(column) for stat, column in self.stats.items()}
+        for name in CODE_LIST_COLUMNS:
+            column = getattr(self, name)
+            setattr(self, name, CodeListColumn.from_buffers(
+                writable_array(column.codes), writable_array(column.offsets)
+            ))
+        self._frozen = False
+
+    @staticmethod
+    def _normalize(key: str | int) -> str:
+        return str(key).strip().lower()
+
+    @staticmethod
+    def _int_or_missing(value: int | None) -> int:
+        return MISSING if value is None else value
+
+    @staticmethod
+    def _int_or_none(value: int) -> int | None:
+        return None if value == MISSING else value
+
+    def add(self, record: Mapping, *aliases: str) -> None:
+        """Add a record, making it reachable by its name, id and any extra aliases.
+
+        Species only points at the first record seen for it, so the default
+        form (lowest id) wins over later alternate forms. Records are added
+        on the event loop, which is also where the indexes over the columns
+        are extended, so those never see a half-added row.
+        """
+        if self._frozen:
+            self._thaw()
+        position = len(self.name_codes)
+
+        self.name_codes.append(self.names.encode(record.get("pokemon_name") or ""))
+        self.species_codes.append(self.species.encode(record.get("pokemon_species") or ""))
+        self.pokemon_ids.append(self._int_or_missing(record.get("pokemon_id")))
+        self.base_experience.append(self._int_or_missing(record.get("base_experience")))
+        self.heights.append(self._int_or_missing(record.get("pokemon_height")))
+        self.weights.append(self._int_or_missing(record.get("pokemon_weight")))
+
+        stats = record.get("stats") or {}
+        for stat in STAT_NAMES:
+            self.stats[stat].append(self._int_or_missing(stats.get(stat)))
+
+        abilities = record.get("abilities") or {}
+        self.move_lists.append([self.moves.encode(move) for move in record.get("moves") or []])
+        self.ability_lists.append([self.abilities.encode(ability) for ability in abilities])
+        self.hidden_flags.append([bool(hidden) for hidden in abilities.values()])
+        self.type_lists.append([self.types.encode(t) for t in record.get("types") or []])
+        self.role_lists.append([self.roles.encode(role) for role in record.get("role_type") or []])
+
+        self._index_position(
+            position, record.get("pokemon_name"), record.get("pokemon_id"), record.get("pokemon_species"), *aliases
+        )
+
+    def _index_position(
+        self,
+        position: int,
+        name: str | None,
+        pokemon_id: int | None,
+        species: str | None,
+        *aliases: str
+    ) -> None:
+        for key in (name, pokemon_id, *aliases):
+            if key is not None and key != "":
+                self._index[self._normalize(key)] = position
+
+        if species:
+            self._index.setdefault(self._normalize(species), position)
+
+    def _field(self, position: int, key: str) -> Any:
+        if key == "pokemon_name":
+            return self.names.decode(self.name_codes[position])
+        if key == "pokemon_species":
+            return self.species.decode(self.species_codes[position])
+        if key == "pokemon_id":
+            return self._int_or_none(self.pokemon_ids[position])
+        if key == "base_experience":
+            return self._int_or_none(self.base_experience[position])
+        if key == "pokemon_height":
+            return self._int_or_none(self.heights[position])
+        if key == "pokemon_weight":
+            return self._int_or_none(self.weights[position])
+        if key == "stats":
+            return {
+                stat: self.stats[stat][position]
+                for stat in STAT_NAMES
+                if self.stats[stat][position] != MISSING
+            }
+        if key == "abilities":
+            codes = self.ability_lists.get(position)
+            flags = self.hidden_flags.get(position)
+            return {self.abilities.decode(code): bool(flag) for code, flag in zip(codes, flags)}
+        if key == "moves":
+            return [self.moves.decode(code) for code in self.move_lists.get(position)]
+        if key == "types":
+            return [self.types.decode(code) for code in self.type_lists.get(position)]
+        if key == "role_type":
+            return [self.roles.decode(code) for code in self.role_lists.get(position)]
+        raise KeyError(key)
+
+    @property
+    def records(self) -> list[PokemonRecord]:
+        return [PokemonRecord(self, position) for position in range(len(self))]
+
+    def position(self, key: str | int) -> int | None:
+        """Row of the record reachable by ``key``, for use with the column arrays."""
+        return self._index.get(self._normalize(key))
+
+    def get(self, key: str | int) -> PokemonRecord | None:
+        position = self.position(key)
+        if position is None:
+            return None
+        return PokemonRecord(self, position)
+
+    def __contains__(self, key: str | int) -> bool:
+        return self._normalize(key) in self._index
+
+    def is_bundled(self, key: str | int) -> bool:
+        """Whether ``key`` names a record of the bundled dataset rather than one added at runtime."""
+        position = self.position(key)
+        return position is not None and position < self.bundled_count
+
+    def __len__(self) -> int:
+        return len(self.name_codes)
+
+
+_pokedex_store: PokedexStore | None = None
+
+
+def get_pokedex_store() -> PokedexStore:
+    """Return the process-wide store, loading it on first use (from the snapshot if there is a current one)."""
+    global _pokedex_store
+    if _pokedex_store is None:
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            try:
+                _pokedex_store = PokedexStore.from_snapshot(snapshot)
+                return _pokedex_store
+            except SnapshotError as e:
+                logger.warning(f"Could not load Pokedex snapshot, loading JSON instead: {str(e)}")
+        try:
+            _pokedex_store = PokedexStore.from_file(settings.POKEDEX_DATA_PATH)
+        except FileNotFoundError:
+            logger.warning(f"Pokedex data file not found: {settings.POKEDEX_DATA_PATH}, starting with an empty store")
+            _pokedex_store = PokedexStore()
+    return _pokedex_store
+
+
+_dataset_version: str | None = None
+
+
+def get_dataset_version() -> str:
+    """Digest of the bundled Pokedex data (the JSON, else the snapshot), identical in every worker and host."""
+    global _dataset_version
+    if _dataset_version is None:
+        digest = hashlib.sha1()
+        for path in (settings.POKEDEX_DATA_PATH, settings.POKEDEX_SNAPSHOT_PATH):
+            if path and os.path.exists(path):
+                with open(path, "rb") as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(chunk)
+                break
+        _dataset_version = digest.hexdigest()[:16]
+    return _dataset_version
@@ -1,29 +1,187 @@
 import aiohttp
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 from fastapi import Depends
 from app.config.env import settings
 from app.config.logging import setup_logger
+from app.config.metrics import STAGE_LATENCY, UPSTREAM_ERRORS
+from app.service.resilience import CircuitBreaker, CircuitOpenError, ResilientCaller
 
 logger = setup_logger("pokemon_service")
 
+
+class PokemonNotFoundError(Exception):
+    """Raised when PokeAPI has no Pokemon with the requested name."""
+
+
+def upstream_error_kind(error: BaseException) -> str:
+    """Label for UPSTREAM_ERRORS describing how a PokeAPI call failed."""
+    if isinstance(error, PokemonNotFoundError):
+        return "not_found"
+    if isinstance(error, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(error, asyncio.TimeoutError):
+        return "timeout"
+    if isinstance(error, aiohttp.ClientResponseError):
+        return "http_error"
+    if isinstance(error, aiohttp.ClientError):
+        return "connection"
+    return "error"
+
+
+def http_timeout() -> aiohttp.ClientTimeout:
+    """Session-wide connect, read and total limits for PokeAPI calls."""
+    return aiohttp.ClientTimeout(
+        total=settings.HTTP_TOTAL_TIMEOUT,
+        sock_connect=settings.HTTP_CONNECT_TIMEOUT,
+        sock_read=settings.HTTP_READ_TIMEOUT,
+    )
+
+
+def create_pokeapi_caller() -> ResilientCaller:
+    """Retry, circuit breaker and hedging policy for PokeAPI lookups, from settings."""
+    return ResilientCaller(
+        "pokeapi",
+        CircuitBreaker("pokeapi", settings.POKEAPI_BREAKER_FAILURES, settings.POKEAPI_BREAKER_RESET_SECONDS),
+        retries=settings.POKEAPI_RETRIES,
+        backoff=settings.POKEAPI_RETRY_BACKOFF,
+        backoff_max=settings.POKEAPI_RETRY_BACKOFF_MAX,
+        hedge_delay=settings.POKEAPI_HEDGE_DELAY,
+    )
+
+
 class PokemonService:
 
-    def __init__(self):
+    def __init__(self, session: aiohttp.ClientSession | None = None, caller: ResilientCaller | None = None):
         self.base_url = settings.POKEMON_API_URL
+        self.session = session
+        self.caller = caller or create_pokeapi_caller()
+        # Each attempt gets its own deadline so retries fit well inside the session's total timeout
+        self.attempt_timeout = aiohttp.ClientTimeout(
+            total=settings.POKEAPI_ATTEMPT_TIMEOUT,
+            sock_connect=settings.HTTP_CONNECT_TIMEOUT,
+            sock_read=settings.HTTP_READ_TIMEOUT,
+        )
+
+    @asynccontextmanager
+    async def _session_scope(self) -> AsyncIterator[aiohttp.ClientSession]:
+        if self.session is not None:
+            yield self.session
+            return
+        # No shared session (e.g. outside the app lifespan), use a short-lived one
+        async with aiohttp.ClientSession(timeout=http_timeout()) as session:
+            yield session
 
     async def get_pokemon_data(self, pokemon_name: str):
+        """Fetch a Pokemon from PokeAPI, retrying transient failures.
+
+        Raises PokemonNotFoundError for unknown names and CircuitOpenError,
+        without contacting PokeAPI, while its circuit breaker is open.
+        """
         logger.info(f"Fetching Pokemon data for: {pokemon_name}")
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{self.base_url}/pokemon/{pokemon_name}") as response:
-                    if response.status == 404:
-                        logger.error(f"Pokemon not found: {pokemon_name}")
-                        raise Exception(f"Pokemon {pokemon_name} not found")
-                    data = await response.json()
-                    logger.info(f"Successfully fetched data for Pokemon: {pokemon_name}")
-                    return data
+            async with self._session_scope() as session:
+                return await self.caller.call(lambda: self._fetch(session, pokemon_name))
         except Exception as e:
+            UPSTREAM_ERRORS.labels(upstream="pokeapi", kind=upstream_error_kind(e)).inc()
             logger.error(f"Error fetching Pokemon data: {str(e)}", exc_info=True)
             raise
 
+    async def _fetch(self, session: aiohttp.ClientSession, pokemon_name: str):
+        with STAGE_LATENCY.labels(stage="pokeapi_fetch").time():
+            async with session.get(f"{self.base_url}/pokemon/{pokemon_name}", timeout=self.attempt_timeout) as response:
+                if response.status == 404:
+                    logger.error(f"Pokemon not found: {pokemon_name}")
+                    raise PokemonNotFoundError(f"Pokemon {pokemon_name} not found")
+                response.raise_for_status()
+                data = await response.json()
+                logger.info(f"Successfully fetched data for Pokemon: {pokemon_name}")
+                return data
+
+    async def get_pokemon_names(self) -> list[str]:
+        """Names of every Pokemon PokeAPI knows about."""
+        async with self._session_scope() as session:
+            async with session.get(f"{self.base_url}/pokemon", params={"limit": 100000}) as response:
+                response.raise_for_status()
+                data = await response.json()
+        return [entry["name"] for entry in data.get("results", [])]
+
+    async def get_pokemon_data_conditional(
+        self,
+        pokemon_name: str,
+        etag: str | None = None,
+        last_modified: str | None = None
+    ) -> dict:
+        """Fetch a Pokemon unless it is unchanged since the given validators.
+
+        Returns ``{"status", "data", "etag", "last_modified"}``; ``data`` is
+        None when PokeAPI answers 304 Not Modified. Other error statuses raise.
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        async with self._session_scope() as session:
+            async with session.get(f"{self.base_url}/pokemon/{pokemon_name}", headers=headers) as response:
+                if response.status == 404:
+                    raise PokemonNotFoundError(f"Pokemon {pokemon_name} not found")
+                response.raise_for_status()
+                data = None if response.status == 304 else await response.json()
+                return {
+                    "status": response.status,
+                    "data": data,
+                    "etag": response.headers.get("ETag", etag),
+                    "last_modified": response.headers.get("Last-Modified", last_modified),
+                }
+
+
+_http_session: aiohttp.ClientSession | None = None
+_pokemon_service: PokemonService | None = None
+_pokeapi_caller: ResilientCaller | None = None
+
+
+def get_pokeapi_caller() -> ResilientCaller:
+    """Process-wide PokeAPI caller, so every lookup shares one circuit breaker."""
+    global _pokeapi_caller
+    if _pokeapi_caller is None:
+        _pokeapi_caller = create_pokeapi_caller()
+    return _pokeapi_caller
+
+
+def create_http_session() -> aiohttp.ClientSession:
+    """Build a pooled session that keeps connections to PokeAPI alive between lookups."""
+    connector = aiohttp.TCPConnector(
+        limit=settings.HTTP_POOL_LIMIT,
+        limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+        ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+        keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=http_timeout())
+
+
+async def open_http_session() -> None:
+    """Create the application-lifetime session; called from the FastAPI lifespan."""
+    global _http_session, _pokemon_service
+    if _http_session is None or _http_session.closed:
+        _http_session = create_http_session()
+        _pokemon_service = PokemonService(session=_http_session, caller=get_pokeapi_caller())
+        logger.info("Opened shared PokeAPI HTTP session")
+
+
+async def close_http_session() -> None:
+    global _http_session, _pokemon_service
+    if _http_session is not None:
+        await _http_session.close()
+        logger.info("Closed shared PokeAPI HTTP session")
+    _http_session = None
+    _pokemon_service = None
+
+
 async def get_pokemon_service() -> PokemonService:
-    return PokemonService()
+    if _pokemon_service is not None:
+        return _pokemon_service
+    # Short-lived sessions still count failures against the shared breaker
+    return PokemonService(caller=get_pokeapi_caller())
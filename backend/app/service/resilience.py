@@ -0,0 +1,182 @@
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, TypeVar
+import aiohttp
+from app.config.logging import setup_logger
+from app.config.metrics import CIRCUIT_STATE, UPSTREAM_HEDGES, UPSTREAM_RETRIES
+
+logger = setup_logger("resilience")
+
+T = TypeVar("T")
+
+# Upstream statuses worth another attempt: rate limiting and transient server/gateway failures
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Values of the CIRCUIT_STATE gauge
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(f"{upstream} is unavailable, retry in {retry_after:.0f}s")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether a failed call may succeed if repeated: timeouts, dropped connections and 429/5xx answers."""
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in RETRYABLE_STATUSES
+    return isinstance(error, aiohttp.ClientError)
+
+
+def backoff_delay(attempt: int, base: float, cap: float, rng: Callable[[], float] = random.random) -> float:
+    """Exponential backoff with full jitter: uniform in [0, min(cap, base * 2**attempt))."""
+    return rng() * min(cap, base * 2 ** attempt)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` failures in a row the circuit opens and calls
+    are rejected for ``reset_timeout`` seconds. The first call after that is
+    let through as a probe (half-open): success closes the circuit, failure
+    opens it again. Other calls are rejected while the probe is in flight,
+    or until another ``reset_timeout`` has passed if the probe never reports.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_started: float | None = None
+        self._set_state(CLOSED)
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        CIRCUIT_STATE.labels(upstream=self.name).set(STATE_VALUES[state])
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError if the call must not reach the upstream."""
+        if self.state == CLOSED:
+            return
+        now = self.clock()
+        if self.state == OPEN and now - self.opened_at >= self.reset_timeout:
+            logger.info(f"Circuit for {self.name} half-open, letting a probe through")
+            self._set_state(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._probe_started is None or now - self._probe_started >= self.reset_timeout:
+                self._probe_started = now
+                return
+            raise CircuitOpenError(self.name, self._probe_started + self.reset_timeout - now)
+        raise CircuitOpenError(self.name, self.opened_at + self.reset_timeout - now)
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._probe_started = None
+        if self.state != CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+            self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_started = None
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning(f"Circuit for {self.name} opened after {self.failures} consecutive failures")
+            self.opened_at = self.clock()
+            self._set_state(OPEN)
+
+
+async def hedged(attempt: Callable[[], Awaitable[T]], delay: float, upstream: str) -> T:
+    """Run ``attempt``, starting a second copy if the first has not finished after ``delay`` seconds.
+
+    The first copy to succeed wins and the other is cancelled; the call only
+    fails if both do. Only safe for idempotent requests.
+    """
+    first = asyncio.ensure_future(attempt())
+    tasks = {first}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done:
+            return first.result()
+
+        UPSTREAM_HEDGES.labels(upstream=upstream).inc()
+        tasks.add(asyncio.ensure_future(attempt()))
+        error: BaseException | None = None
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+class ResilientCaller:
+    """Retries, circuit breaking and optional hedging around calls to one upstream.
+
+    Only retryable failures (see ``is_retryable``) count against the
+    breaker; any other outcome, including a 404, shows the upstream is up.
+    Retries stop early once the breaker opens.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        breaker: CircuitBreaker,
+        retries: int = 2,
+        backoff: float = 0.2,
+        backoff_max: float = 2.0,
+        hedge_delay: float = 0.0,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep
+    ):
+        self.name = name
+        self.breaker = breaker
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.hedge_delay = hedge_delay
+        self.sleep = sleep
+
+    async def call(self, attempt: Callable[[], Awaitable[T]]) -> T:
+        for attempt_number in range(self.retries + 1):
+            self.breaker.before_call()
+            try:
+                if self.hedge_delay > 0:
+                    result = await hedged(attempt, self.hedge_delay, self.name)
+                else:
+                    result = await attempt()
+            except Exception as e:
+                if not is_retryable(e):
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt_number == self.retries or self.breaker.state == OPEN:
+                    raise
+                delay = backoff_delay(attempt_number, self.backoff, self.backoff_max)
+                UPSTREAM_RETRIES.labels(upstream=self.name).inc()
+                logger.warning(f"Retrying {self.name} call in {delay:.2f}s after error: {str(e) or type(e).__name__}")
+                await self.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
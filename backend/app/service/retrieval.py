@@ -0,0 +1,215 @@
+import heapq
+import json
+import math
+import re
+from array import array
+from collections import defaultdict
+from app.config.env import settings
+from app.config.logging import setup_logger
+from app.service.pokedex import CodeListColumn, Vocabulary, get_pokedex_store
+from app.service.snapshot import Snapshot, SnapshotError, SnapshotWriter, get_snapshot
+
+logger = setup_logger("retrieval")
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+(?:-[^\W_]+)*")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "best", "build", "by", "can", "do", "for",
+    "from", "has", "how", "i", "in", "is", "it", "me", "my", "of", "on", "or", "please",
+    "pokemon", "pokémon", "should", "some", "team", "that", "the", "to", "use", "what",
+    "which", "who", "with", "you",
+}
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens; hyphenated words also yield their parts."""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        tokens.append(token)
+        if "-" in token:
+            tokens.extend(part for part in token.split("-") if part not in STOPWORDS)
+    return tokens
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token estimate (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+class DescriptionRetriever:
+    """BM25 index over Pokemon descriptions and their parsed records.
+
+    Names, types, roles and abilities from the parsed record are indexed a
+    second time on top of the description text, which boosts those fields.
+    Postings are kept as parallel (doc id, term frequency) code lists per
+    term, so the index can be saved to and mapped from a snapshot.
+    """
+
+    def __init__(self, descriptions: list[str], records: list[dict], k1: float = 1.2, b: float = 0.75):
+        postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        doc_lengths = array("L")
+        strengths = []
+        for doc_id, description in enumerate(descriptions):
+            record = records[doc_id] if doc_id < len(records) else {}
+            tokens = tokenize(description) + tokenize(" ".join(self._record_fields(record)))
+            doc_lengths.append(len(tokens))
+
+            term_counts: dict[str, int] = defaultdict(int)
+            for token in tokens:
+                term_counts[token] += 1
+            for term, count in term_counts.items():
+                postings[term].append((doc_id, count))
+
+            strengths.append(sum((record.get("stats") or {}).values()))
+
+        terms = Vocabulary()
+        posting_docs = CodeListColumn("H")
+        posting_tfs = CodeListColumn("H")
+        for term, docs in postings.items():
+            terms.encode(term)
+            posting_docs.append([doc_id for doc_id, _ in docs])
+            posting_tfs.append([count for _, count in docs])
+
+        # Used to pick a sensible default context when nothing in the query matches
+        fallback_order = array("H", sorted(range(len(descriptions)), key=lambda i: strengths[i], reverse=True))
+        self.records = records
+        self._set_index(descriptions, terms, posting_docs, posting_tfs, doc_lengths, fallback_order, k1, b)
+
+    def _set_index(
+        self,
+        descriptions: list[str],
+        terms: Vocabulary,
+        posting_docs: CodeListColumn,
+        posting_tfs: CodeListColumn,
+        doc_lengths,
+        fallback_order,
+        k1: float,
+        b: float
+    ) -> None:
+        self.descriptions = descriptions
+        self.terms = terms
+        self.posting_docs = posting_docs
+        self.posting_tfs = posting_tfs
+        self.doc_lengths = doc_lengths
+        self.fallback_order = fallback_order
+        self.k1 = k1
+        self.b = b
+
+        self.avg_doc_length = sum(doc_lengths) / len(doc_lengths) if len(doc_lengths) else 0.0
+        offsets = posting_docs.offsets
+        self.idf = [
+            math.log(1 + (len(descriptions) - doc_count + 0.5) / (doc_count + 0.5))
+            for doc_count in (offsets[i + 1] - offsets[i] for i in range(len(terms)))
+        ]
+        self.full_context_tokens = estimate_tokens(str(descriptions))
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Snapshot, records: list[dict] | None = None) -> "DescriptionRetriever":
+        """Load a prebuilt index whose postings are views into a memory-mapped snapshot.
+
+        ``records`` are the parsed records the index was built from, in doc id
+        order; they are only needed by ``select_records``.
+        """
+        retriever = cls.__new__(cls)
+        retriever.records = records or []
+        retriever._set_index(
+            snapshot.strings("bm25.descriptions"),
+            Vocabulary(snapshot.strings("bm25.terms")),
+            CodeListColumn.from_buffers(snapshot.array("bm25.docs.codes"), snapshot.array("bm25.docs.offsets")),
+            CodeListColumn.from_buffers(snapshot.array("bm25.tfs.codes"), snapshot.array("bm25.tfs.offsets")),
+            snapshot.array("bm25.doc_lengths"),
+            snapshot.array("bm25.fallback_order"),
+            snapshot.meta["bm25"]["k1"],
+            snapshot.meta["bm25"]["b"],
+        )
+        return retriever
+
+    def to_snapshot(self, writer: SnapshotWriter) -> dict:
+        """Add the index sections to ``writer`` and return the parameters to store in its metadata."""
+        writer.add_strings("bm25.descriptions", self.descriptions)
+        writer.add_strings("bm25.terms", self.terms.values)
+        for name, column in (("docs", self.posting_docs), ("tfs", self.posting_tfs)):
+            writer.add_array(f"bm25.{name}.codes", column.codes)
+            writer.add_array(f"bm25.{name}.offsets", column.offsets)
+        writer.add_array("bm25.doc_lengths", self.doc_lengths)
+        writer.add_array("bm25.fallback_order", self.fallback_order)
+        return {"k1": self.k1, "b": self.b}
+
+    @staticmethod
+    def _record_fields(record: dict) -> list[str]:
+        fields = [record.get("pokemon_name", ""), record.get("pokemon_species", "")]
+        fields.extend(record.get("types", []))
+        fields.extend(record.get("role_type", []))
+        fields.extend(record.get("abilities", {}).keys())
+        return fields
+
+    def _query_terms(self, query: str) -> set[str]:
+        terms = set()
+        for token in tokenize(query):
+            # Cheap plural folding so "sweepers" or "dragons" still match
+            if token not in self.terms.codes and token.endswith("s") and token[:-1] in self.terms.codes:
+                token = token[:-1]
+            terms.add(token)
+        return terms
+
+    def score(self, query: str) -> dict[int, float]:
+        scores: dict[int, float] = defaultdict(float)
+        for term in self._query_terms(query):
+            term_id = self.terms.codes.get(term)
+            if term_id is None:
+                continue
+            idf = self.idf[term_id]
+            for doc_id, tf in zip(self.posting_docs.get(term_id), self.posting_tfs.get(term_id)):
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / self.avg_doc_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+    def top_k_ids(self, query: str, k: int) -> list[int]:
+        scores = self.score(query)
+        ranked = heapq.nlargest(k, scores, key=lambda doc_id: (scores[doc_id], -doc_id))
+        if len(ranked) < k:
+            seen = set(ranked)
+            ranked.extend(doc_id for doc_id in self.fallback_order[: k + len(seen)] if doc_id not in seen)
+        return ranked[:k]
+
+    def select_ids(self, query: str, k: int | None = None, mode: str | None = None) -> list[int]:
+        """Return the doc ids to send to the LLM for this query, most relevant first."""
+        k = k or settings.RETRIEVAL_TOP_K
+        mode = mode or settings.RETRIEVAL_MODE
+        if mode == "all":
+            return list(range(len(self.descriptions)))
+        if mode != "bm25":
+            raise ValueError(f"Unknown retrieval mode: {mode}")
+        return self.top_k_ids(query, k)
+
+    def select(self, query: str, k: int | None = None, mode: str | None = None) -> list[str]:
+        """Return the descriptions to send to the LLM for this query."""
+        return [self.descriptions[doc_id] for doc_id in self.select_ids(query, k, mode)]
+
+    def select_records(self, query: str, k: int | None = None, mode: str | None = None) -> list[dict]:
+        """Return the parsed records to send to the LLM for this query, most relevant first."""
+        return [self.records[doc_id] for doc_id in self.select_ids(query, k, mode) if doc_id < len(self.records)]
+
+
+_description_retriever: DescriptionRetriever | None = None
+
+
+def get_description_retriever() -> DescriptionRetriever:
+    """Return the process-wide retriever, loading it from the snapshot or building the index on first use."""
+    global _description_retriever
+    if _description_retriever is None:
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            try:
+                _description_retriever = DescriptionRetriever.from_snapshot(snapshot, get_pokedex_store().records)
+                logger.info(f"Loaded retrieval index over {len(_description_retriever.descriptions)} descriptions from snapshot")
+                return _description_retriever
+            except (KeyError, SnapshotError) as e:
+                logger.warning(f"Could not load retrieval index from snapshot, rebuilding it: {str(e)}")
+        with open(settings.POKEMON_DESCRIPTIONS_PATH, "r") as f:
+            descriptions = json.load(f)
+        _description_retriever = DescriptionRetriever(descriptions, get_pokedex_store().records)
+        logger.info(f"Built retrieval index over {len(descriptions)} descriptions")
+    return _description_retriever
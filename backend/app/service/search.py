@@ -0,0 +1,268 @@
+import copy
+import re
+import numpy as np
+from app.config.logging import setup_logger
+from app.service.pokedex import PokedexStore, PokemonRecord, STAT_NAMES, MISSING, get_pokedex_store
+from app.service.retrieval import STOPWORDS, TOKEN_PATTERN
+from app.utils.bulk_pokedex import as_numpy
+
+logger = setup_logger("search")
+
+# Filter name -> (vocabulary, code-list column) on PokedexStore; also the priority order for keywords
+TERM_FIELDS = {
+    "type": ("types", "type_lists"),
+    "role": ("roles", "role_lists"),
+    "ability": ("abilities", "ability_lists"),
+    "move": ("moves", "move_lists"),
+}
+
+NUMERIC_FIELDS = (*STAT_NAMES, "total", "base_experience", "height", "weight", "pokemon_id")
+
+# Spellings accepted for numeric fields besides their canonical name
+FIELD_ALIASES = {
+    **{stat.replace("-", "_"): stat for stat in STAT_NAMES},
+    "base-experience": "base_experience",
+    "id": "pokemon_id",
+    "pokemon-id": "pokemon_id",
+}
+
+# Words that describe a filter rather than name one ("fire types with levitate")
+QUERY_FILLER = {"type", "types", "with", "move", "moves", "knows", "ability", "abilities", "role", "roles"}
+
+PREDICATE_PATTERN = re.compile(r"^\s*([a-z_-]+)\s*(>=|<=|>|<|=)\s*(-?\d+(?:\.\d+)?)\s*$")
+
+
+class SearchQueryError(ValueError):
+    """Raised for malformed filters, e.g. an unknown stat or predicate syntax."""
+
+
+def normalize_term(value: str) -> str:
+    """Lowercase and hyphenate, so "Glass Cannon", "glass_cannon" and "glass-cannon" are the same term."""
+    return re.sub(r"[\s_]+", "-", value.strip().lower())
+
+
+def numeric_field(name: str) -> str:
+    """Canonical numeric field for a user-supplied name, e.g. "special_attack" -> "special-attack"."""
+    name = name.strip().lower()
+    name = FIELD_ALIASES.get(name, name)
+    if name not in NUMERIC_FIELDS:
+        raise SearchQueryError(f"Unknown stat {name!r}, expected one of {', '.join(NUMERIC_FIELDS)}")
+    return name
+
+
+class PokedexSearchIndex:
+    """Inverted and sorted indexes over a PokedexStore for filter queries.
+
+    Every type, role, ability and move maps to the sorted positions of the
+    Pokemon that have it; filters are intersected as boolean masks. Each
+    numeric field keeps its values plus ascending and descending argsort
+    orders, so range predicates are two binary searches and sorting a result
+    set is one pass over the precomputed order.
+    """
+
+    def __init__(self, store: PokedexStore):
+        self.store = store
+        self.size = len(store)
+        self.postings = {
+            field: self._build_postings(getattr(store, vocabulary), getattr(store, column))
+            for field, (vocabulary, column) in TERM_FIELDS.items()
+        }
+
+        stats = {stat: as_numpy(store.stats[stat]).astype(np.float64) for stat in STAT_NAMES}
+        for values in stats.values():
+            values[values == MISSING] = np.nan
+        self.values = {
+            **stats,
+            "total": np.nansum(np.column_stack(list(stats.values())), axis=1) if self.size else np.zeros(0),
+            "base_experience": self._numeric(store.base_experience),
+            "height": self._numeric(store.heights),
+            "weight": self._numeric(store.weights),
+            "pokemon_id": self._numeric(store.pokemon_ids),
+        }
+        self._sort()
+
+    def _sort(self) -> None:
+        # Stable sorts keep ties in store order; NaN (missing) sorts last in both directions
+        self.ascending = {name: np.argsort(values, kind="stable") for name, values in self.values.items()}
+        self.descending = {name: np.argsort(-values, kind="stable") for name, values in self.values.items()}
+        self.sorted_values = {name: self.values[name][order] for name, order in self.ascending.items()}
+
+    @staticmethod
+    def _numeric(column) -> np.ndarray:
+        values = as_numpy(column).astype(np.float64)
+        values[values == MISSING] = np.nan
+        return values
+
+    def _row_values(self, position: int) -> dict[str, float]:
+        """Numeric fields of one Pokemon, with missing values as NaN like the column arrays."""
+        def numeric(value: int) -> float:
+            return np.nan if value == MISSING else float(value)
+
+        stats = {stat: numeric(self.store.stats[stat][position]) for stat in STAT_NAMES}
+        return {
+            **stats,
+            "total": float(np.nansum(list(stats.values()))),
+            "base_experience": numeric(self.store.base_experience[position]),
+            "height": numeric(self.store.heights[position]),
+            "weight": numeric(self.store.weights[position]),
+            "pokemon_id": numeric(self.store.pokemon_ids[position]),
+        }
+
+    def extended(self) -> "PokedexSearchIndex":
+        """A copy that also covers Pokemon added to the store since this index was built.
+
+        New positions are appended to the posting lists of their own terms
+        and the numeric orders are re-sorted, instead of rebuilding every
+        posting list from the store.
+        """
+        index = copy.copy(self)
+        positions = range(self.size, len(self.store))
+        index.size = len(self.store)
+        index.postings = {field: dict(postings) for field, postings in self.postings.items()}
+        for field, (vocabulary, column) in TERM_FIELDS.items():
+            vocabulary, column, postings = getattr(self.store, vocabulary), getattr(self.store, column), index.postings[field]
+            for position in positions:
+                for term in {normalize_term(vocabulary.decode(code)) for code in column.get(position)}:
+                    existing = postings.get(term, np.zeros(0, dtype=np.int32))
+                    postings[term] = np.append(existing, np.int32(position)).astype(existing.dtype)
+        rows = [self._row_values(position) for position in positions]
+        index.values = {name: np.append(values, [row[name] for row in rows]) for name, values in self.values.items()}
+        index._sort()
+        return index
+
+    def _build_postings(self, vocabulary, column) -> dict[str, np.ndarray]:
+        codes = as_numpy(column.codes)
+        offsets = as_numpy(column.offsets)
+        rows = np.repeat(np.arange(self.size, dtype=np.int32), np.diff(offsets).astype(np.int64))
+        # Group rows by code: a stable sort keeps each posting list in ascending position order
+        by_code = np.argsort(codes, kind="stable")
+        boundaries = np.searchsorted(codes[by_code], np.arange(len(vocabulary) + 1))
+        postings = {}
+        for code, value in enumerate(vocabulary.values):
+            positions = np.unique(rows[by_code[boundaries[code]:boundaries[code + 1]]])
+            postings[normalize_term(value)] = positions
+        return postings
+
+    def term_mask(self, field: str, value: str) -> np.ndarray:
+        """Pokemon having ``value`` for ``field``; "a|b" matches either."""
+        mask = np.zeros(self.size, dtype=bool)
+        for alternative in value.split("|"):
+            positions = self.postings[field].get(normalize_term(alternative))
+            if positions is not None:
+                mask[positions] = True
+        return mask
+
+    def range_mask(self, predicate: str) -> np.ndarray:
+        """Pokemon matching a predicate such as ``speed>=100`` (missing values never match)."""
+        match = PREDICATE_PATTERN.match(predicate.lower())
+        if match is None:
+            raise SearchQueryError(f"Invalid stat filter {predicate!r}, expected e.g. 'speed>=100'")
+        name, operator, number = numeric_field(match.group(1)), match.group(2), float(match.group(3))
+
+        sorted_values = self.sorted_values[name]
+        start, end = 0, int(np.count_nonzero(~np.isnan(sorted_values)))
+        if operator in (">=", "="):
+            start = int(np.searchsorted(sorted_values[:end], number, side="left"))
+        elif operator == ">":
+            start = int(np.searchsorted(sorted_values[:end], number, side="right"))
+        if operator in ("<=", "="):
+            end = int(np.searchsorted(sorted_values[:end], number, side="right"))
+        elif operator == "<":
+            end = int(np.searchsorted(sorted_values[:end], number, side="left"))
+
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.ascending[name][start:end]] = True
+        return mask
+
+    def resolve_keywords(self, query: str) -> tuple[list[tuple[str, str]], list[str]]:
+        """Map free-text words onto known types, roles, abilities and moves.
+
+        Returns the (field, term) filters found and the words that matched
+        nothing. Two-word terms ("glass cannon", "stealth rock") are tried
+        before single words, and plurals fall back to their singular.
+        """
+        tokens = [token for token in TOKEN_PATTERN.findall(query.lower()) if token not in STOPWORDS and token not in QUERY_FILLER]
+        filters, ignored = [], []
+        i = 0
+        while i < len(tokens):
+            for width in (2, 1):
+                match = self._lookup_keyword("-".join(tokens[i:i + width])) if i + width <= len(tokens) else None
+                if match is not None:
+                    filters.append(match)
+                    i += width
+                    break
+            else:
+                ignored.append(tokens[i])
+                i += 1
+        return filters, ignored
+
+    def _lookup_keyword(self, term: str) -> tuple[str, str] | None:
+        candidates = [term, term[:-1]] if term.endswith("s") else [term]
+        for candidate in candidates:
+            for field in TERM_FIELDS:
+                if candidate in self.postings[field]:
+                    return field, candidate
+        return None
+
+    def search(
+        self,
+        terms: dict[str, list[str]] | None = None,
+        predicates: list[str] | None = None,
+        query: str | None = None,
+        sort: str = "pokemon_id",
+        offset: int = 0,
+        limit: int = 20
+    ) -> dict:
+        """Positions of the Pokemon matching every filter, sorted and paginated."""
+        descending = sort.startswith("-")
+        sort_field = numeric_field(sort.lstrip("-+"))
+
+        filters = [(field, value) for field, values in (terms or {}).items() for value in values]
+        ignored: list[str] = []
+        if query:
+            keyword_filters, ignored = self.resolve_keywords(query)
+            filters.extend(keyword_filters)
+
+        mask = np.ones(self.size, dtype=bool)
+        for field, value in filters:
+            mask &= self.term_mask(field, value)
+        for predicate in predicates or []:
+            mask &= self.range_mask(predicate)
+
+        order = (self.descending if descending else self.ascending)[sort_field]
+        matches = order[mask[order]]
+        return {
+            "total": int(matches.size),
+            "positions": matches[offset:offset + limit].tolist(),
+            "filters": [{"field": field, "value": value} for field, value in filters],
+            "ignored_terms": ignored,
+        }
+
+    def summary(self, position: int) -> dict:
+        """Compact result row (no move list) for one Pokemon."""
+        record = PokemonRecord(self.store, position)
+        stats = record["stats"]
+        return {
+            "pokemon_name": record["pokemon_name"],
+            "pokemon_id": record["pokemon_id"],
+            "types": record["types"],
+            "abilities": list(record["abilities"]),
+            "role_type": record["role_type"],
+            "stats": stats,
+            "total": sum(stats.values()),
+        }
+
+
+_search_index: PokedexSearchIndex | None = None
+
+
+async def get_search_index() -> PokedexSearchIndex:
+    """Return the process-wide search index, extending it with Pokemon written back to the store."""
+    global _search_index
+    store = get_pokedex_store()
+    if _search_index is None or _search_index.store is not store:
+        _search_index = PokedexSearchIndex(store)
+        logger.info(f"Built search index over {len(store)} Pokemon")
+    elif _search_index.size != len(store):
+        _search_index = _search_index.extended()
+    return _search_index
@@ -0,0 +1,198 @@
+"""
+Binary snapshot of the Pokedex store and retrieval index, so workers start without parsing JSON.
+
+Compile it from all_parsed_data.json and all_pokemon_descriptions.json with:
+
+    python -m app.utils.build_snapshot
+
+File layout: 8-byte magic, little-endian uint32 header length, JSON header,
+then sections aligned to 8 bytes. Each section is a raw typed array described
+in the header by offset, byte length and array typecode; string lists are
+NUL-separated UTF-8. The file is mmap'd read-only, so numeric columns are
+views into the shared page cache rather than per-worker copies.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from app.config.env import settings
+from app.config.logging import setup_logger
+
+logger = setup_logger("snapshot")
+
+MAGIC = b"PKDXSNP\x01"
+FORMAT_VERSION = 1
+ALIGNMENT = 8
+HEADER_LENGTH = struct.Struct("<I")
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def file_stamp(path: str) -> list[int] | None:
+    """(size, mtime_ns) of a source file, used to detect snapshots older than their JSON."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def writable_array(column) -> array:
+    """Copy a snapshot-backed memoryview into a growable array; arrays are returned as-is."""
+    if isinstance(column, array):
+        return column
+    copy = array(column.format)
+    copy.frombytes(column.tobytes())
+    return copy
+
+
+class SnapshotWriter:
+    """Collects typed-array and string sections and writes them as one snapshot file."""
+
+    def __init__(self):
+        self.sections: dict[str, tuple[str, int, bytes, int | None]] = {}
+
+    def add_array(self, name: str, column) -> None:
+        typecode = column.typecode if isinstance(column, array) else column.format
+        self.sections[name] = (typecode, column.itemsize, column.tobytes(), None)
+
+    def add_strings(self, name: str, values: list[str]) -> None:
+        if any("\0" in value for value in values):
+            raise SnapshotError(f"Section {name} contains a NUL character")
+        self.sections[name] = ("B", 1, "\0".join(values).encode("utf-8"), len(values))
+
+    def write(self, path: str, meta: dict | None = None) -> None:
+        """Write the snapshot atomically (temp file in the same directory, then rename)."""
+        header = {
+            "version": FORMAT_VERSION,
+            "byteorder": sys.byteorder,
+            "meta": meta or {},
+            "sections": {},
+        }
+        # Offsets are relative to the end of the header so they do not depend on its length
+        offset = 0
+        for name, (typecode, itemsize, data, count) in self.sections.items():
+            offset += -offset % ALIGNMENT
+            header["sections"][name] = {
+                "offset": offset, "length": len(data), "format": typecode, "itemsize": itemsize, "count": count,
+            }
+            offset += len(data)
+
+        header_bytes = json.dumps(header).encode("utf-8")
+        prefix_length = len(MAGIC) + HEADER_LENGTH.size + len(header_bytes)
+        padding = -prefix_length % ALIGNMENT
+
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile("wb", dir=directory, suffix=".tmp", delete=False) as f:
+            try:
+                f.write(MAGIC)
+                f.write(HEADER_LENGTH.pack(len(header_bytes) + padding))
+                f.write(header_bytes + b" " * padding)
+                position = 0
+                for name, (_, _, data, _) in self.sections.items():
+                    section_offset = header["sections"][name]["offset"]
+                    f.write(b"\0" * (section_offset - position))
+                    f.write(data)
+                    position = section_offset + len(data)
+                f.flush()
+                os.fsync(f.fileno())
+            except BaseException:
+                os.unlink(f.name)
+                raise
+        # NamedTemporaryFile creates 0600 files; workers may run as another user
+        os.chmod(f.name, 0o644)
+        os.replace(f.name, path)
+
+
+class Snapshot:
+    """Read-only, memory-mapped snapshot file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:
+                raise SnapshotError(f"Snapshot {path} is empty") from e
+        self._buffer = memoryview(self._mmap)
+
+        prefix_length = len(MAGIC) + HEADER_LENGTH.size
+        if len(self._buffer) < prefix_length or self._buffer[:len(MAGIC)] != MAGIC:
+            raise SnapshotError(f"{path} is not a Pokedex snapshot")
+        (header_length,) = HEADER_LENGTH.unpack_from(self._buffer, len(MAGIC))
+        self._data_start = prefix_length + header_length
+        try:
+            header = json.loads(bytes(self._buffer[prefix_length:self._data_start]))
+        except ValueError as e:
+            raise SnapshotError(f"Snapshot {path} has a corrupt header") from e
+
+        if header.get("version") != FORMAT_VERSION:
+            raise SnapshotError(f"Snapshot {path} has unsupported version {header.get('version')}")
+        if header.get("byteorder") != sys.byteorder:
+            raise SnapshotError(f"Snapshot {path} was built on a {header.get('byteorder')}-endian machine")
+        self.meta: dict = header["meta"]
+        self.sections: dict[str, dict] = header["sections"]
+
+    def _section(self, name: str) -> dict:
+        section = self.sections.get(name)
+        if section is None:
+            raise SnapshotError(f"Snapshot {self.path} has no section {name}")
+        if struct.calcsize(section["format"]) != section["itemsize"]:
+            raise SnapshotError(f"Section {name} uses a {section['itemsize']}-byte {section['format']!r}, "
+                                f"which is {struct.calcsize(section['format'])} bytes here")
+        end = self._data_start + section["offset"] + section["length"]
+        if end > len(self._buffer):
+            raise SnapshotError(f"Snapshot {self.path} is truncated")
+        return section
+
+    def array(self, name: str) -> memoryview:
+        """Zero-copy typed view of a section."""
+        section = self._section(name)
+        start = self._data_start + section["offset"]
+        return self._buffer[start:start + section["length"]].cast(section["format"])
+
+    def strings(self, name: str) -> list[str]:
+        section = self._section(name)
+        if not section["count"]:
+            return []
+        return str(self.array(name), "utf-8").split("\0")
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.sections
+
+
+_snapshot: Snapshot | None = None
+_snapshot_checked = False
+
+
+def get_snapshot() -> Snapshot | None:
+    """Return the process-wide snapshot, or None if it is missing, unreadable or older than the JSON datasets."""
+    global _snapshot, _snapshot_checked
+    if _snapshot_checked:
+        return _snapshot
+    _snapshot_checked = True
+
+    path = settings.POKEDEX_SNAPSHOT_PATH
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        snapshot = Snapshot(path)
+    except (OSError, SnapshotError) as e:
+        logger.warning(f"Ignoring Pokedex snapshot: {str(e)}")
+        return None
+
+    sources = snapshot.meta.get("sources", {})
+    for key, source_path in (("data", settings.POKEDEX_DATA_PATH), ("descriptions", settings.POKEMON_DESCRIPTIONS_PATH)):
+        stamp = file_stamp(source_path)
+        if stamp is not None and stamp != sources.get(key):
+            logger.warning(f"Pokedex snapshot {path} is older than {source_path}, loading JSON instead; "
+                           f"rebuild it with python -m app.utils.build_snapshot")
+            return None
+
+    _snapshot = snapshot
+    return _snapshot
@@ -0,0 +1,339 @@
+import copy
+import re
+import numpy as np
+from typing import Iterator
+from app.config.env import settings
+from app.config.logging import setup_logger
+from app.service.counters import CounterEngine, PAD, get_counter_engine
+from app.service.pokedex import PokemonRecord
+from app.service.retrieval import TOKEN_PATTERN
+from app.utils.bulk_pokedex import ROLE_NAMES, as_numpy, role_masks, stat_matrix
+from app.utils.parse_pokemon_data import assign_roles
+from app.utils.type_chart import EFFECTIVENESS, TYPE_INDEX, TYPE_NAMES
+
+logger = setup_logger("team_optimizer")
+
+TEAM_SIZE = 6
+
+# Team score weights; coverage, resistances and roles are fractions in [0, 1]
+COVERAGE_WEIGHT = 3.0
+RESISTANCE_WEIGHT = 2.0
+ROLE_WEIGHT = 1.5
+STATS_WEIGHT = 2.0
+BALANCE_WEIGHT = 1.0
+# Per member beyond two that shares a weakness, and per unmet required type or role
+SHARED_WEAKNESS_PENALTY = 0.5
+MISSING_REQUIREMENT_PENALTY = 10.0
+
+ROLE_KEYS = {re.sub(r"\s+", "-", role.lower()): role for role in ROLE_NAMES}
+
+
+class TeamQueryError(ValueError):
+    """Raised when team constraints name unknown Pokemon, types or roles, or cannot be met."""
+
+
+def bits(mask: int, names: tuple[str, ...]) -> list[str]:
+    return [name for index, name in enumerate(names) if mask >> index & 1]
+
+
+def ranked(scores: np.ndarray, shortlist: int) -> Iterator[int]:
+    """Indices of ``scores`` from best to worst, sorting everything only if the shortlist runs out.
+
+    The fallback repeats the shortlist, so callers must skip what they have seen.
+    """
+    shortlist = min(shortlist, scores.size)
+    best = np.argpartition(-scores, shortlist - 1)[:shortlist]
+    yield from best[np.argsort(-scores[best], kind="stable")].tolist()
+    if shortlist < scores.size:
+        yield from np.argsort(-scores, kind="stable").tolist()
+
+
+class TeamOptimizer:
+    """Beam search for six-member teams over precomputed per-Pokemon bitsets.
+
+    For each Pokemon the optimizer keeps 18-bit masks of the types its own
+    types hit super effectively, the attacking types it resists, its own
+    types, and a role mask from the same thresholds as ``assign_roles``. A
+    team's coverage is the OR of its members' masks, so growing every partial
+    team in the beam by every candidate is a vectorized OR and popcount.
+    Weaknesses are kept as per-type counts so teams stacking the same
+    weakness are penalised.
+    """
+
+    def __init__(self, engine: CounterEngine):
+        self.engine = engine
+        self.store = engine.store
+        self.size = engine.size
+
+        self.offense_bits, self.resist_bits, self.weaknesses, self.type_bits = self._type_features(engine.type_slots, engine.defense_profiles)
+        self.role_bits = (role_masks(self.store) @ np.left_shift(1, np.arange(len(ROLE_NAMES)))).astype(np.int64)
+
+        self.stats = stat_matrix(self.store).astype(np.float32)
+        self.totals = self.stats.sum(axis=1)
+        self.max_total = float(self.totals.max()) if self.size else 1.0
+        self.species = as_numpy(self.store.species_codes).astype(np.int64)
+
+    @staticmethod
+    def _type_features(type_slots: np.ndarray, defense_profiles: np.ndarray) -> tuple[np.ndarray, ...]:
+        """Offense, resistance and own-type masks plus weakness counts for rows of the counter engine."""
+        weights = np.left_shift(1, np.arange(len(TYPE_NAMES), dtype=np.int64))
+        hits = np.vstack([EFFECTIVENESS > 1, np.zeros((1, len(TYPE_NAMES)), dtype=bool)])
+        offense_bits = (hits[type_slots].any(axis=1) @ weights).astype(np.int64)
+        resist_bits = ((defense_profiles < 1).T @ weights).astype(np.int64)
+        weaknesses = (defense_profiles > 1).T.astype(np.int16)
+        type_bits = np.zeros(len(type_slots), dtype=np.int64)
+        for slot in type_slots.T:
+            type_bits |= np.where(slot != PAD, np.left_shift(1, np.minimum(slot, PAD - 1)), 0)
+        return offense_bits, resist_bits, weaknesses, type_bits
+
+    def extended(self, engine: CounterEngine) -> "TeamOptimizer":
+        """A copy over ``engine``, an extension of this optimizer's engine, computing only the new rows."""
+        optimizer = copy.copy(self)
+        optimizer.engine = engine
+        optimizer.size = engine.size
+        new = slice(self.size, engine.size)
+        features = self._type_features(engine.type_slots[new], engine.defense_profiles[:, new])
+        optimizer.offense_bits, optimizer.resist_bits, optimizer.weaknesses, optimizer.type_bits = (
+            np.concatenate([old, added]) for old, added in zip(
+                (self.offense_bits, self.resist_bits, self.weaknesses, self.type_bits), features
+            )
+        )
+        role_index = {role: i for i, role in enumerate(ROLE_NAMES)}
+        records = [PokemonRecord(self.store, position) for position in range(self.size, engine.size)]
+        role_bits = [
+            sum(1 << role_index[role] for role in set(assign_roles(record["stats"], record["types"])) if role in role_index)
+            for record in records
+        ]
+        optimizer.role_bits = np.append(self.role_bits, np.array(role_bits, dtype=np.int64))
+
+        optimizer.stats = engine.stats
+        optimizer.totals = engine.totals
+        optimizer.max_total = float(engine.totals.max()) if engine.size else 1.0
+        species = [self.store.species_codes[position] for position in range(self.size, engine.size)]
+        optimizer.species = np.append(self.species, np.array(species, dtype=np.int64))
+        return optimizer
+
+    def _score(self, offense, resist, roles, types, weak_counts, stat_sums, members, required_types, required_roles):
+        """Vectorized team score; masks may have any shape, counts and stats add a trailing axis."""
+        coverage = np.bitwise_count(offense) / len(TYPE_NAMES)
+        resistance = np.bitwise_count(resist) / len(TYPE_NAMES)
+        role_diversity = np.bitwise_count(roles) / len(ROLE_NAMES)
+        stat_totals = stat_sums.sum(axis=-1)
+        strength = stat_totals / (members * self.max_total)
+        # 1 when the team's summed stats are even across all six, lower when lopsided
+        stat_means = stat_totals / stat_sums.shape[-1]
+        spread = np.sqrt(np.square(stat_sums - stat_means[..., None]).mean(axis=-1))
+        balance = 1 - spread / np.maximum(stat_means, 1)
+        shared = np.maximum(weak_counts - 2, 0).sum(axis=-1)
+        missing = np.bitwise_count(required_types & ~types) + np.bitwise_count(required_roles & ~roles)
+        return (
+            COVERAGE_WEIGHT * coverage
+            + RESISTANCE_WEIGHT * resistance
+            + ROLE_WEIGHT * role_diversity
+            + STATS_WEIGHT * strength
+            + BALANCE_WEIGHT * balance
+            - SHARED_WEAKNESS_PENALTY * shared
+            - MISSING_REQUIREMENT_PENALTY * missing
+        )
+
+    def _positions(self, names: list[str]) -> list[int]:
+        positions = []
+        for name in names:
+            position = self.store.position(name)
+            if position is None:
+                raise TeamQueryError(f"Pokemon {name} not found")
+            positions.append(position)
+        return positions
+
+    @staticmethod
+    def _mask(values: list[str], index: dict[str, int], kind: str) -> int:
+        mask = 0
+        for value in values:
+            key = re.sub(r"[\s_]+", "-", value.strip().lower())
+            if key not in index:
+                raise TeamQueryError(f"Unknown {kind} {value}, expected one of {', '.join(index)}")
+            mask |= 1 << index[key]
+        return mask
+
+    def optimize(
+        self,
+        required_types: list[str] | None = None,
+        required_roles: list[str] | None = None,
+        include: list[str] | None = None,
+        exclude: list[str] | None = None,
+        min_speed: int = 0,
+        include_forms: bool = False,
+        limit: int = 3,
+        beam_width: int | None = None,
+        pool_size: int | None = None
+    ) -> list[dict]:
+        """The ``limit`` best teams found that satisfy the constraints, best first."""
+        beam_width = beam_width or settings.TEAM_BEAM_WIDTH
+        pool_size = pool_size or settings.TEAM_POOL_SIZE
+        type_mask = self._mask(required_types or [], TYPE_INDEX, "type")
+        role_mask = self._mask(required_roles or [], {key: i for i, key in enumerate(ROLE_KEYS)}, "role")
+        included = list(dict.fromkeys(self._positions(include or [])))
+        excluded = self._positions(exclude or [])
+        if len(included) > TEAM_SIZE:
+            raise TeamQueryError(f"At most {TEAM_SIZE} Pokemon can be included")
+
+        allowed = (self.engine.speeds >= min_speed) & (self.type_bits != 0)
+        if not include_forms:
+            allowed &= ~self.engine.is_form
+        allowed[excluded] = False
+        allowed[included] = False
+        pool = self._pool(np.flatnonzero(allowed), included, type_mask, role_mask, pool_size)
+        if len(pool) + len(included) < TEAM_SIZE:
+            raise TeamQueryError("Not enough Pokemon satisfy the constraints to build a team")
+
+        # Beam state: one row per partial team, plus which pool candidates each row may not add
+        teams = [tuple(included)]
+        state = self._team_state(np.array(included, dtype=np.intp))
+        blocked = np.isin(self.species[pool], self.species[included])[None, :]
+        # One member per species, so alternate forms cannot fill a team with one Pokemon
+        same_species = self.species[pool][:, None] == self.species[pool][None, :]
+        for _ in range(TEAM_SIZE - len(included)):
+            teams, state, blocked = self._expand(teams, state, blocked, pool, same_species, type_mask, role_mask, beam_width)
+            if not teams:
+                raise TeamQueryError("Not enough distinct species satisfy the constraints to build a team")
+
+        scores = self._score(*state, TEAM_SIZE, type_mask, role_mask)
+        order = np.argsort(-scores, kind="stable")[:limit]
+        return [self._describe_team(teams[i], float(scores[i])) for i in order]
+
+    def _pool(self, candidates: np.ndarray, included: list[int], type_mask: int, role_mask: int, pool_size: int) -> np.ndarray:
+        """Strongest candidates overall, plus the strongest carriers of each required type and role."""
+        by_total = candidates[np.argsort(-self.totals[candidates], kind="stable")]
+        pool = [by_total[:pool_size]]
+        for mask, member_bits, names in ((type_mask, self.type_bits, TYPE_NAMES), (role_mask, self.role_bits, ROLE_NAMES)):
+            for bit in range(len(names)):
+                if mask >> bit & 1:
+                    carriers = by_total[(member_bits[by_total] >> bit & 1).astype(bool)]
+                    if not carriers.size and not (member_bits[included] >> bit & 1).any():
+                        raise TeamQueryError(f"No Pokemon allowed by the other constraints is {names[bit]}")
+                    pool.append(carriers[:pool_size // 4])
+        return np.unique(np.concatenate(pool))
+
+    def _team_state(self, team: np.ndarray) -> tuple[np.ndarray, ...]:
+        """Single-row beam state (OR-ed masks, summed weaknesses and stats) for a fixed set of members."""
+        return (
+            np.bitwise_or.reduce(self.offense_bits[team], initial=0, keepdims=True),
+            np.bitwise_or.reduce(self.resist_bits[team], initial=0, keepdims=True),
+            np.bitwise_or.reduce(self.role_bits[team], initial=0, keepdims=True),
+            np.bitwise_or.reduce(self.type_bits[team], initial=0, keepdims=True),
+            self.weaknesses[team].sum(axis=0, keepdims=True),
+            self.stats[team].sum(axis=0, keepdims=True),
+        )
+
+    def _expand(self, teams, state, blocked, pool, same_species, type_mask, role_mask, beam_width):
+        """Grow every team in the beam by every pool candidate at once and keep the best ``beam_width``.
+
+        Candidate features are broadcast into (beam, pool) arrays, so one
+        step is a few array operations whatever the beam width.
+        """
+        offense, resist, roles, types, weak_counts, stat_sums = state
+        grown = (
+            offense[:, None] | self.offense_bits[pool][None, :],
+            resist[:, None] | self.resist_bits[pool][None, :],
+            roles[:, None] | self.role_bits[pool][None, :],
+            types[:, None] | self.type_bits[pool][None, :],
+            weak_counts[:, None, :] + self.weaknesses[pool][None, :, :],
+            stat_sums[:, None, :] + self.stats[pool][None, :, :],
+        )
+        scores = self._score(*grown, len(teams[0]) + 1, type_mask, role_mask)
+        scores[blocked] = -np.inf
+
+        rows, columns, seen = [], [], set()
+        flat_scores = scores.ravel()
+        for flat in ranked(flat_scores, 4 * beam_width):
+            row, column = divmod(flat, len(pool))
+            if flat_scores[flat] == -np.inf:
+                break
+            # The same team is reached from different partial teams; keep it once
+            team = tuple(sorted((*teams[row], int(pool[column]))))
+            if team in seen:
+                continue
+            seen.add(team)
+            rows.append(row)
+            columns.append(column)
+            if len(rows) == beam_width:
+                break
+
+        next_teams = [tuple((*teams[row], int(pool[column]))) for row, column in zip(rows, columns)]
+        next_state = tuple(feature[rows, columns] for feature in grown)
+        return next_teams, next_state, blocked[rows] | same_species[columns]
+
+    def _describe_team(self, team: tuple[int, ...], score: float) -> dict:
+        offense = int(np.bitwise_or.reduce(self.offense_bits[list(team)]))
+        resist = int(np.bitwise_or.reduce(self.resist_bits[list(team)]))
+        roles = int(np.bitwise_or.reduce(self.role_bits[list(team)]))
+        weak_counts = self.weaknesses[list(team)].sum(axis=0)
+        members = sorted(team, key=lambda position: -self.totals[position])
+        return {
+            "members": [
+                {
+                    "pokemon_name": self.store.names.decode(self.store.name_codes[position]),
+                    "types": self.engine.target_types(position),
+                    "roles": bits(int(self.role_bits[position]), ROLE_NAMES) or ["Generic"],
+                    "total": int(self.totals[position]),
+                }
+                for position in members
+            ],
+            "score": round(score, 3),
+            "coverage": bits(offense, TYPE_NAMES),
+            "uncovered": bits(~offense & (1 << len(TYPE_NAMES)) - 1, TYPE_NAMES),
+            "resists": bits(resist, TYPE_NAMES),
+            "roles": bits(roles, ROLE_NAMES),
+            "shared_weaknesses": {TYPE_NAMES[i]: int(c) for i, c in enumerate(weak_counts) if c >= 3},
+            "average_total": round(float(self.totals[list(team)].mean()), 1),
+        }
+
+    @staticmethod
+    def parse_constraints(query: str) -> dict:
+        """Required types and roles named in a free-text team request ("a rain team with a water sweeper")."""
+        required_types, required_roles = [], []
+        tokens = [token.removesuffix("-type").removesuffix("-types") for token in TOKEN_PATTERN.findall(query.lower())]
+        for i, token in enumerate(tokens):
+            for key in ("-".join(tokens[i:i + 2]), token, token.removesuffix("s")):
+                if key in TYPE_INDEX and key not in required_types:
+                    required_types.append(key)
+                    break
+                if key in ROLE_KEYS and key not in required_roles:
+                    required_roles.append(key)
+                    break
+        return {"required_types": required_types[:TEAM_SIZE], "required_roles": required_roles}
+
+    @staticmethod
+    def describe(teams: list[dict]) -> str:
+        """Plain-text answer in the format the team-building prompt asks the LLM for."""
+        if not teams:
+            raise TeamQueryError("No team satisfies the constraints")
+        best = teams[0]
+        names = ", ".join(member["pokemon_name"].capitalize() for member in best["members"])
+        lines = [
+            f"Team: {names}.",
+            f"Together their own types hit {len(best['coverage'])} of {len(TYPE_NAMES)} types super effectively",
+        ]
+        if best["uncovered"]:
+            lines[-1] += f" (not {', '.join(best['uncovered'])})"
+        lines[-1] += f", and at least one member resists {len(best['resists'])} attacking types."
+        lines.append(f"The team covers the {', '.join(best['roles']) or 'Generic'} roles with an average base stat total of {best['average_total']:g}.")
+        if best["shared_weaknesses"]:
+            stacked = ", ".join(f"{t} ({count} members)" for t, count in best["shared_weaknesses"].items())
+            lines.append(f"Watch out for shared weaknesses to {stacked}.")
+        return " ".join(lines)
+
+
+_team_optimizer: TeamOptimizer | None = None
+
+
+async def get_team_optimizer() -> TeamOptimizer:
+    """Return the process-wide team optimizer, extended alongside the counter engine."""
+    global _team_optimizer
+    engine = await get_counter_engine()
+    if _team_optimizer is None or _team_optimizer.store is not engine.store or _team_optimizer.size > engine.size:
+        _team_optimizer = TeamOptimizer(engine)
+        logger.info(f"Built team optimizer over {engine.size} Pokemon")
+    elif _team_optimizer.engine is not engine:
+        _team_optimizer = _team_optimizer.extended(engine)
+    return _team_optimizer
@@ -0,0 +1,94 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+from app.config.env import settings
+from app.config.logging import setup_logger
+from app.utils.cache import AsyncTTLCache, PopularityTracker
+from app.utils.parse_pokemon_data import pokemon_cache, pokemon_loader, popular_pokemon
+
+logger = setup_logger("cache_warmer")
+
+
+class CacheWarmer:
+    """Periodically refreshes the most requested keys of a cache before they expire.
+
+    Every ``interval`` seconds the ``top_n`` keys of the popularity tracker
+    whose entries are missing or would expire before the next round are
+    handed to the cache's bounded background refresh, so popular lookups
+    never go stale on the request path. Keys cached as errors are skipped.
+    Counts are then decayed.
+    """
+
+    def __init__(
+        self,
+        cache: AsyncTTLCache,
+        tracker: PopularityTracker,
+        loader: Callable[[Hashable], Callable[[], Awaitable[Any]]],
+        top_n: int,
+        interval: float
+    ):
+        self.cache = cache
+        self.tracker = tracker
+        self.loader = loader
+        self.top_n = top_n
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    async def warm_once(self) -> list[asyncio.Task]:
+        """Start refreshes for popular keys that are missing or about to expire."""
+        refreshes = []
+        for key in self.tracker.top(self.top_n):
+            # A remembered "not found" would only be asked for again
+            if await self.cache.is_negative(key):
+                continue
+            if await self.cache.expires_within(key, self.interval):
+                task = self.cache.refresh(key, self.loader(key))
+                if task is not None:
+                    refreshes.append(task)
+        self.tracker.decay()
+        if refreshes:
+            logger.info(f"Warming {len(refreshes)} popular entries of the {self.cache.name} cache")
+        return refreshes
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.warm_once()
+            except Exception as e:
+                logger.error(f"Cache warming round failed: {str(e)}", exc_info=True)
+
+    def start(self) -> None:
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+_pokemon_warmer: CacheWarmer | None = None
+
+
+async def start_pokemon_warmer() -> None:
+    """Start warming popular PokeAPI lookups; called from the FastAPI lifespan."""
+    global _pokemon_warmer
+    if _pokemon_warmer is None:
+        _pokemon_warmer = CacheWarmer(
+            pokemon_cache,
+            popular_pokemon,
+            pokemon_loader,
+            settings.POKEMON_WARM_TOP_N,
+            settings.POKEMON_WARM_INTERVAL_SECONDS,
+        )
+        _pokemon_warmer.start()
+
+
+async def stop_pokemon_warmer() -> None:
+    """Stop the warmer and any refreshes still running, before the HTTP session closes."""
+    global _pokemon_warmer
+    if _pokemon_warmer is not None:
+        await _pokemon_warmer.stop()
+        _pokemon_warmer = None
+    await pokemon_cache.close()
@@ -0,0 +1,236 @@
+"""
+Offline builder that crawls PokeAPI and refreshes all_parsed_data.json and all_pokemon_descriptions.json.
+
+    python -m app.utils.build_dataset                  # full build, or incremental refresh if a state file exists
+    python -m app.utils.build_dataset --resume         # continue an interrupted run from its checkpoint
+    python -m app.utils.build_dataset --base-url http://localhost:8080/api/v2
+
+The state file keeps every parsed record together with the ETag/Last-Modified
+validators PokeAPI returned for it, so later runs only download Pokemon that
+changed. It is checkpointed while the crawl runs.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import aiohttp
+from app.config.env import settings
+from app.config.logging import setup_logger, start_logging
+from app.service.pokedex import PokedexStore
+from app.service.pokemon import PokemonService, PokemonNotFoundError, create_http_session
+from app.utils.build_snapshot import build_snapshot
+from app.utils.bulk_pokedex import generate_descriptions_bulk
+from app.utils.parse_pokemon_data import transform_pokemon_data
+
+logger = setup_logger("build_dataset")
+
+RETRYABLE_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
+
+
+def write_json_atomic(path: str, data) -> None:
+    """Write JSON next to ``path`` and rename it into place, so readers never see a partial file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False) as f:
+        try:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        except BaseException:
+            os.unlink(f.name)
+            raise
+    # NamedTemporaryFile creates 0600 files; keep the datasets readable like the ones they replace
+    os.chmod(f.name, 0o644)
+    os.replace(f.name, path)
+
+
+class RateLimiter:
+    """Spaces requests at least ``1 / rate`` seconds apart."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class DatasetBuilder:
+    """Crawls every Pokemon through PokemonService with bounded concurrency, rate limiting and retries."""
+
+    def __init__(
+        self,
+        service: PokemonService,
+        state_path: str,
+        concurrency: int = 10,
+        rate: float = 20.0,
+        retries: int = 4,
+        backoff: float = 0.5,
+        checkpoint_every: int = 50
+    ):
+        self.service = service
+        self.state_path = state_path
+        self.concurrency = concurrency
+        self.rate_limiter = RateLimiter(rate)
+        self.retries = retries
+        self.backoff = backoff
+        self.checkpoint_every = checkpoint_every
+        self.state = self._load_state()
+        self.stats = {"fetched": 0, "not_modified": 0, "skipped": 0, "missing": 0, "failed": 0}
+        self._since_checkpoint = 0
+
+    def _load_state(self) -> dict:
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "r") as f:
+                state = json.load(f)
+            logger.info(f"Loaded build state with {len(state['records'])} records from {self.state_path}")
+            return state
+        return {"records": {}, "validators": {}, "completed": []}
+
+    def checkpoint(self) -> None:
+        write_json_atomic(self.state_path, self.state)
+        self._since_checkpoint = 0
+
+    async def _fetch_with_retries(self, name: str) -> dict:
+        validators = self.state["validators"].get(name, {})
+        for attempt in range(self.retries + 1):
+            await self.rate_limiter.wait()
+            try:
+                return await self.service.get_pokemon_data_conditional(
+                    name, etag=validators.get("etag"), last_modified=validators.get("last_modified")
+                )
+            except PokemonNotFoundError:
+                raise
+            except RETRYABLE_ERRORS as e:
+                status = getattr(e, "status", None)
+                if status is not None and status < 500 and status != 429:
+                    raise
+                if attempt == self.retries:
+                    raise
+                # Exponential backoff with full jitter
+                delay = random.uniform(0, self.backoff * 2 ** attempt)
+                logger.warning(f"Retrying {name} in {delay:.2f}s after error: {e}")
+                await asyncio.sleep(delay)
+
+    async def _refresh(self, name: str, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            try:
+                result = await self._fetch_with_retries(name)
+            except PokemonNotFoundError:
+                logger.warning(f"Pokemon {name} listed but not found, skipping")
+                self.stats["missing"] += 1
+                return
+            except Exception as e:
+                logger.error(f"Giving up on {name}: {str(e)}")
+                self.stats["failed"] += 1
+                return
+
+        if result["data"] is None and name in self.state["records"]:
+            self.stats["not_modified"] += 1
+        else:
+            if result["data"] is None:
+                # 304 without a stored record (e.g. state was edited); fetch it unconditionally next run
+                self.state["validators"].pop(name, None)
+                self.stats["failed"] += 1
+                return
+            self.state["records"][name] = transform_pokemon_data(result["data"])
+            self.stats["fetched"] += 1
+
+        self.state["validators"][name] = {"etag": result["etag"], "last_modified": result["last_modified"]}
+        self.state["completed"].append(name)
+        self._since_checkpoint += 1
+        if self._since_checkpoint >= self.checkpoint_every:
+            self.checkpoint()
+
+    async def build(self, resume: bool = False, limit: int | None = None) -> list[dict] | None:
+        """Crawl every Pokemon and return the parsed records ordered by id, or None if any failed."""
+        names = await self.service.get_pokemon_names()
+        if limit is not None:
+            names = names[:limit]
+
+        if not resume:
+            self.state["completed"] = []
+        completed = set(self.state["completed"])
+        pending = [name for name in names if name not in completed]
+        self.stats["skipped"] = len(names) - len(pending)
+        logger.info(f"Crawling {len(pending)} of {len(names)} Pokemon")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        try:
+            await asyncio.gather(*(self._refresh(name, semaphore) for name in pending))
+        finally:
+            self.checkpoint()
+
+        if self.stats["failed"]:
+            return None
+
+        # Run finished: the next run is a fresh incremental refresh rather than a resume
+        self.state["completed"] = []
+        self.checkpoint()
+        records = [self.state["records"][name] for name in names if name in self.state["records"]]
+        return sorted(records, key=lambda record: record.get("pokemon_id") or 0)
+
+
+def write_dataset(records: list[dict], data_path: str, descriptions_path: str) -> None:
+    descriptions = generate_descriptions_bulk(PokedexStore(records))
+    write_json_atomic(data_path, records)
+    write_json_atomic(descriptions_path, descriptions)
+
+
+async def run(args: argparse.Namespace) -> int:
+    session = create_http_session()
+    try:
+        service = PokemonService(session=session)
+        service.base_url = args.base_url
+        builder = DatasetBuilder(
+            service,
+            state_path=args.state,
+            concurrency=args.concurrency,
+            rate=args.rate,
+            retries=args.retries,
+        )
+        records = await builder.build(resume=args.resume, limit=args.limit)
+    finally:
+        await session.close()
+
+    summary = ", ".join(f"{key}={value}" for key, value in builder.stats.items())
+    if records is None:
+        print(f"Build incomplete ({summary}); rerun with --resume to continue", file=sys.stderr)
+        return 1
+
+    write_dataset(records, args.data_output, args.descriptions_output)
+    print(f"Wrote {len(records)} Pokemon to {args.data_output} and {args.descriptions_output} ({summary})")
+    if args.snapshot_output:
+        build_snapshot(args.data_output, args.descriptions_output, args.snapshot_output)
+        print(f"Wrote snapshot to {args.snapshot_output}")
+    return 0
+
+
+def main() -> None:
+    start_logging()
+    parser = argparse.ArgumentParser(description="Crawl PokeAPI and rebuild the bundled Pokedex datasets")
+    parser.add_argument("--base-url", default=settings.POKEMON_API_URL, help="PokeAPI base URL")
+    parser.add_argument("--data-output", default="all_parsed_data.json")
+    parser.add_argument("--descriptions-output", default="all_pokemon_descriptions.json")
+    parser.add_argument("--snapshot-output", default=settings.POKEDEX_SNAPSHOT_PATH, help="Binary snapshot (\"\" to skip)")
+    parser.add_argument("--state", default=".pokedex_build_state.json", help="Checkpoint / incremental refresh state")
+    parser.add_argument("--concurrency", type=int, default=10, help="Maximum requests in flight")
+    parser.add_argument("--rate", type=float, default=20.0, help="Maximum requests per second (0 disables)")
+    parser.add_argument("--retries", type=int, default=4, help="Retries per Pokemon for network errors, 429 and 5xx")
+    parser.add_argument("--resume", action="store_true", help="Skip Pokemon finished by an interrupted run")
+    parser.add_argument("--limit", type=int, default=None, help="Only crawl the first N Pokemon")
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Compile all_parsed_data.json and all_pokemon_descriptions.json into the binary Pokedex snapshot.
+
+    python -m app.utils.build_snapshot
+
+Workers load the snapshot (store columns and the prebuilt BM25 index) by
+mmap instead of parsing JSON and rebuilding the index on every boot. Rerun
+this whenever either JSON file changes; a stale snapshot is ignored.
+"""
+import argparse
+import json
+from app.config.env import settings
+from app.config.logging import start_logging
+from app.service.pokedex import PokedexStore
+from app.service.retrieval import DescriptionRetriever
+from app.service.snapshot import SnapshotWriter, file_stamp
+
+
+def build_snapshot(data_path: str, descriptions_path: str, output: str) -> None:
+    store = PokedexStore.from_file(data_path)
+    with open(descriptions_path, "r") as f:
+        descriptions = json.load(f)
+    retriever = DescriptionRetriever(descriptions, store.records)
+
+    writer = SnapshotWriter()
+    store.to_snapshot(writer)
+    bm25 = retriever.to_snapshot(writer)
+    writer.write(output, meta={
+        "records": len(store),
+        "bm25": bm25,
+        "sources": {"data": file_stamp(data_path), "descriptions": file_stamp(descriptions_path)},
+    })
+
+
+def main() -> None:
+    start_logging()
+    parser = argparse.ArgumentParser(description="Compile the Pokedex JSON datasets into a binary snapshot")
+    parser.add_argument("--data", default=settings.POKEDEX_DATA_PATH, help="Parsed Pokemon records")
+    parser.add_argument("--descriptions", default=settings.POKEMON_DESCRIPTIONS_PATH, help="Pokemon descriptions")
+    parser.add_argument("--output", default=settings.POKEDEX_SNAPSHOT_PATH, help="Where to write the snapshot")
+    args = parser.parse_args()
+
+    build_snapshot(args.data, args.descriptions, args.output)
+    print(f"Wrote snapshot to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
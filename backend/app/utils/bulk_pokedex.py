@@ -0,0 +1,175 @@
+"""
+Whole-Pokedex pipeline: vectorized role assignment and single-pass description rendering.
+
+Regenerate all_pokemon_descriptions.json from all_parsed_data.json with:
+
+    python -m app.utils.bulk_pokedex
+"""
+import argparse
+import json
+import numpy as np
+from app.config.logging import start_logging
+from app.service.pokedex import PokedexStore, STAT_NAMES, MISSING
+from app.utils.generate_descriptions import description_template
+
+ROLE_NAMES = ("Sweeper", "Tank", "Glass Cannon", "Support", "Balanced")
+SUPPORT_TYPES = {"fairy", "psychic", "grass"}
+
+
+def as_numpy(column) -> np.ndarray:
+    """Zero-copy NumPy view of a typed array or snapshot memoryview (typecodes are valid dtype codes)."""
+    typecode = column.format if isinstance(column, memoryview) else column.typecode
+    return np.frombuffer(column, dtype=np.dtype(typecode))
+
+
+def stat_matrix(store: PokedexStore) -> np.ndarray:
+    """(n, 6) int matrix of base stats in STAT_NAMES order; missing stats count as 0 like in assign_roles."""
+    columns = [as_numpy(store.stats[stat]) for stat in STAT_NAMES]
+    if not columns[0].size:
+        return np.zeros((0, len(STAT_NAMES)), dtype=np.int16)
+    return np.maximum(np.column_stack(columns), 0)
+
+
+def _rows_with_codes(store: PokedexStore, column, vocabulary, values: set[str]) -> np.ndarray:
+    """Boolean mask of records whose code list contains any of ``values``."""
+    n = len(store)
+    wanted = [vocabulary.codes[value] for value in values if value in vocabulary.codes]
+    codes = as_numpy(column.codes)
+    offsets = as_numpy(column.offsets)
+    rows = np.repeat(np.arange(n), np.diff(offsets).astype(np.int64))
+    mask = np.zeros(n, dtype=bool)
+    mask[rows[np.isin(codes, wanted)]] = True
+    return mask
+
+
+def role_masks(store: PokedexStore) -> np.ndarray:
+    """(n, 5) boolean matrix with one column per role in ROLE_NAMES.
+
+    Same thresholds as ``assign_roles``, evaluated as column operations.
+    """
+    stats = stat_matrix(store)
+    hp, attack, defense, sp_atk, sp_def, speed = stats.T
+
+    is_fast = speed >= 92
+    is_physically_strong = attack >= 100
+    is_special_strong = sp_atk >= 95
+    is_strong = is_physically_strong | is_special_strong
+    is_physically_tanky = (defense >= 95) | (hp >= 85)
+    is_special_tanky = (sp_def >= 90) | (hp >= 85)
+    is_balanced = (
+        (hp >= 70) & (attack >= 70) & (defense >= 70)
+        & (sp_atk >= 65) & (sp_def >= 70) & (speed >= 70)
+    )
+    has_support_type = _rows_with_codes(store, store.type_lists, store.types, SUPPORT_TYPES)
+
+    return np.column_stack([
+        is_fast & is_strong,
+        is_physically_tanky | is_special_tanky,
+        is_strong & ((defense <= 53) | (sp_def <= 52)),
+        ((speed <= 48) & (attack <= 58) & (sp_atk <= 50)) | has_support_type,
+        is_balanced,
+    ])
+
+
+def assign_roles_bulk(store: PokedexStore) -> list[list[str]]:
+    """Roles for every record, matching ``assign_roles`` record by record."""
+    roles = []
+    for row in role_masks(store).tolist():
+        record_roles = [name for name, matched in zip(ROLE_NAMES, row) if matched] or ["Generic"]
+        # Same de-duplication as assign_roles, so both paths give the same list
+        roles.append(list(set(record_roles)))
+    return roles
+
+
+def _joined_lists(column, labels: list[str]) -> list[str]:
+    """Comma-joined labels for every record's code list, rendering each distinct list once."""
+    codes = column.codes.tolist()
+    offsets = column.offsets.tolist()
+    rendered: dict[tuple[int, ...], str] = {}
+    joined = []
+    for start, end in zip(offsets, offsets[1:]):
+        key = tuple(codes[start:end])
+        text = rendered.get(key)
+        if text is None:
+            text = rendered[key] = ", ".join(labels[code] for code in key)
+        joined.append(text)
+    return joined
+
+
+def _joined_abilities(store: PokedexStore, labels: list[str]) -> tuple[list[str], list[str]]:
+    """Comma-joined (standard, hidden) abilities per record, as split by ``generate_descriptions``."""
+    codes = store.ability_lists.codes.tolist()
+    flags = store.hidden_flags.codes.tolist()
+    offsets = store.ability_lists.offsets.tolist()
+    rendered: dict[tuple, tuple[str, str]] = {}
+    standard, hidden = [], []
+    for start, end in zip(offsets, offsets[1:]):
+        key = (tuple(codes[start:end]), tuple(flags[start:end]))
+        text = rendered.get(key)
+        if text is None:
+            pairs = list(zip(*key))
+            text = rendered[key] = (
+                ", ".join(labels[code] for code, flag in pairs if flag),
+                ", ".join(labels[code] for code, flag in pairs if not flag),
+            )
+        standard.append(text[0])
+        hidden.append(text[1])
+    return standard, hidden
+
+
+def generate_descriptions_bulk(store: PokedexStore, roles: list[list[str]] | None = None) -> list[str]:
+    """Render every description in one pass, identical to ``generate_descriptions`` per record.
+
+    Each column is rendered once up front (capitalizing every vocabulary entry
+    and every distinct type/role combination only once), then the template is
+    filled row by row. ``roles`` overrides the stored ``role_type`` (e.g. from
+    ``assign_roles_bulk``).
+    """
+    species = [value.capitalize() for value in store.species.values]
+    names = [species[code] for code in store.species_codes]
+    types = _joined_lists(store.type_lists, [value.capitalize() for value in store.types.values])
+    standard, hidden = _joined_abilities(store, [value.capitalize() for value in store.abilities.values])
+    if roles is None:
+        role_text = _joined_lists(store.role_lists, [value.capitalize() for value in store.roles.values])
+    else:
+        role_text = [", ".join(role.capitalize() for role in record_roles) for record_roles in roles]
+
+    base_experience = [None if value == MISSING else value for value in store.base_experience]
+    heights = np.round(as_numpy(store.heights) / 10, 1).tolist()  # decimeters → meters
+    weights = np.round(as_numpy(store.weights) / 10, 1).tolist()  # hectograms → kilograms
+
+    return [
+        description_template.format(
+            name=name,
+            pokemon_type=pokemon_type,
+            hidden_ability=hidden_ability or "None",
+            standard_ability=standard_ability or "None",
+            roles=role or "none",
+            base_experience=experience,
+            height=height,
+            weight=weight,
+        )
+        for name, pokemon_type, standard_ability, hidden_ability, role, experience, height, weight
+        in zip(names, types, standard, hidden, role_text, base_experience, heights, weights)
+    ]
+
+
+def main() -> None:
+    start_logging()
+    parser = argparse.ArgumentParser(description="Regenerate Pokemon descriptions from the parsed dataset")
+    parser.add_argument("--data", default="all_parsed_data.json", help="Parsed Pokemon records")
+    parser.add_argument("--output", default="all_pokemon_descriptions.json", help="Where to write the descriptions")
+    parser.add_argument("--recompute-roles", action="store_true", help="Reassign roles from stats instead of using role_type")
+    args = parser.parse_args()
+
+    store = PokedexStore.from_file(args.data)
+    roles = assign_roles_bulk(store) if args.recompute_roles else None
+    descriptions = generate_descriptions_bulk(store, roles)
+
+    with open(args.output, "w") as f:
+        json.dump(descriptions, f)
+    print(f"Wrote {len(descriptions)} descriptions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
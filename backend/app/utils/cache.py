@@ -0,0 +1,258 @@
+import asyncio
+import copy
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+from app.config.logging import setup_logger
+from app.config.metrics import CACHE_HITS, CACHE_MISSES, CACHE_EVICTIONS, CACHE_REFRESHES, CACHE_STALE_SERVED
+from app.utils.cache_backend import CacheBackend, MemoryBackend
+
+logger = setup_logger("cache")
+
+T = TypeVar("T")
+
+
+def fresh_error(error: BaseException) -> BaseException:
+    """A copy of a cached error to raise, so repeated hits do not keep growing one shared traceback."""
+    try:
+        return copy.copy(error).with_traceback(None)
+    except Exception:
+        # Exceptions whose __init__ does not take their args back cannot be copied
+        return error.with_traceback(None)
+
+
+class AsyncTTLCache:
+    """LRU cache with per-entry TTL, negative caching and single-flight loading.
+
+    Exceptions listed in ``negative_exceptions`` (e.g. "not found") are cached
+    for ``negative_ttl`` seconds and re-raised on later lookups. Concurrent
+    misses for the same key share one in-flight load, which runs on even
+    if the caller that started it is cancelled.
+
+    Expired entries are kept for another ``stale_ttl`` seconds: if reloading
+    one fails with an exception listed in ``stale_exceptions`` (e.g. the
+    upstream being down), the stale value or cached error is served instead.
+    With ``revalidate`` they are served straight away instead, while a
+    background task reloads them; at most ``refresh_concurrency`` such
+    refreshes run at once.
+
+    Entries live in ``backend``, per-process memory unless another
+    CacheBackend is given; in-flight loads and refreshes are always per
+    process. Expiry uses wall-clock time so it means the same in every
+    process sharing a backend. Lookups are coroutines because a shared
+    backend is read and written from a worker thread.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int,
+        ttl: float,
+        negative_ttl: float = 0.0,
+        negative_exceptions: tuple[type[BaseException], ...] = (),
+        stale_ttl: float = 0.0,
+        stale_exceptions: tuple[type[BaseException], ...] = (),
+        revalidate: bool = False,
+        refresh_concurrency: int = 4,
+        backend: CacheBackend | None = None,
+        clock: Callable[[], float] = time.time
+    ):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.negative_exceptions = negative_exceptions
+        self.stale_ttl = stale_ttl
+        self.stale_exceptions = stale_exceptions
+        self.revalidate = revalidate
+        self.clock = clock
+        # key -> (expires_at, value, error)
+        self.backend = backend if backend is not None else MemoryBackend(maxsize)
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self._refreshing: dict[Hashable, asyncio.Task] = {}
+        self._refresh_slots = asyncio.Semaphore(refresh_concurrency)
+
+    def __len__(self) -> int:
+        return len(self.backend)
+
+    async def _backend_call(self, method: Callable[..., T], *args: Any) -> T:
+        # Shared backends do file or network I/O, which must not block the event loop
+        if self.backend.shared:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def contains(self, key: Hashable) -> bool:
+        """Whether ``key`` has an entry that may still be served, fresh or stale."""
+        return await self._stale(key) is not None
+
+    async def is_negative(self, key: Hashable) -> bool:
+        """Whether ``key`` is cached as an error (e.g. "not found"), fresh or stale."""
+        cached = await self._stale(key)
+        return cached is not None and cached[1] is not None
+
+    async def expires_within(self, key: Hashable, seconds: float) -> bool:
+        """Whether ``key`` is missing or its entry goes stale in the next ``seconds``."""
+        entry = await self._backend_call(self.backend.get, key)
+        return entry is None or entry[0] <= self.clock() + seconds
+
+    async def _lookup(self, key: Hashable) -> tuple[Any, BaseException | None] | None:
+        entry = await self._backend_call(self.backend.get, key)
+        if entry is None:
+            return None
+        expires_at, value, error = entry
+        now = self.clock()
+        if expires_at <= now:
+            if expires_at + self.stale_ttl <= now:
+                await self._backend_call(self.backend.delete, key)
+            return None
+        return value, error
+
+    async def _store(self, key: Hashable, value: Any, error: BaseException | None, ttl: float) -> None:
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        evicted = await self._backend_call(self.backend.set, key, (self.clock() + ttl, value, error))
+        if evicted:
+            CACHE_EVICTIONS.labels(cache=self.name).inc(evicted)
+
+    async def _stale(self, key: Hashable) -> tuple[Any, BaseException | None] | None:
+        entry = await self._backend_call(self.backend.get, key)
+        if entry is None or entry[0] + self.stale_ttl <= self.clock():
+            return None
+        return entry[1], entry[2]
+
+    async def peek(self, key: Hashable, stale: bool = False) -> Any | None:
+        """Return a fresh cached value without loading it or counting a hit/miss.
+
+        With ``stale``, an expired value still within ``stale_ttl`` is returned too.
+        """
+        cached = await self._stale(key) if stale else await self._lookup(key)
+        if cached is None or cached[1] is not None:
+            return None
+        return cached[0]
+
+    async def set(self, key: Hashable, value: Any) -> None:
+        await self._store(key, value, None, self.ttl)
+
+    async def invalidate(self, key: Hashable) -> None:
+        await self._backend_call(self.backend.delete, key)
+
+    def clear(self) -> None:
+        """Drop every entry; blocking, for tests and maintenance rather than the request path."""
+        self.backend.clear()
+
+    async def keys(self) -> list[Hashable]:
+        """Keys with an entry in the backend, including ones other processes stored."""
+        return await self._backend_call(self.backend.keys)
+
+    def refresh(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task | None:
+        """Reload ``key`` in a background task, unless it is already being loaded."""
+        if key in self._inflight or key in self._refreshing:
+            return None
+        task = asyncio.get_running_loop().create_task(self._refresh(key, loader))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+        return task
+
+    async def _refresh(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> None:
+        async with self._refresh_slots:
+            try:
+                value = await loader()
+            except self.negative_exceptions as e:
+                await self._store(key, None, fresh_error(e), self.negative_ttl)
+            except Exception as e:
+                # The stale entry stays in place until its stale window ends
+                CACHE_REFRESHES.labels(cache=self.name, outcome="error").inc()
+                logger.warning(f"Background refresh of {key!r} in the {self.name} cache failed: {str(e) or type(e).__name__}")
+                return
+            else:
+                await self._store(key, value, None, self.ttl)
+        CACHE_REFRESHES.labels(cache=self.name, outcome="ok").inc()
+
+    async def close(self) -> None:
+        """Cancel background refreshes and loads, e.g. before the HTTP session they use is closed."""
+        tasks = [*self._refreshing.values(), *self._inflight.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        cached = await self._lookup(key)
+        if cached is not None:
+            CACHE_HITS.labels(cache=self.name).inc()
+            value, error = cached
+            if error is not None:
+                raise fresh_error(error)
+            return value
+
+        if self.revalidate:
+            stale = await self._stale(key)
+            if stale is not None:
+                CACHE_STALE_SERVED.labels(cache=self.name).inc()
+                self.refresh(key, loader)
+                value, error = stale
+                if error is not None:
+                    raise fresh_error(error)
+                return value
+
+        CACHE_MISSES.labels(cache=self.name).inc()
+        task = self._inflight.get(key)
+        if task is None:
+            # The load runs in its own task, so a caller that is cancelled (the first one
+            # included) does not cancel it for the callers waiting on the same key
+            task = asyncio.get_running_loop().create_task(self._load(key, loader))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._load_finished(key, done))
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await loader()
+        except self.negative_exceptions as e:
+            await self._store(key, None, fresh_error(e), self.negative_ttl)
+            raise
+        except self.stale_exceptions:
+            stale = await self._stale(key)
+            if stale is None:
+                raise
+            CACHE_STALE_SERVED.labels(cache=self.name).inc()
+            value, error = stale
+            if error is not None:
+                raise fresh_error(error)
+            return value
+        await self._store(key, value, None, self.ttl)
+        return value
+
+    def _load_finished(self, key: Hashable, task: asyncio.Task) -> None:
+        del self._inflight[key]
+        if not task.cancelled():
+            # Mark errors as retrieved so a failure nobody awaited is not logged as unhandled
+            task.exception()
+
+
+class PopularityTracker:
+    """Bounded request counts per key, halved on every ``decay`` so rankings follow recent traffic."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.counts: Counter[Hashable] = Counter()
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def record(self, key: Hashable) -> None:
+        if self.maxsize <= 0:
+            return
+        self.counts[key] += 1
+        # Trim in batches so the common case stays a single dict update
+        if len(self.counts) > 2 * self.maxsize:
+            self.counts = Counter(dict(self.counts.most_common(self.maxsize)))
+
+    def top(self, n: int) -> list[Hashable]:
+        """The ``n`` most requested keys, most requested first."""
+        return [key for key, _ in self.counts.most_common(n)]
+
+    def decay(self) -> None:
+        self.counts = Counter({key: count // 2 for key, count in self.counts.items() if count > 1})
+
+    def clear(self) -> None:
+        self.counts.clear()
@@ -0,0 +1,275 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+from app.config.env import settings
+from app.config.logging import setup_logger
+
+logger = setup_logger("cache_backend")
+
+# (expires_at, value, error) as kept by AsyncTTLCache; expires_at is wall-clock time
+Entry = tuple[float, Any, BaseException | None]
+
+CACHE_BACKENDS = ("memory", "sqlite")
+
+# Seconds within which repeated reads of a shared entry do not update its LRU timestamp
+USED_AT_RESOLUTION = 1.0
+
+# Writes between exact recounts of a shared namespace; in between, the row count is kept in the process
+RECOUNT_INTERVAL = 100
+
+
+def key_text(key: Hashable) -> str:
+    """Canonical text for a cache key: equal keys give equal text in every process.
+
+    Sets are sorted, since their iteration order (and so their pickle) varies
+    between interpreters with different hash seeds.
+    """
+    if isinstance(key, (frozenset, set)):
+        return "{" + ",".join(sorted(key_text(item) for item in key)) + "}"
+    if isinstance(key, tuple):
+        return "(" + ",".join(key_text(item) for item in key) + ")"
+    return repr(key)
+
+
+class CacheBackend:
+    """Where an AsyncTTLCache keeps its entries, with least-recently-used eviction at ``maxsize``.
+
+    Expiry, staleness and loading stay in AsyncTTLCache; a backend only
+    stores entries, so the same cache logic runs over per-process memory or
+    storage shared by every worker on the host. Methods of ``shared``
+    backends do I/O, so AsyncTTLCache calls them from a worker thread.
+    """
+
+    shared = False
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+
+    def get(self, key: Hashable) -> Entry | None:
+        """The entry for ``key`` (marking it recently used), or None."""
+        raise NotImplementedError
+
+    def set(self, key: Hashable, entry: Entry) -> int:
+        """Store an entry and return how many entries were evicted to make room."""
+        raise NotImplementedError
+
+    def delete(self, key: Hashable) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def keys(self) -> list[Hashable]:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """Entries in an OrderedDict of this process; values are kept as live objects."""
+
+    def __init__(self, maxsize: int):
+        super().__init__(maxsize)
+        self._entries: OrderedDict[Hashable, Entry] = OrderedDict()
+
+    def get(self, key: Hashable) -> Entry | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: Hashable, entry: Entry) -> int:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        evicted = 0
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def delete(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def keys(self) -> list[Hashable]:
+        return list(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteBackend(CacheBackend):
+    """Entries in a SQLite file shared by every worker process on the host.
+
+    Each cache is a namespace within one table. Keys are stored as canonical
+    text (see ``key_text``) for lookups plus a pickle for ``keys()``; values
+    and cached errors are pickled, so a hit restores the parsed object
+    directly instead of re-parsing JSON. The database runs in WAL mode so
+    readers in one worker do not block writers in another. The connection
+    is opened on first use, which keeps it out of a parent process that
+    forks workers.
+
+    The cache is an optimisation, so a worker that finds the database
+    locked for longer than ``busy_timeout`` treats it as a miss (or skips
+    the write) rather than waiting. Eviction works from a row count kept in
+    this process and recounted every ``RECOUNT_INTERVAL`` writes, so other
+    workers' inserts can take a namespace slightly past ``maxsize`` in between.
+    """
+
+    shared = True
+
+    def __init__(self, path: str, namespace: str, maxsize: int, busy_timeout: float | None = None):
+        super().__init__(maxsize)
+        self.path = path
+        self.namespace = namespace
+        self.busy_timeout = settings.CACHE_SQLITE_BUSY_TIMEOUT_SECONDS if busy_timeout is None else busy_timeout
+        self._connection: sqlite3.Connection | None = None
+        self._pid: int | None = None
+        self._lock = threading.Lock()
+        self._count: int | None = None
+        self._writes_since_count = 0
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None or self._pid != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, key_blob BLOB NOT NULL, "
+                "expires_at REAL NOT NULL, used_at REAL NOT NULL, entry BLOB NOT NULL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS cache_entries_lru ON cache_entries (namespace, used_at)")
+            self._connection, self._pid = connection, os.getpid()
+            self._count = None
+            logger.info(f"Opened shared cache {self.namespace} in {self.path}")
+        return self._connection
+
+    def get(self, key: Hashable) -> Entry | None:
+        text = key_text(key)
+        now = time.time()
+        with self._lock:
+            try:
+                row = self.connection.execute(
+                    "SELECT entry, used_at FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, text)
+                ).fetchone()
+                # Recency only needs to be roughly right; skipping fresh touches keeps reads from taking the write lock
+                if row is not None and now - row[1] >= USED_AT_RESOLUTION:
+                    self.connection.execute(
+                        "UPDATE cache_entries SET used_at = ? WHERE namespace = ? AND key = ?", (now, self.namespace, text)
+                    )
+            except sqlite3.OperationalError as e:
+                logger.warning(f"Shared cache {self.namespace} unavailable for reading {text}: {str(e)}")
+                return None
+        if row is None:
+            return None
+        try:
+            return pickle.loads(row[0])
+        except Exception as e:
+            # Written by an incompatible version of the code; treat it as a miss
+            logger.warning(f"Dropping unreadable entry {text} from shared cache {self.namespace}: {str(e)}")
+            self.delete(key)
+            return None
+
+    def set(self, key: Hashable, entry: Entry) -> int:
+        text = key_text(key)
+        blob = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        key_blob = pickle.dumps(key, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            connection = self.connection
+            try:
+                connection.execute("BEGIN IMMEDIATE")
+            except sqlite3.OperationalError as e:
+                logger.warning(f"Shared cache {self.namespace} unavailable for writing {text}: {str(e)}")
+                return 0
+            try:
+                replaced = connection.execute(
+                    "UPDATE cache_entries SET key_blob = ?, expires_at = ?, used_at = ?, entry = ? "
+                    "WHERE namespace = ? AND key = ?",
+                    (key_blob, entry[0], time.time(), blob, self.namespace, text),
+                ).rowcount
+                if not replaced:
+                    connection.execute(
+                        "INSERT INTO cache_entries VALUES (?, ?, ?, ?, ?, ?)",
+                        (self.namespace, text, key_blob, entry[0], time.time(), blob),
+                    )
+                count = self._row_count(connection, inserted=not replaced)
+                evicted = max(0, count - self.maxsize)
+                if evicted:
+                    evicted = connection.execute(
+                        "DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+                        "SELECT key FROM cache_entries WHERE namespace = ? ORDER BY used_at LIMIT ?)",
+                        (self.namespace, self.namespace, evicted),
+                    ).rowcount
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                self._count = None
+                raise
+            self._count = count - evicted
+        return evicted
+
+    def _row_count(self, connection: sqlite3.Connection, inserted: bool) -> int:
+        """Rows in this namespace after a write, recounted exactly every ``RECOUNT_INTERVAL`` writes."""
+        if self._count is None or self._writes_since_count >= RECOUNT_INTERVAL:
+            (count,) = connection.execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+            ).fetchone()
+            self._writes_since_count = 0
+        else:
+            count = self._count + inserted
+        self._writes_since_count += 1
+        return count
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            deleted = self.connection.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key_text(key))
+            ).rowcount
+            if self._count is not None:
+                self._count = max(0, self._count - deleted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.connection.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+            self._count = 0
+
+    def keys(self) -> list[Hashable]:
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT key_blob FROM cache_entries WHERE namespace = ?", (self.namespace,)
+            ).fetchall()
+        return [pickle.loads(row[0]) for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self.connection.execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+            ).fetchone()
+        return count
+
+    def close(self) -> None:
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+
+def create_cache_backend(namespace: str, maxsize: int, backend: str | None = None) -> CacheBackend:
+    """The backend selected by ``CACHE_BACKEND`` for the cache called ``namespace``."""
+    backend = backend or settings.CACHE_BACKEND
+    if backend == "memory":
+        return MemoryBackend(maxsize)
+    if backend == "sqlite":
+        return SQLiteBackend(settings.CACHE_SQLITE_PATH, namespace, maxsize)
+    raise ValueError(f"Unknown cache backend {backend!r}, expected one of {', '.join(CACHE_BACKENDS)}")
@@ -14,6 +14,9 @@ description_template = (
     "It has a base experience of {base_experience}, stands {height} meters tall, and weighs {weight} kilograms."
 )
 
+# Bump whenever the description of an unchanged record changes, so HTTP ETags of old text stop matching
+DESCRIPTION_VERSION = 1
+
 
 def generate_descriptions(pokemon_data: dict) -> str:
     name = pokemon_data["pokemon_species"].capitalize()
@@ -46,20 +49,6 @@ def generate_descriptions(pokemon_data: dict) -> str:
 
 
 """
-The above function has been used to generate all the pokemon descriptions from the parsed data. The below code has been commented out because it is used to only once to generate the descriptions.
+The above function has been used to generate all the pokemon descriptions from the parsed data. To regenerate
+all_pokemon_descriptions.json for the whole Pokedex in one pass, run `python -m app.utils.bulk_pokedex`.
 """
-
-# with open("all_parsed_data.json", "r") as f:
-#     data = json.load(f)
-
-# all_pokemon_descriptions = []
-
-# for idx, entry in enumerate(data):
-
-#     p_description = generate_descriptions(entry)
-
-#     all_pokemon_descriptions.append(p_description)
-
-
-# with open("/Users/yashvardhan/Documents/Desktop_Folders/ProjectsAndTutorials/pokebase/backend/all_pokemon_descriptions_test.json", "w") as f:
-#     json.dump(all_pokemon_descriptions, f)
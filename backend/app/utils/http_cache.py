@@ -0,0 +1,27 @@
+import hashlib
+from app.config.env import settings
+from app.utils.generate_descriptions import DESCRIPTION_VERSION
+
+
+def make_etag(*versions: str) -> str:
+    """ETag for a response built from data with the given versions (see ``pokemon_version``).
+
+    It is weak because GZipMiddleware sends the same representation with
+    and without compression, and a strong ETag must differ between them.
+    """
+    digest = hashlib.sha1("\0".join((str(DESCRIPTION_VERSION), *versions)).encode()).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an If-None-Match header lists ``etag``; it is compared weakly, as RFC 9110 requires."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag.removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def cache_headers(etag: str) -> dict[str, str]:
+    """Validator and freshness headers; shared caches (CDN) may store the response too."""
+    return {"ETag": etag, "Cache-Control": f"public, max-age={settings.HTTP_CACHE_MAX_AGE_SECONDS}"}
@@ -0,0 +1,163 @@
+import hashlib
+from collections import OrderedDict
+from app.config.env import settings
+from app.config.metrics import CACHE_HITS, CACHE_MISSES, LLM_CACHE_TOKENS_SAVED
+from app.service.pokedex import get_pokedex_store
+from app.service.retrieval import tokenize, estimate_tokens
+from app.utils.cache import AsyncTTLCache
+from app.utils.cache_backend import CacheBackend, create_cache_backend
+from app.utils.type_chart import TYPE_INDEX
+
+
+def normalize_query(query: str) -> str:
+    """Query text with case, punctuation, stopwords, hyphens and plurals folded, words kept in order.
+
+    "how to counter dragon types" and "counter dragon-type pokemon?" both
+    normalize to "counter dragon type", while "counter garchomp with
+    dragonite" and "counter dragonite with garchomp" stay different.
+    """
+    terms = []
+    for token in tokenize(query):
+        if "-" in token:
+            continue  # its parts are emitted separately
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        terms.append(token)
+    return " ".join(terms)
+
+
+def query_terms(normalized: str) -> frozenset[str]:
+    """Ordered word pairs of a normalized query, for the similarity layer; a one-word query is its own term."""
+    words = normalized.split()
+    if len(words) < 2:
+        return frozenset(words)
+    return frozenset(f"{first} {second}" for first, second in zip(words, words[1:]))
+
+
+def query_entities(normalized: str) -> tuple[str, ...]:
+    """Pokemon and type names of a normalized query, in order.
+
+    "counter garchomp with dragonite" gives ("garchomp", "dragonite"), so
+    it is never answered with "counter dragonite with garchomp".
+    """
+    store = get_pokedex_store()
+    return tuple(word for word in normalized.split() if word in TYPE_INDEX or word in store)
+
+
+def jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class LLMResponseCache:
+    """Cache of LLM answers keyed on the prompt template and normalized query.
+
+    The exact layer matches queries with the same normalized text, word
+    order included. The optional similarity layer returns the answer of
+    the most similar cached query for the same template that names the
+    same Pokemon and types in the same order, when the Jaccard similarity
+    of their ordered word pairs reaches ``similarity_threshold``.
+
+    Candidates for the similarity layer (key -> entities and word pairs) are kept in
+    this process, so a lookup never reads every key from the backend. With
+    a shared backend they are seeded once from the keys other workers
+    stored, and learn further ones from exact hits.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        similarity_threshold: float | None = None,
+        backend: CacheBackend | None = None
+    ):
+        self.maxsize = maxsize
+        self.similarity_threshold = similarity_threshold
+        self._cache = AsyncTTLCache("llm", maxsize=maxsize, ttl=ttl, backend=backend)
+        self._candidates: OrderedDict[tuple[str, str], tuple[tuple[str, ...], frozenset[str]]] = OrderedDict()
+        self._candidates_seeded = not self._cache.backend.shared
+
+    @staticmethod
+    def template_id(template: str, context: str = "") -> str:
+        # Editing a prompt template changes its id, which invalidates old answers;
+        # answers built from a different kind of context never mix
+        return hashlib.sha1(f"{template}\0{context}".encode() if context else template.encode()).hexdigest()[:12]
+
+    def _remember(self, key: tuple[str, str]) -> None:
+        self._candidates[key] = query_entities(key[1]), query_terms(key[1])
+        self._candidates.move_to_end(key)
+        while len(self._candidates) > self.maxsize:
+            self._candidates.popitem(last=False)
+
+    async def _find_similar(self, template_id: str, normalized: str) -> dict | None:
+        if not self._candidates_seeded:
+            self._candidates_seeded = True
+            for key in await self._cache.keys():
+                self._remember(key)
+        entities, terms = query_entities(normalized), query_terms(normalized)
+        # Score candidates first and only read entries from the best match down, forgetting expired ones
+        candidates = sorted(
+            (
+                (jaccard(terms, cached_terms), key)
+                for key, (cached_entities, cached_terms) in self._candidates.items()
+                if key[0] == template_id and cached_entities == entities
+            ),
+            key=lambda candidate: candidate[0],
+            reverse=True,
+        )
+        for score, key in candidates:
+            if score < self.similarity_threshold:
+                break
+            entry = await self._cache.peek(key)
+            if entry is not None:
+                return entry
+            self._candidates.pop(key, None)
+        return None
+
+    async def get(self, template: str, query: str, context: str = "") -> tuple[str, str] | None:
+        """Return ``(answer, layer)`` for a cached query, where layer is "exact" or "similar".
+
+        ``context`` names the kind of context the prompt was built with
+        (e.g. "candidates"); answers are only shared within one kind.
+        """
+        key = (self.template_id(template, context), normalize_query(query))
+
+        entry = await self._cache.peek(key)
+        layer = "exact"
+        if self.similarity_threshold is not None:
+            if entry is not None:
+                self._remember(key)  # possibly stored by another worker
+            else:
+                entry = await self._find_similar(key[0], key[1])
+                layer = "similar"
+
+        if entry is None:
+            CACHE_MISSES.labels(cache="llm").inc()
+            return None
+        CACHE_HITS.labels(cache="llm").inc()
+        LLM_CACHE_TOKENS_SAVED.labels(layer=layer).inc(entry["tokens"])
+        return entry["response"], layer
+
+    async def set(self, template: str, query: str, prompt: str, response: str | None, context: str = "") -> None:
+        if not response:
+            return
+        key = (self.template_id(template, context), normalize_query(query))
+        await self._cache.set(key, {"response": response, "tokens": estimate_tokens(prompt) + estimate_tokens(response)})
+        if self.similarity_threshold is not None:
+            self._remember(key)
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._candidates.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+llm_response_cache = LLMResponseCache(
+    maxsize=settings.LLM_CACHE_MAXSIZE,
+    ttl=settings.LLM_CACHE_TTL_SECONDS,
+    similarity_threshold=settings.LLM_CACHE_SIMILARITY_THRESHOLD if settings.LLM_CACHE_SIMILARITY_ENABLED else None,
+    backend=create_cache_backend("llm", settings.LLM_CACHE_MAXSIZE)
+)
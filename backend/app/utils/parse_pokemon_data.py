@@ -1,4 +1,32 @@
-from app.service.pokemon import get_pokemon_service
+import asyncio
+import hashlib
+import json
+import aiohttp
+from app.service.pokemon import get_pokemon_service, PokemonNotFoundError
+from app.service.resilience import CircuitOpenError
+from app.service.pokedex import get_dataset_version, get_pokedex_store
+from app.utils.cache import AsyncTTLCache, PopularityTracker
+from app.utils.cache_backend import create_cache_backend
+from app.config.env import settings
+from app.config.metrics import STAGE_LATENCY
+
+# Upstream lookups for names missing from the local Pokedex; 404s are cached too. Expired entries
+# are served at once while they are refreshed in the background, and kept when PokeAPI is failing
+pokemon_cache = AsyncTTLCache(
+    "pokemon",
+    maxsize=settings.POKEMON_CACHE_MAXSIZE,
+    ttl=settings.POKEMON_CACHE_TTL_SECONDS,
+    negative_ttl=settings.POKEMON_CACHE_NEGATIVE_TTL_SECONDS,
+    negative_exceptions=(PokemonNotFoundError,),
+    stale_ttl=settings.POKEMON_CACHE_STALE_SECONDS,
+    stale_exceptions=(CircuitOpenError, aiohttp.ClientError, asyncio.TimeoutError),
+    revalidate=True,
+    refresh_concurrency=settings.POKEMON_REFRESH_CONCURRENCY,
+    backend=create_cache_backend("pokemon", settings.POKEMON_CACHE_MAXSIZE)
+)
+
+# Names looked up through pokemon_cache, ranked for the background warmer
+popular_pokemon = PopularityTracker(settings.POKEMON_POPULARITY_TRACKED)
 
 
 def assign_roles(stats, types):
@@ -54,10 +82,7 @@ def assign_roles(stats, types):
 
 
 
-async def parse_pokemon_data(pokemon_name: str) -> dict:
-    service = await get_pokemon_service()
-    pokemon_data = await service.get_pokemon_data(pokemon_name)
-
+def transform_pokemon_data(pokemon_data: dict) -> dict:
     abilities = pokemon_data.get("abilities", [])
     abilities_dict = {}
     for ability in abilities:
@@ -90,12 +115,14 @@ async def parse_pokemon_data(pokemon_name: str) -> dict:
     base_experience = pokemon_data.get("base_experience", None)
     height = pokemon_data.get("height", None)
 
+    pokemon_name = pokemon_data.get("name", "")
     pokemon_id = pokemon_data.get("id", None)
     pokemon_species = pokemon_data.get("species", {}).get("name", "")
 
     pokemon_weight = pokemon_data.get("weight", None)
     
     data = {
+        "pokemon_name": pokemon_name,
         "abilities": abilities_dict,
         "moves": moves_list,
         "types": pokemon_types_list,
@@ -109,3 +136,58 @@ async def parse_pokemon_data(pokemon_name: str) -> dict:
     }
 
     return data
+
+
+async def fetch_and_parse_pokemon_data(pokemon_name: str) -> dict:
+    service = await get_pokemon_service()
+    pokemon_data = await service.get_pokemon_data(pokemon_name)
+    data = transform_pokemon_data(pokemon_data)
+
+    # Write back on first fetch so search and the other local indexes see it; refreshes only update the cache
+    store = get_pokedex_store()
+    if pokemon_name not in store:
+        store.add(data, pokemon_name)
+    return data
+
+
+def pokemon_loader(pokemon_name: str):
+    return lambda: fetch_and_parse_pokemon_data(pokemon_name)
+
+
+async def parse_pokemon_data(pokemon_name: str) -> dict:
+    with STAGE_LATENCY.labels(stage="parse_pokemon_data").time():
+        key = pokemon_name.strip().lower()
+        store = get_pokedex_store()
+        # The bundled Pokedex is refreshed offline (app.utils.build_dataset) and never touches the cache;
+        # only Pokemon fetched from PokeAPI at runtime go through it, which revalidates them once they expire
+        if store.is_bundled(key):
+            return store.get(key)
+        data = store.get(key)
+        if data is not None and not await pokemon_cache.contains(key):
+            return data
+
+        data = await pokemon_cache.get_or_load(key, pokemon_loader(pokemon_name))
+        # Only names that load count towards warming; misses and typos raise before this
+        popular_pokemon.record(key)
+        return data
+
+
+async def pokemon_version(pokemon_name: str) -> str | None:
+    """Identify the data parse_pokemon_data would return for a name, without building it.
+
+    Bundled records are identified by the dataset version and their row,
+    records fetched from PokeAPI by a digest of their content. None when
+    the name is unknown, only known as a cached "not found", or cached
+    past its TTL: a 304 must not confirm data that is due a reload.
+    """
+    key = pokemon_name.strip().lower()
+    store = get_pokedex_store()
+    if store.is_bundled(key):
+        return f"{get_dataset_version()}:{store.position(key)}"
+    if await pokemon_cache.contains(key):
+        data = await pokemon_cache.peek(key)
+    else:
+        data = store.get(key)
+    if data is None:
+        return None
+    return hashlib.sha1(json.dumps(dict(data), sort_keys=True).encode()).hexdigest()[:16]
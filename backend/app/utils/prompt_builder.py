@@ -0,0 +1,75 @@
+from collections.abc import Iterable, Mapping
+from app.config.env import settings
+from app.service.pokedex import STAT_NAMES
+from app.service.retrieval import estimate_tokens
+from app.utils.generate_descriptions import generate_descriptions
+
+# "table" sends one compact row per Pokemon, "prose" the generated English descriptions
+CONTEXT_FORMATS = ("table", "prose")
+
+# Sent once above the rows. The templates describe their context as prose, so
+# the table explains its own columns and the templates work with either format
+TABLE_PREAMBLE = (
+    "A table of the relevant Pokémon, one per line, with the columns given in its first line: name, types, "
+    "abilities (hidden abilities marked with *), roles, and base stats (HP/Attack/Defense/Sp. Atk/Sp. Def/Speed)."
+)
+TABLE_HEADER = "name|types|abilities (*=hidden)|roles|hp/atk/def/spa/spd/spe"
+
+
+def encode_pokemon(record: Mapping) -> str:
+    """One table row for a parsed record, e.g. ``Dragonite|dragon/flying|inner-focus,multiscale*|Balanced,Tank|91/134/95/100/100/80``."""
+    stats = record.get("stats") or {}
+    return "|".join((
+        record.get("pokemon_name", "").capitalize(),
+        "/".join(record.get("types", [])),
+        ",".join(ability + ("*" if hidden else "") for ability, hidden in (record.get("abilities") or {}).items()),
+        ",".join(record.get("role_type", [])),
+        "/".join(str(stats.get(stat, "?")) for stat in STAT_NAMES) if stats else "",
+    ))
+
+
+def build_prompt(
+    template: str,
+    user_query: str,
+    records: Iterable[Mapping],
+    token_budget: int | None = None,
+    context_format: str | None = None
+) -> dict:
+    """Fill ``template`` with as much Pokemon context as fits the token budget.
+
+    ``records`` are expected most relevant first: rows are added in order
+    and the first one that would take the estimated prompt size over
+    ``token_budget`` ends the context, so what gets cut is always the least
+    relevant tail. Returns the prompt together with its token accounting.
+    """
+    token_budget = token_budget or settings.PROMPT_TOKEN_BUDGET
+    context_format = context_format or settings.PROMPT_CONTEXT_FORMAT
+    if context_format not in CONTEXT_FORMATS:
+        raise ValueError(f"Unknown prompt context format: {context_format}")
+
+    records = list(records)
+    encode = encode_pokemon if context_format == "table" else generate_descriptions
+    # Token estimates are ~4 characters each, so the budget is tracked in characters
+    char_budget = token_budget * 4 + 3
+    used = len(template.format(user_query=user_query, pokemon_description=""))
+    lines = [TABLE_PREAMBLE, TABLE_HEADER] if context_format == "table" else []
+    used += len("\n".join(lines))
+
+    included = 0
+    for record in records:
+        line = encode(record)
+        if used + len(line) + 1 > char_budget:
+            break
+        lines.append(line)
+        used += len(line) + 1
+        included += 1
+
+    context = "\n".join(lines) if included else ""
+    prompt = template.format(user_query=user_query, pokemon_description=context)
+    return {
+        "prompt": prompt,
+        "pokemon": included,
+        "dropped": len(records) - included,
+        "context_tokens": estimate_tokens(context) if context else 0,
+        "prompt_tokens": estimate_tokens(prompt),
+    }
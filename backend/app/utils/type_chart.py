@@ -0,0 +1,64 @@
+import numpy as np
+
+TYPE_NAMES = (
+    "normal", "fire", "water", "electric", "grass", "ice", "fighting", "poison", "ground",
+    "flying", "psychic", "bug", "rock", "ghost", "dragon", "dark", "steel", "fairy",
+)
+TYPE_INDEX = {name: index for index, name in enumerate(TYPE_NAMES)}
+
+# Attacking type -> defending types it does not hit for 1x (Gen VI onwards)
+_MATCHUPS = {
+    "normal": {"rock": 0.5, "ghost": 0.0, "steel": 0.5},
+    "fire": {"fire": 0.5, "water": 0.5, "grass": 2.0, "ice": 2.0, "bug": 2.0, "rock": 0.5, "dragon": 0.5, "steel": 2.0},
+    "water": {"fire": 2.0, "water": 0.5, "grass": 0.5, "ground": 2.0, "rock": 2.0, "dragon": 0.5},
+    "electric": {"water": 2.0, "electric": 0.5, "grass": 0.5, "ground": 0.0, "flying": 2.0, "dragon": 0.5},
+    "grass": {
+        "fire": 0.5, "water": 2.0, "grass": 0.5, "poison": 0.5, "ground": 2.0, "flying": 0.5, "bug": 0.5,
+        "rock": 2.0, "dragon": 0.5, "steel": 0.5,
+    },
+    "ice": {"fire": 0.5, "water": 0.5, "grass": 2.0, "ice": 0.5, "ground": 2.0, "flying": 2.0, "dragon": 2.0, "steel": 0.5},
+    "fighting": {
+        "normal": 2.0, "ice": 2.0, "poison": 0.5, "flying": 0.5, "psychic": 0.5, "bug": 0.5, "rock": 2.0,
+        "ghost": 0.0, "dark": 2.0, "steel": 2.0, "fairy": 0.5,
+    },
+    "poison": {"grass": 2.0, "poison": 0.5, "ground": 0.5, "rock": 0.5, "ghost": 0.5, "steel": 0.0, "fairy": 2.0},
+    "ground": {"fire": 2.0, "electric": 2.0, "grass": 0.5, "poison": 2.0, "flying": 0.0, "bug": 0.5, "rock": 2.0, "steel": 2.0},
+    "flying": {"electric": 0.5, "grass": 2.0, "fighting": 2.0, "bug": 2.0, "rock": 0.5, "steel": 0.5},
+    "psychic": {"fighting": 2.0, "poison": 2.0, "psychic": 0.5, "dark": 0.0, "steel": 0.5},
+    "bug": {
+        "fire": 0.5, "grass": 2.0, "fighting": 0.5, "poison": 0.5, "flying": 0.5, "psychic": 2.0, "ghost": 0.5,
+        "dark": 2.0, "steel": 0.5, "fairy": 0.5,
+    },
+    "rock": {"fire": 2.0, "ice": 2.0, "fighting": 0.5, "ground": 0.5, "flying": 2.0, "bug": 2.0, "steel": 0.5},
+    "ghost": {"normal": 0.0, "psychic": 2.0, "ghost": 2.0, "dark": 0.5},
+    "dragon": {"dragon": 2.0, "steel": 0.5, "fairy": 0.0},
+    "dark": {"fighting": 0.5, "psychic": 2.0, "ghost": 2.0, "dark": 0.5, "fairy": 0.5},
+    "steel": {"fire": 0.5, "water": 0.5, "electric": 0.5, "ice": 2.0, "rock": 2.0, "steel": 0.5, "fairy": 2.0},
+    "fairy": {"fire": 0.5, "fighting": 2.0, "poison": 0.5, "dragon": 2.0, "dark": 2.0, "steel": 0.5},
+}
+
+
+def _build_chart() -> np.ndarray:
+    chart = np.ones((len(TYPE_NAMES), len(TYPE_NAMES)), dtype=np.float32)
+    for attacker, matchups in _MATCHUPS.items():
+        for defender, multiplier in matchups.items():
+            chart[TYPE_INDEX[attacker], TYPE_INDEX[defender]] = multiplier
+    chart.setflags(write=False)
+    return chart
+
+
+# EFFECTIVENESS[attacker, defender] is the damage multiplier of one type against another
+EFFECTIVENESS = _build_chart()
+
+
+def type_indices(types: list[str]) -> list[int]:
+    """Chart rows for type names, skipping any the chart does not know."""
+    return [TYPE_INDEX[t] for t in (t.strip().lower() for t in types) if t in TYPE_INDEX]
+
+
+def defensive_profile(types: list[str]) -> np.ndarray:
+    """Multiplier every attacking type deals to a Pokemon of ``types`` (length 18)."""
+    indices = type_indices(types)
+    if not indices:
+        return np.ones(len(TYPE_NAMES), dtype=np.float32)
+    return EFFECTIVENESS[:, indices].prod(axis=1)
@@ -0,0 +1,52 @@
+"""
+Compare the per-record and bulk paths for assigning roles and rendering descriptions.
+
+Run from the backend directory:
+
+    python benchmarks/bench_descriptions.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.service.pokedex import PokedexStore
+from app.utils.bulk_pokedex import assign_roles_bulk, generate_descriptions_bulk
+from app.utils.generate_descriptions import generate_descriptions
+from app.utils.parse_pokemon_data import assign_roles
+
+REPEATS = 20
+
+
+def per_record(records: list[dict]) -> list[str]:
+    descriptions = []
+    for record in records:
+        roles = assign_roles(record["stats"], record["types"])
+        descriptions.append(generate_descriptions({**record, "role_type": roles}))
+    return descriptions
+
+
+def bulk(store: PokedexStore) -> list[str]:
+    return generate_descriptions_bulk(store, assign_roles_bulk(store))
+
+
+def main() -> None:
+    store = PokedexStore.from_file("all_parsed_data.json")
+    records = [record.to_dict() for record in store.records]
+
+    assert per_record(records) == bulk(store), "bulk output differs from the per-record path"
+
+    timings = {
+        "roles, per-record": lambda: [assign_roles(r["stats"], r["types"]) for r in records],
+        "roles, bulk": lambda: assign_roles_bulk(store),
+        "pipeline, per-record": lambda: per_record(records),
+        "pipeline, bulk": lambda: bulk(store),
+    }
+    print(f"{len(store)} Pokemon, best of {REPEATS}")
+    for label, fn in timings.items():
+        best_ms = min(timeit.repeat(fn, number=1, repeat=REPEATS)) * 1000
+        print(f"{label:22} {best_ms:8.2f} ms")
+
+if __name__ == "__main__":
+    main()
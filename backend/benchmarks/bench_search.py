@@ -0,0 +1,65 @@
+"""
+Compare the search index against a linear scan over the Pokedex records for
+typical filter queries.
+
+Run from the backend directory:
+
+    python benchmarks/bench_search.py
+"""
+import operator
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.service.pokedex import PokedexStore
+from app.service.search import PREDICATE_PATTERN, PokedexSearchIndex
+
+REPEATS = 200
+
+QUERIES = {
+    "type": ({"type": ["fire"]}, []),
+    "type + stat range": ({"type": ["fire"]}, ["speed>=100"]),
+    "move + ability": ({"move": ["stealth-rock"], "ability": ["sturdy"]}, []),
+    "role + two ranges": ({"role": ["Sweeper"]}, ["speed>=90", "attack>100"]),
+}
+
+
+OPERATORS = {">=": operator.ge, "<=": operator.le, ">": operator.gt, "<": operator.lt, "=": operator.eq}
+FIELDS = {"type": "types", "move": "moves", "ability": "abilities", "role": "role_type"}
+
+
+def linear_scan(records: list[dict], terms: dict, predicates: list[str]) -> list[int]:
+    ranges = [PREDICATE_PATTERN.match(predicate).groups() for predicate in predicates]
+    matches = []
+    for record in records:
+        if not all(value in record[FIELDS[field]] for field, values in terms.items() for value in values):
+            continue
+        if not all(
+            stat in record["stats"] and OPERATORS[op](record["stats"][stat], float(bound))
+            for stat, op, bound in ranges
+        ):
+            continue
+        matches.append(record["pokemon_id"])
+    return sorted(matches)
+
+
+def main() -> None:
+    store = PokedexStore.from_file("all_parsed_data.json")
+    records = [record.to_dict() for record in store.records]
+    build_ms = min(timeit.repeat(lambda: PokedexSearchIndex(store), number=1, repeat=5)) * 1000
+    index = PokedexSearchIndex(store)
+
+    print(f"{len(store)} Pokemon, index built in {build_ms:.2f} ms, best of {REPEATS}")
+    for label, (terms, predicates) in QUERIES.items():
+        result = index.search(terms, predicates, limit=len(store))
+        ids = sorted(store.pokemon_ids[position] for position in result["positions"])
+        assert ids == linear_scan(records, terms, predicates), f"{label}: index and scan disagree"
+
+        index_ms = min(timeit.repeat(lambda: index.search(terms, predicates), number=1, repeat=REPEATS)) * 1000
+        scan_ms = min(timeit.repeat(lambda: linear_scan(records, terms, predicates), number=1, repeat=REPEATS)) * 1000
+        print(f"{label:20} {result['total']:5} hits  index {index_ms:7.3f} ms  scan {scan_ms:7.3f} ms")
+
+if __name__ == "__main__":
+    main()
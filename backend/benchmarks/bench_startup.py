@@ -0,0 +1,62 @@
+"""
+Measure worker startup: importing app.main, then loading the Pokedex store and
+retrieval index from JSON and from the binary snapshot.
+
+Each run happens in a fresh interpreter, like a newly forked worker. Run from
+the backend directory after building the snapshot:
+
+    python -m app.utils.build_snapshot
+    python benchmarks/bench_startup.py
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+REPEATS = 7
+
+IMPORT_CHILD = """
+import time
+start = time.perf_counter()
+import app.main
+print((time.perf_counter() - start) * 1000)
+"""
+
+LOAD_CHILD = """
+import time
+from app.service.pokedex import get_pokedex_store
+from app.service.retrieval import get_description_retriever
+start = time.perf_counter()
+store = get_pokedex_store()
+retriever = get_description_retriever()
+retriever.select("how to counter dragonite")
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def child_ms(code: str, snapshot_path: str = "") -> float:
+    env = {**os.environ, "POKEDEX_SNAPSHOT_PATH": snapshot_path}
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    from app.config.env import settings
+
+    if not (BACKEND_DIR / settings.POKEDEX_SNAPSHOT_PATH).exists():
+        sys.exit(f"{settings.POKEDEX_SNAPSHOT_PATH} not found, build it with python -m app.utils.build_snapshot")
+
+    print(f"Fresh interpreter, best of {REPEATS}")
+    best_ms = min(child_ms(IMPORT_CHILD) for _ in range(REPEATS))
+    print(f"{'import app.main':26} {best_ms:8.2f} ms")
+    for label, path in (("json", ""), ("snapshot", settings.POKEDEX_SNAPSHOT_PATH)):
+        best_ms = min(child_ms(LOAD_CHILD, path) for _ in range(REPEATS))
+        print(f"{'store + index, ' + label:26} {best_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(BACKEND_DIR))
+    main()
@@ -0,0 +1,41 @@
+"""
+Time the beam-search team optimizer on typical constraint sets.
+
+Run from the backend directory:
+
+    python benchmarks/bench_team.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.service.counters import CounterEngine
+from app.service.pokedex import PokedexStore
+from app.service.team import TeamOptimizer
+
+REPEATS = 20
+
+CONSTRAINTS = {
+    "unconstrained": {},
+    "water + sweeper": {"required_types": ["water"], "required_roles": ["sweeper"]},
+    "pikachu, speed>=80": {"include": ["pikachu"], "exclude": ["mewtwo"], "min_speed": 80},
+    "3 types + tank": {"required_types": ["bug", "ice", "normal"], "required_roles": ["tank"]},
+}
+
+
+def main() -> None:
+    store = PokedexStore.from_file("all_parsed_data.json")
+    build_ms = min(timeit.repeat(lambda: TeamOptimizer(CounterEngine(store)), number=1, repeat=5)) * 1000
+    optimizer = TeamOptimizer(CounterEngine(store))
+
+    print(f"{len(store)} Pokemon, optimizer built in {build_ms:.2f} ms, best of {REPEATS}")
+    for label, constraints in CONSTRAINTS.items():
+        best_ms = min(timeit.repeat(lambda: optimizer.optimize(**constraints), number=1, repeat=REPEATS)) * 1000
+        team = optimizer.optimize(**constraints)[0]
+        names = ", ".join(member["pokemon_name"] for member in team["members"])
+        print(f"{label:20} {best_ms:7.2f} ms  {len(team['coverage'])}/18 covered  {names}")
+
+if __name__ == "__main__":
+    main()
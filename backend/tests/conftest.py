@@ -7,6 +7,27 @@ import asyncio
 from app.main import app
 from app.config.env import Settings
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Keep cached lookups from leaking between tests"""
+    from app.utils.parse_pokemon_data import pokemon_cache, popular_pokemon
+    from app.utils.llm_cache import llm_response_cache
+    pokemon_cache.clear()
+    popular_pokemon.clear()
+    llm_response_cache.clear()
+    yield
+    pokemon_cache.clear()
+    popular_pokemon.clear()
+    llm_response_cache.clear()
+
+@pytest.fixture(autouse=True)
+def reset_pokeapi_breaker():
+    """Give every test a closed PokeAPI circuit breaker"""
+    from app.service import pokemon
+    pokemon._pokeapi_caller = None
+    yield
+    pokemon._pokeapi_caller = None
+
 # Test data fixtures
 @pytest.fixture
 def sample_pokemon_data():
@@ -80,10 +101,13 @@ def mock_aiohttp_session():
 # Mock fixtures for API endpoints
 @pytest.fixture
 def mock_llm():
-    """Mock LLM service for API endpoints"""
+    """Mock LLM service injected into the API endpoints"""
+    from app.config.llm import get_llm
     mock = MagicMock()
-    mock.generate_content.return_value = "Mock LLM response"
-    return mock
+    mock.generate_content = AsyncMock(return_value="Mock LLM response")
+    app.dependency_overrides[get_llm] = lambda: mock
+    yield mock
+    app.dependency_overrides.pop(get_llm, None)
 
 @pytest.fixture
 def mock_parse_pokemon_data():
@@ -4,6 +4,7 @@ from unittest.mock import patch, AsyncMock, MagicMock
 from fastapi import HTTPException
 from fastapi.testclient import TestClient
 from httpx import AsyncClient
+from aioresponses import aioresponses
 
 
 @pytest.mark.integration
@@ -149,126 +150,280 @@ class TestPokemonEndpoints:
         expected_response = "Pikachu description\n\nCharizard description"
         assert response.json() == expected_response
 
+    def test_compare_pokemon_fetches_concurrently(self, client, mock_parse_pokemon_data, mock_generate_descriptions):
+        """Test both Pokemon in a comparison are looked up at the same time"""
+        import asyncio
+        state = {"active": 0, "peak": 0}
+
+        async def slow_parse(name):
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            await asyncio.sleep(0.01)
+            state["active"] -= 1
+            return {"name": name}
+
+        mock_parse_pokemon_data.side_effect = slow_parse
+        
+        response = client.get("/api/v1/pokemon/compare/pikachu/charizard")
+        
+        assert response.status_code == 200
+        assert state["peak"] == 2
+
+    def test_compare_many_pokemon_success(self, client, mock_parse_pokemon_data, mock_generate_descriptions):
+        """Test comparing a whole team in one request"""
+        team = ["Pikachu", "charizard", "blastoise"]
+        mock_parse_pokemon_data.side_effect = lambda name: {"name": name}
+        mock_generate_descriptions.side_effect = lambda data: f"{data['name']} description"
+        
+        response = client.post("/api/v1/pokemon/compare", json=team)
+        
+        assert response.status_code == 200
+        body = response.json()
+        assert [r["name"] for r in body["results"]] == ["pikachu", "charizard", "blastoise"]
+        assert all(r["error"] is None for r in body["results"])
+        assert body["comparison"] == "pikachu description\n\ncharizard description\n\nblastoise description"
+
+    def test_compare_many_pokemon_partial_failure(self, client, mock_parse_pokemon_data, mock_generate_descriptions):
+        """Test one unknown Pokemon does not fail the whole comparison"""
+        def parse(name):
+            if name == "nonexistent":
+                raise Exception("Pokemon nonexistent not found")
+            return {"name": name}
+
+        mock_parse_pokemon_data.side_effect = parse
+        mock_generate_descriptions.side_effect = lambda data: f"{data['name']} description"
+        
+        response = client.post("/api/v1/pokemon/compare", json=["pikachu", "nonexistent"])
+        
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert results[0]["description"] == "pikachu description"
+        assert results[1]["description"] is None
+        assert "not found" in results[1]["error"]
+
+    def test_compare_many_pokemon_limits(self, client):
+        """Test empty and oversized comparisons are rejected"""
+        assert client.post("/api/v1/pokemon/compare", json=[]).status_code == 422
+        assert client.post("/api/v1/pokemon/compare", json=["pikachu"] * 13).status_code == 422
+
+    def test_batch_lookup_success(self, client, mock_parse_pokemon_data, mock_generate_descriptions):
+        """Test a batch returns descriptions and parsed records in request order"""
+        mock_parse_pokemon_data.side_effect = lambda name: {"pokemon_name": name}
+        mock_generate_descriptions.side_effect = lambda data: f"{data['pokemon_name']} description"
+        
+        response = client.post("/api/v1/pokemon/batch", json=["Pikachu", 6, "pikachu"])
+        
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["query"] for r in results] == ["pikachu", "6", "pikachu"]
+        assert results[0] == {
+            "query": "pikachu",
+            "description": "pikachu description",
+            "data": {"pokemon_name": "pikachu"},
+            "error": None,
+        }
+        assert results[1]["data"] == {"pokemon_name": "6"}
+        # Duplicates are only looked up once
+        assert mock_parse_pokemon_data.call_count == 2
+
+    def test_batch_lookup_reports_errors_per_item(self, client, mock_parse_pokemon_data, mock_generate_descriptions):
+        """Test an unknown Pokemon in a batch only fails its own item"""
+        def parse(name):
+            if name == "nonexistent":
+                raise Exception("Pokemon nonexistent not found")
+            return {"pokemon_name": name}
+
+        mock_parse_pokemon_data.side_effect = parse
+        
+        response = client.post("/api/v1/pokemon/batch", json=["nonexistent", "pikachu"])
+        
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert results[0]["data"] is None
+        assert "not found" in results[0]["error"]
+        assert results[1]["error"] is None
+
+    def test_batch_lookup_from_store(self, client):
+        """Test a batch of known Pokemon is served from the local Pokedex"""
+        response = client.post("/api/v1/pokemon/batch", json=["bulbasaur", 25])
+        
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert results[0]["description"].startswith("Bulbasaur is a Grass, Poison type")
+        assert results[1]["data"]["pokemon_name"] == "pikachu"
+
     def test_strategy_endpoint_success(self, client, mock_llm):
         """Test successful strategy generation"""
         user_query = "How to beat Elite Four?"
         
-        with patch('app.api.endpoints.llm', mock_llm):
-            response = client.post(
-                "/api/v1/pokemon/strategy",
-                json=user_query
-            )
-            
-            assert response.status_code == 200
-            assert response.json() == "Mock LLM response"
-            mock_llm.generate_content.assert_called_once()
+        response = client.post(
+            "/api/v1/pokemon/strategy",
+            json=user_query
+        )
+        
+        assert response.status_code == 200
+        assert response.json() == "Mock LLM response"
+        mock_llm.generate_content.assert_called_once()
 
     def test_strategy_endpoint_llm_error(self, client, mock_llm):
         """Test strategy endpoint with LLM error"""
         user_query = "How to beat Elite Four?"
         mock_llm.generate_content.side_effect = Exception("LLM Error")
         
-        with patch('app.api.endpoints.llm', mock_llm):
-            response = client.post(
-                "/api/v1/pokemon/strategy",
-                json=user_query
-            )
-            
-            assert response.status_code == 500
-            assert "LLM Error" in response.json()["detail"]
+        response = client.post(
+            "/api/v1/pokemon/strategy",
+            json=user_query
+        )
+        
+        assert response.status_code == 500
+        assert "LLM Error" in response.json()["detail"]
 
     def test_strategy_endpoint_empty_query(self, client, mock_llm):
         """Test strategy endpoint with empty query"""
         user_query = ""
         
-        with patch('app.api.endpoints.llm', mock_llm):
-            response = client.post(
-                "/api/v1/pokemon/strategy",
-                json=user_query
-            )
-            
-            assert response.status_code == 200
-            mock_llm.generate_content.assert_called_once()
+        response = client.post(
+            "/api/v1/pokemon/strategy",
+            json=user_query
+        )
+        
+        assert response.status_code == 200
+        mock_llm.generate_content.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_strategy_endpoint_async(self, async_client, mock_llm):
         """Test strategy endpoint with async client"""
         user_query = "How to beat Elite Four?"
         
-        with patch('app.api.endpoints.llm', mock_llm):
-            response = await async_client.post(
-                "/api/v1/pokemon/strategy",
-                json=user_query
-            )
-            
-            assert response.status_code == 200
-            assert response.json() == "Mock LLM response"
+        response = await async_client.post(
+            "/api/v1/pokemon/strategy",
+            json=user_query
+        )
+        
+        assert response.status_code == 200
+        assert response.json() == "Mock LLM response"
+
+    def test_strategy_endpoint_sends_selected_context(self, client, mock_llm):
+        """Test strategy prompt only carries the retrieved descriptions"""
+        user_query = "How to counter Dragonite?"
+        
+        response = client.post(
+            "/api/v1/pokemon/strategy",
+            json=user_query
+        )
+        
+        assert response.status_code == 200
+        assert int(response.headers["X-Context-Pokemon"]) == 25
+        assert int(response.headers["X-Context-Tokens-Saved"]) > 0
+        prompt = mock_llm.generate_content.call_args[0][0]
+        assert "Dragonite" in prompt
+        assert "Bulbasaur" not in prompt
+
+    def test_strategy_endpoint_streaming(self, client, mock_llm):
+        """Test strategy can be streamed as server-sent events"""
+        async def stream_content(prompt):
+            yield "Use ice moves.\nGarchomp is weak"
+            yield " to them."
+
+        mock_llm.stream_content = stream_content
+        
+        response = client.post(
+            "/api/v1/pokemon/strategy?stream=true",
+            json="How to counter Garchomp?"
+        )
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert "x-context-tokens" in response.headers
+        assert response.text == (
+            "data: Use ice moves.\ndata: Garchomp is weak\n\n"
+            "data:  to them.\n\n"
+            "event: done\ndata: [DONE]\n\n"
+        )
+        mock_llm.generate_content.assert_not_called()
+
+    def test_team_building_endpoint_streaming_error(self, client, mock_llm):
+        """Test errors during a stream are sent as an error event"""
+        async def stream_content(prompt):
+            yield "Team: Pikachu"
+            raise Exception("LLM Error")
+
+        mock_llm.stream_content = stream_content
+        
+        response = client.post(
+            "/api/v1/pokemon/team-building?stream=true",
+            json="Build a team"
+        )
+        
+        assert response.status_code == 200
+        assert response.text.endswith("event: error\ndata: LLM Error\n\n")
 
     def test_team_building_endpoint_success(self, client, mock_llm):
         """Test successful team building"""
         user_query = "Build a balanced team for competitive play"
         
-        with patch('app.api.endpoints.llm', mock_llm):
-            response = client.post(
-                "/api/v1/pokemon/team-building",
-                json=user_query
-            )
-            
-            assert response.status_code == 200
-            assert response.json() == "Mock LLM response"
-            mock_llm.generate_content.assert_called_once()
+        response = client.post(
+            "/api/v1/pokemon/team-building",
+            json=user_query
+        )
+        
+        assert response.status_code == 200
+        assert response.json() == "Mock LLM response"
+        mock_llm.generate_content.assert_called_once()
 
     def test_team_building_endpoint_llm_error(self, client, mock_llm):
         """Test team building endpoint with LLM error"""
         user_query = "Build a team"
         mock_llm.generate_content.side_effect = Exception("LLM Error")
         
-        with patch('app.api.endpoints.llm', mock_llm):
-            response = client.post(
-                "/api/v1/pokemon/team-building",
-                json=user_query
-            )
-            
-            assert response.status_code == 500
-            assert "LLM Error" in response.json()["detail"]
+        response = client.post(
+            "/api/v1/pokemon/team-building",
+            json=user_query
+        )
+        
+        assert response.status_code == 500
+        assert "LLM Error" in response.json()["detail"]
 
     def test_team_building_endpoint_empty_query(self, client, mock_llm):
         """Test team building endpoint with empty query"""
         user_query = ""
         
-        with patch('app.api.endpoints.llm', mock_llm):
-            response = client.post(
-                "/api/v1/pokemon/team-building",
-                json=user_query
-            )
-            
-            assert response.status_code == 200
-            mock_llm.generate_content.assert_called_once()
+        response = client.post(
+            "/api/v1/pokemon/team-building",
+            json=user_query
+        )
+        
+        assert response.status_code == 200
+        mock_llm.generate_content.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_team_building_endpoint_async(self, async_client, mock_llm):
         """Test team building endpoint with async client"""
         user_query = "Build a balanced team"
         
-        with patch('app.api.endpoints.llm', mock_llm):
-            response = await async_client.post(
-                "/api/v1/pokemon/team-building",
-                json=user_query
-            )
-            
-            assert response.status_code == 200
-            assert response.json() == "Mock LLM response"
+        response = await async_client.post(
+            "/api/v1/pokemon/team-building",
+            json=user_query
+        )
+        
+        assert response.status_code == 200
+        assert response.json() == "Mock LLM response"
 
-    def test_invalid_endpoint(self, client):
+    def test_invalid_endpoint(self, client, test_settings):
         """Test accessing invalid endpoint"""
-        response = client.get("/api/v1/pokemon/invalid-endpoint")
+        with aioresponses() as m:
+            # PokeAPI answers 404 for the unknown name; connection failures would be a 502
+            m.get(f"{test_settings.POKEMON_API_URL}/pokemon/invalid-endpoint", status=404)
+            response = client.get("/api/v1/pokemon/invalid-endpoint")
         
         assert response.status_code == 404
 
-    def test_wrong_http_method(self, client):
+    def test_wrong_http_method(self, client, test_settings):
         """Test using wrong HTTP method"""
         # Strategy endpoint expects POST, but GET treats "strategy" as a Pokemon name
-        response = client.get("/api/v1/pokemon/strategy")
+        with aioresponses() as m:
+            m.get(f"{test_settings.POKEMON_API_URL}/pokemon/strategy", status=404)
+            response = client.get("/api/v1/pokemon/strategy")
         
         # This actually hits the Pokemon endpoint with "strategy" as the name
         # So it returns 404 for Pokemon not found, not 405 Method Not Allowed
@@ -304,14 +459,13 @@ class TestEndpointIntegration:
         
         # Then create strategy based on that Pokemon
         strategy_query = f"Create a strategy using {pokemon_name}"
-        with patch('app.api.endpoints.llm', mock_llm):
-            strategy_response = client.post(
-                "/api/v1/pokemon/strategy",
-                json=strategy_query
-            )
-            
-            assert strategy_response.status_code == 200
-            assert strategy_response.json() == "Mock LLM response"
+        strategy_response = client.post(
+            "/api/v1/pokemon/strategy",
+            json=strategy_query
+        )
+        
+        assert strategy_response.status_code == 200
+        assert strategy_response.json() == "Mock LLM response"
 
     def test_compare_to_team_building_flow(self, client, mock_parse_pokemon_data,
                                          mock_generate_descriptions, mock_llm):
@@ -331,11 +485,10 @@ class TestEndpointIntegration:
         
         # Then build team including these Pokemon
         team_query = f"Build a team with {pokemon1} and {pokemon2}"
-        with patch('app.api.endpoints.llm', mock_llm):
-            team_response = client.post(
-                "/api/v1/pokemon/team-building",
-                json=team_query
-            )
-            
-            assert team_response.status_code == 200
-            assert team_response.json() == "Mock LLM response" 
+        team_response = client.post(
+            "/api/v1/pokemon/team-building",
+            json=team_query
+        )
+        
+        assert team_response.status_code == 200
+        assert team_response.json() == "Mock LLM response" 
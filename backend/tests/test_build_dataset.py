@@ -0,0 +1,147 @@
+import pytest
+import json
+import re
+from aioresponses import aioresponses, CallbackResult
+from app.service.pokemon import PokemonService
+from app.utils.build_dataset import DatasetBuilder, write_dataset
+
+BASE_URL = "http://pokeapi.test/api/v2"
+POKEMON_URL = re.compile(rf"^{re.escape(BASE_URL)}/pokemon/[\w-]+$")
+
+
+def raw_pokemon(name, pokemon_id):
+    return {
+        "id": pokemon_id,
+        "name": name,
+        "base_experience": 100,
+        "height": 10,
+        "weight": 100,
+        "species": {"name": name},
+        "abilities": [{"ability": {"name": "overgrow"}, "is_hidden": False}],
+        "moves": [{"move": {"name": "tackle"}}],
+        "types": [{"type": {"name": "grass"}}],
+        "stats": [{"stat": {"name": stat}, "base_stat": 80}
+                  for stat in ("hp", "attack", "defense", "special-attack", "special-defense", "speed")],
+    }
+
+
+class FakePokeAPI:
+    """PokeAPI stand-in that honours If-None-Match and can fail a Pokemon a few times"""
+
+    def __init__(self, pokemon, failures=None):
+        self.pokemon = pokemon
+        self.failures = dict(failures or {})
+        self.requests = []
+
+    def install(self, m):
+        m.get(f"{BASE_URL}/pokemon?limit=100000", payload={
+            "results": [{"name": name} for name in self.pokemon]
+        }, repeat=True)
+        m.get(POKEMON_URL, callback=self.pokemon_page, repeat=True)
+
+    def pokemon_page(self, url, headers=None, **kwargs):
+        name = str(url).rsplit("/", 1)[-1]
+        self.requests.append(name)
+        if self.failures.get(name, 0) > 0:
+            self.failures[name] -= 1
+            return CallbackResult(status=500, reason="Internal Server Error")
+        if name not in self.pokemon:
+            return CallbackResult(status=404, reason="Not Found")
+        etag = f'"{name}-v1"'
+        if (headers or {}).get("If-None-Match") == etag:
+            return CallbackResult(status=304, headers={"ETag": etag})
+        return CallbackResult(payload=raw_pokemon(name, self.pokemon[name]), headers={"ETag": etag})
+
+
+def make_builder(tmp_path, **kwargs):
+    service = PokemonService()
+    service.base_url = BASE_URL
+    return DatasetBuilder(service, state_path=str(tmp_path / "state.json"), rate=0, backoff=0, **kwargs)
+
+
+@pytest.mark.unit
+class TestDatasetBuilder:
+    """Unit tests for the offline PokeAPI crawler"""
+
+    @pytest.mark.asyncio
+    async def test_builds_dataset_and_descriptions(self, tmp_path):
+        """Test a full crawl writes records sorted by id and matching descriptions"""
+        api = FakePokeAPI({"ivysaur": 2, "bulbasaur": 1})
+        builder = make_builder(tmp_path)
+
+        with aioresponses() as m:
+            api.install(m)
+            records = await builder.build()
+
+        assert [record["pokemon_id"] for record in records] == [1, 2]
+        assert records[0]["pokemon_name"] == "bulbasaur"
+
+        data_path, descriptions_path = tmp_path / "data.json", tmp_path / "descriptions.json"
+        write_dataset(records, str(data_path), str(descriptions_path))
+        assert json.loads(data_path.read_text()) == records
+        descriptions = json.loads(descriptions_path.read_text())
+        assert len(descriptions) == 2
+        assert "Bulbasaur" in descriptions[0]
+
+    @pytest.mark.asyncio
+    async def test_incremental_refresh_uses_conditional_requests(self, tmp_path):
+        """Test a second run sends the stored ETags and keeps unchanged records"""
+        api = FakePokeAPI({"bulbasaur": 1, "ivysaur": 2})
+
+        with aioresponses() as m:
+            api.install(m)
+            first = await make_builder(tmp_path).build()
+            builder = make_builder(tmp_path)
+            second = await builder.build()
+
+        assert second == first
+        assert builder.stats["fetched"] == 0
+        assert builder.stats["not_modified"] == 2
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_errors(self, tmp_path):
+        """Test 5xx responses are retried until they succeed"""
+        api = FakePokeAPI({"bulbasaur": 1}, failures={"bulbasaur": 2})
+        builder = make_builder(tmp_path, retries=3)
+
+        with aioresponses() as m:
+            api.install(m)
+            records = await builder.build()
+
+        assert len(records) == 1
+        assert api.requests.count("bulbasaur") == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_run_resumes_from_checkpoint(self, tmp_path):
+        """Test a run with failures returns None and --resume only fetches what is left"""
+        api = FakePokeAPI({"bulbasaur": 1, "ivysaur": 2}, failures={"ivysaur": 5})
+
+        with aioresponses() as m:
+            api.install(m)
+            builder = make_builder(tmp_path, retries=1)
+            assert await builder.build() is None
+            assert builder.stats["failed"] == 1
+
+            api.requests.clear()
+            resumed = make_builder(tmp_path, retries=5)
+            records = await resumed.build(resume=True)
+
+        assert api.requests == ["ivysaur"] * 4
+        assert [record["pokemon_name"] for record in records] == ["bulbasaur", "ivysaur"]
+        assert resumed.stats["skipped"] == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_pokemon_is_skipped(self, tmp_path):
+        """Test a listed Pokemon that 404s is left out instead of failing the build"""
+        api = FakePokeAPI({"bulbasaur": 1})
+        builder = make_builder(tmp_path)
+
+        with aioresponses() as m:
+            m.get(f"{BASE_URL}/pokemon?limit=100000", payload={
+                "results": [{"name": "bulbasaur"}, {"name": "missingno"}]
+            })
+            m.get(POKEMON_URL, callback=api.pokemon_page, repeat=True)
+            records = await builder.build()
+
+        assert [record["pokemon_name"] for record in records] == ["bulbasaur"]
+        assert builder.stats["missing"] == 1
@@ -0,0 +1,60 @@
+import pytest
+import json
+import sys
+from unittest.mock import patch
+from app.service.pokedex import PokedexStore
+from app.utils.bulk_pokedex import assign_roles_bulk, generate_descriptions_bulk, role_masks, main
+from app.utils.generate_descriptions import generate_descriptions
+from app.utils.parse_pokemon_data import assign_roles
+
+
+@pytest.fixture(scope="module")
+def store():
+    """Store loaded from the bundled dataset"""
+    return PokedexStore.from_file("all_parsed_data.json")
+
+
+@pytest.mark.unit
+class TestBulkPokedex:
+    """Unit tests for the vectorized whole-Pokedex pipeline"""
+
+    def test_roles_match_per_record_path(self, store):
+        """Test vectorized roles equal assign_roles for every Pokemon"""
+        expected = [assign_roles(record["stats"], record["types"]) for record in store.records]
+
+        assert assign_roles_bulk(store) == expected
+
+    def test_descriptions_match_per_record_path(self, store):
+        """Test bulk rendering equals generate_descriptions for every Pokemon"""
+        expected = [generate_descriptions(record) for record in store.records]
+
+        assert generate_descriptions_bulk(store) == expected
+
+    def test_descriptions_match_bundled_file(self, store):
+        """Test the bundled descriptions can be regenerated byte for byte"""
+        with open("all_pokemon_descriptions.json") as f:
+            assert generate_descriptions_bulk(store) == json.load(f)
+
+    def test_recomputed_roles_are_rendered(self, store):
+        """Test roles passed in override the stored role_type"""
+        roles = [["Tank"]] * len(store)
+
+        descriptions = generate_descriptions_bulk(store, roles)
+
+        assert all("It plays the following roles: Tank." in d for d in descriptions)
+
+    def test_missing_stats_count_as_zero(self):
+        """Test records without stats get the same roles as assign_roles gives them"""
+        store = PokedexStore([{"pokemon_name": "missingno", "types": ["psychic"], "stats": {}}])
+
+        assert role_masks(store).shape == (1, 5)
+        assert assign_roles_bulk(store) == [assign_roles({}, ["psychic"])]
+
+    def test_cli_writes_descriptions(self, tmp_path):
+        """Test the CLI regenerates the descriptions file"""
+        output = tmp_path / "descriptions.json"
+
+        with patch.object(sys, "argv", ["bulk_pokedex", "--output", str(output), "--recompute-roles"]):
+            main()
+
+        assert len(json.loads(output.read_text())) == 1302
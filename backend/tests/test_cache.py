@@ -0,0 +1,347 @@
+import pytest
+import asyncio
+from aioresponses import aioresponses
+from unittest.mock import patch
+from app.utils.cache import AsyncTTLCache, PopularityTracker
+from app.service.warmer import CacheWarmer
+from app.service.pokedex import PokedexStore
+from app.service.pokemon import PokemonNotFoundError
+from app.utils.parse_pokemon_data import parse_pokemon_data, pokemon_cache, pokemon_version, popular_pokemon
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_loader(value="value", error=None, delay=0.0):
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return value
+
+    return loader, calls
+
+
+@pytest.mark.unit
+class TestAsyncTTLCache:
+    """Unit tests for the TTL + LRU cache"""
+
+    @pytest.mark.asyncio
+    async def test_hit_after_miss(self):
+        """Test a loaded value is served from the cache on the next lookup"""
+        cache = AsyncTTLCache("test", maxsize=10, ttl=60)
+        loader, calls = make_loader()
+
+        assert await cache.get_or_load("k", loader) == "value"
+        assert await cache.get_or_load("k", loader) == "value"
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_entry_expires_after_ttl(self):
+        """Test entries are reloaded once their TTL has passed"""
+        clock = FakeClock()
+        cache = AsyncTTLCache("test", maxsize=10, ttl=60, clock=clock)
+        loader, calls = make_loader()
+
+        await cache.get_or_load("k", loader)
+        clock.now = 61
+        await cache.get_or_load("k", loader)
+
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        """Test the least recently used entry is evicted when full"""
+        cache = AsyncTTLCache("test", maxsize=2, ttl=60)
+        loader, calls = make_loader()
+
+        await cache.get_or_load("a", loader)
+        await cache.get_or_load("b", loader)
+        await cache.get_or_load("a", loader)
+        await cache.get_or_load("c", loader)
+        await cache.get_or_load("a", loader)
+        await cache.get_or_load("b", loader)
+
+        assert len(cache) == 2
+        assert len(calls) == 4
+
+    @pytest.mark.asyncio
+    async def test_negative_caching(self):
+        """Test not-found errors are cached and other errors are not"""
+        cache = AsyncTTLCache("test", maxsize=10, ttl=60, negative_ttl=30,
+                              negative_exceptions=(PokemonNotFoundError,))
+        missing, missing_calls = make_loader(error=PokemonNotFoundError("Pokemon x not found"))
+        failing, failing_calls = make_loader(error=RuntimeError("boom"))
+
+        for _ in range(2):
+            with pytest.raises(PokemonNotFoundError):
+                await cache.get_or_load("missing", missing)
+            with pytest.raises(RuntimeError):
+                await cache.get_or_load("failing", failing)
+
+        assert len(missing_calls) == 1
+        assert len(failing_calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_negative_hits_raise_fresh_errors(self):
+        """Test each cached not-found hit raises a new error instead of growing one shared traceback"""
+        cache = AsyncTTLCache("test", maxsize=10, ttl=60, negative_ttl=30,
+                              negative_exceptions=(PokemonNotFoundError,))
+        missing, _ = make_loader(error=PokemonNotFoundError("Pokemon x not found"))
+        errors = []
+
+        for _ in range(100):
+            with pytest.raises(PokemonNotFoundError, match="Pokemon x not found") as error:
+                await cache.get_or_load("missing", missing)
+            errors.append(error.value)
+
+        depths = []
+        for error in errors[1:]:
+            depth, traceback = 0, error.__traceback__
+            while traceback is not None:
+                depth, traceback = depth + 1, traceback.tb_next
+            depths.append(depth)
+        assert len({id(error) for error in errors}) == len(errors)
+        assert max(depths) < 5
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_are_coalesced(self):
+        """Test N concurrent misses for one key run the loader once"""
+        cache = AsyncTTLCache("test", maxsize=10, ttl=60)
+        loader, calls = make_loader(delay=0.01)
+
+        results = await asyncio.gather(*(cache.get_or_load("k", loader) for _ in range(10)))
+
+        assert results == ["value"] * 10
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_does_not_cancel_waiters(self):
+        """Test cancelling the caller that started a load leaves the coalesced waiters with its result"""
+        cache = AsyncTTLCache("test", maxsize=10, ttl=60)
+        loader, calls = make_loader(delay=0.05)
+
+        leader = asyncio.create_task(cache.get_or_load("k", loader))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(cache.get_or_load("k", loader)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        assert await asyncio.gather(*waiters) == ["value"] * 3
+        assert leader.cancelled()
+        assert len(calls) == 1
+        assert await cache.get_or_load("k", loader) == "value"
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_errors(self):
+        """Test waiters on a failed load all see the error"""
+        cache = AsyncTTLCache("test", maxsize=10, ttl=60)
+        loader, calls = make_loader(error=RuntimeError("boom"), delay=0.01)
+
+        results = await asyncio.gather(*(cache.get_or_load("k", loader) for _ in range(3)),
+                                       return_exceptions=True)
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert len(calls) == 1
+
+
+@pytest.mark.unit
+class TestStaleWhileRevalidate:
+    """Unit tests for background revalidation of expired entries and the popularity warmer"""
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_served_while_refreshing(self):
+        """Test an expired entry is returned at once and replaced by a background reload"""
+        clock = FakeClock()
+        cache = AsyncTTLCache("test", maxsize=10, ttl=60, stale_ttl=600, revalidate=True, clock=clock)
+        first, _ = make_loader("old")
+        second, second_calls = make_loader("new", delay=0.05)
+
+        await cache.get_or_load("k", first)
+        clock.now = 61
+        assert await cache.get_or_load("k", second) == "old"
+        assert await cache.get_or_load("k", second) == "old"
+
+        await asyncio.gather(*cache._refreshing.values())
+        assert await cache.get_or_load("k", second) == "new"
+        assert len(second_calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_stale_entry(self):
+        """Test a refresh that fails leaves the stale value to be served until its window ends"""
+        clock = FakeClock()
+        cache = AsyncTTLCache("test", maxsize=10, ttl=60, stale_ttl=600, revalidate=True, clock=clock)
+        good, _ = make_loader("old")
+        failing, failing_calls = make_loader(error=RuntimeError("PokeAPI down"))
+
+        await cache.get_or_load("k", good)
+        clock.now = 61
+        assert await cache.get_or_load("k", failing) == "old"
+        await asyncio.gather(*cache._refreshing.values())
+        assert await cache.get_or_load("k", failing) == "old"
+        assert len(failing_calls) == 1
+
+        clock.now = 700
+        with pytest.raises(RuntimeError):
+            await cache.get_or_load("k", failing)
+
+    @pytest.mark.asyncio
+    async def test_refresh_concurrency_is_bounded(self):
+        """Test no more than refresh_concurrency background reloads run at once"""
+        cache = AsyncTTLCache("test", maxsize=10, ttl=60, refresh_concurrency=2)
+        running, peak = 0, 0
+
+        async def loader():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return "value"
+
+        tasks = [cache.refresh(key, loader) for key in range(6)]
+        assert cache.refresh(0, loader) is None
+        await asyncio.gather(*tasks)
+
+        assert peak == 2
+        assert [await cache.peek(key) for key in range(6)] == ["value"] * 6
+
+    def test_popularity_tracker_ranks_and_decays(self):
+        """Test the tracker ranks by count, stays bounded and halves counts on decay"""
+        tracker = PopularityTracker(maxsize=2)
+        for key, count in (("a", 5), ("b", 3), ("c", 1)):
+            for _ in range(count):
+                tracker.record(key)
+        assert tracker.top(2) == ["a", "b"]
+
+        tracker.decay()
+        assert tracker.counts == {"a": 2, "b": 1}
+        for key in "defgh":
+            tracker.record(key)
+        assert len(tracker) <= 4
+
+    @pytest.mark.asyncio
+    async def test_warmer_refreshes_popular_entries_before_expiry(self):
+        """Test a warming round reloads popular entries that would expire before the next round"""
+        clock = FakeClock()
+        cache = AsyncTTLCache("test", maxsize=10, ttl=60, clock=clock)
+        tracker = PopularityTracker(maxsize=10)
+        loads = []
+
+        def loader(key):
+            async def load():
+                loads.append(key)
+                return f"{key}-v{loads.count(key)}"
+            return load
+
+        for key in ("hot", "warm", "cold"):
+            await cache.get_or_load(key, loader(key))
+        for key, count in (("hot", 3), ("warm", 2), ("cold", 1)):
+            for _ in range(count):
+                tracker.record(key)
+
+        warmer = CacheWarmer(cache, tracker, loader, top_n=2, interval=30)
+        clock.now = 20
+        assert await warmer.warm_once() == []
+
+        clock.now = 40
+        await asyncio.gather(*await warmer.warm_once())
+        assert await cache.peek("hot") == "hot-v2"
+        assert await cache.peek("warm") == "warm-v2"
+        assert await cache.peek("cold") == "cold-v1"
+
+    @pytest.mark.asyncio
+    async def test_warmer_skips_cached_errors(self):
+        """Test a popular key remembered as "not found" is not requested again by the warmer"""
+        cache = AsyncTTLCache("test", maxsize=10, ttl=60, negative_ttl=60,
+                              negative_exceptions=(PokemonNotFoundError,))
+        tracker = PopularityTracker(maxsize=10)
+        missing, calls = make_loader(error=PokemonNotFoundError("Pokemon missingno not found"))
+        with pytest.raises(PokemonNotFoundError):
+            await cache.get_or_load("missingno", missing)
+        for _ in range(3):
+            tracker.record("missingno")
+
+        warmer = CacheWarmer(cache, tracker, lambda key: missing, top_n=2, interval=120)
+        assert await warmer.warm_once() == []
+        assert len(calls) == 1
+
+@pytest.mark.unit
+class TestParsePokemonDataCache:
+    """Unit tests for the upstream cache in parse_pokemon_data"""
+
+    @pytest.mark.asyncio
+    async def test_single_upstream_request_for_concurrent_misses(self, sample_pokemon_data, test_settings):
+        """Test concurrent lookups of a missing Pokemon share one PokeAPI request"""
+        url = f"{test_settings.POKEMON_API_URL}/pokemon/pikachu"
+
+        with patch('app.utils.parse_pokemon_data.get_pokedex_store', return_value=PokedexStore()), \
+             aioresponses() as m:
+            m.get(url, payload=sample_pokemon_data, repeat=True)
+
+            results = await asyncio.gather(*(parse_pokemon_data("pikachu") for _ in range(5)))
+            requests = sum(len(calls) for calls in m.requests.values())
+
+        assert all(result["pokemon_id"] == 25 for result in results)
+        assert requests == 1
+
+    @pytest.mark.asyncio
+    async def test_bundled_pokemon_skip_the_cache(self):
+        """Test lookups and versions of bundled Pokemon never read the cache backend"""
+        with patch.object(pokemon_cache.backend, 'get', side_effect=AssertionError("cache read")) as backend_get:
+            data = await parse_pokemon_data("Pikachu")
+            version = await pokemon_version("pikachu")
+
+        assert data["pokemon_name"] == "pikachu"
+        assert version is not None
+        backend_get.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_not_found_is_cached(self, test_settings):
+        """Test a 404 is remembered instead of asking PokeAPI again"""
+        url = f"{test_settings.POKEMON_API_URL}/pokemon/missingno"
+
+        with patch('app.utils.parse_pokemon_data.get_pokedex_store', return_value=PokedexStore()), \
+             aioresponses() as m:
+            m.get(url, status=404, repeat=True)
+
+            for _ in range(3):
+                with pytest.raises(PokemonNotFoundError):
+                    await parse_pokemon_data("missingno")
+            requests = sum(len(calls) for calls in m.requests.values())
+
+        assert requests == 1
+        assert popular_pokemon.top(1) == []
+
+    @pytest.mark.asyncio
+    async def test_fetched_pokemon_is_revalidated_off_the_request_path(self, sample_pokemon_data, test_settings):
+        """Test a Pokemon fetched from PokeAPI is served stale after expiry while one background refresh runs"""
+        url = f"{test_settings.POKEMON_API_URL}/pokemon/pikachu"
+        store = PokedexStore()
+
+        with patch('app.utils.parse_pokemon_data.get_pokedex_store', return_value=store), \
+             patch.object(pokemon_cache, 'clock', FakeClock()) as clock, \
+             aioresponses() as m:
+            m.get(url, payload=sample_pokemon_data, repeat=True)
+
+            first = await parse_pokemon_data("pikachu")
+            clock.now = test_settings.POKEMON_CACHE_TTL_SECONDS + 1
+            stale = await parse_pokemon_data("pikachu")
+            await asyncio.gather(*pokemon_cache._refreshing.values())
+            requests = sum(len(calls) for calls in m.requests.values())
+
+        assert stale == first
+        assert requests == 2
+        assert len(store) == 1
+        assert popular_pokemon.top(1) == ["pikachu"]
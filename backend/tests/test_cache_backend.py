@@ -0,0 +1,203 @@
+import pytest
+import sqlite3
+import subprocess
+import sys
+import textwrap
+import threading
+from pathlib import Path
+from app.service.pokemon import PokemonNotFoundError
+from app.utils.cache import AsyncTTLCache
+from app.utils.cache_backend import MemoryBackend, SQLiteBackend, create_cache_backend, key_text
+from app.utils.llm_cache import LLMResponseCache
+from app.utils.prompts import strategy_prompt
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+class FakeClock:
+    """Manually advanced wall clock"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    """Path of a fresh shared cache database"""
+    return str(tmp_path / "cache.sqlite3")
+
+
+@pytest.mark.unit
+class TestCacheBackends:
+    """Unit tests for the in-memory and shared SQLite cache backends"""
+
+    def test_key_text_is_canonical(self):
+        """Test equal keys get equal text whatever the set iteration order"""
+        assert key_text(("t", frozenset({"b", "a", "c"}))) == key_text(("t", frozenset({"c", "a", "b"})))
+        assert key_text("pikachu") != key_text(("pikachu",))
+
+    @pytest.mark.parametrize("kind", ["memory", "sqlite"])
+    def test_lru_eviction(self, kind, sqlite_path):
+        """Test the least recently used entry is evicted once maxsize is exceeded"""
+        backend = MemoryBackend(2) if kind == "memory" else SQLiteBackend(sqlite_path, "test", 2)
+        backend.set("a", (1.0, "A", None))
+        backend.set("b", (1.0, "B", None))
+        if kind == "sqlite":
+            # Age the entries past the recency resolution so the read below counts
+            backend.connection.execute("UPDATE cache_entries SET used_at = used_at - 10")
+        assert backend.get("a") == (1.0, "A", None)
+
+        assert backend.set("c", (1.0, "C", None)) == 1
+        assert backend.get("b") is None
+        assert sorted(backend.keys()) == ["a", "c"]
+        assert len(backend) == 2
+
+    def test_sqlite_backends_share_entries(self, sqlite_path):
+        """Test two backends on one file see each other's writes, separated by namespace"""
+        writer = SQLiteBackend(sqlite_path, "pokemon", 8)
+        reader = SQLiteBackend(sqlite_path, "pokemon", 8)
+        other = SQLiteBackend(sqlite_path, "llm", 8)
+        writer.set(("t", frozenset({"x", "y"})), (5.0, {"name": "pikachu"}, None))
+
+        assert reader.get(("t", frozenset({"y", "x"}))) == (5.0, {"name": "pikachu"}, None)
+        assert other.get(("t", frozenset({"x", "y"}))) is None
+        reader.delete(("t", frozenset({"x", "y"})))
+        assert len(writer) == 0
+
+    def test_entry_written_by_another_process(self, sqlite_path):
+        """Test an entry stored by a separate worker process is read back here"""
+        script = textwrap.dedent(f"""
+            from app.utils.cache_backend import SQLiteBackend
+            SQLiteBackend({sqlite_path!r}, "pokemon", 8).set("pikachu", (9e9, {{"pokemon_name": "pikachu"}}, None))
+        """)
+        subprocess.run([sys.executable, "-c", script], cwd=BACKEND_DIR, check=True, timeout=60)
+
+        assert SQLiteBackend(sqlite_path, "pokemon", 8).get("pikachu") == (9e9, {"pokemon_name": "pikachu"}, None)
+
+    def test_unreadable_entry_is_a_miss(self, sqlite_path):
+        """Test an entry that no longer unpickles is dropped instead of failing the lookup"""
+        backend = SQLiteBackend(sqlite_path, "pokemon", 8)
+        backend.set("pikachu", (1.0, "A", None))
+        backend.connection.execute("UPDATE cache_entries SET entry = x'00'")
+
+        assert backend.get("pikachu") is None
+        assert len(backend) == 0
+
+    def test_row_count_is_not_recomputed_on_every_write(self, sqlite_path):
+        """Test writes evict from a row count kept in the process instead of counting the table each time"""
+        backend = SQLiteBackend(sqlite_path, "test", 4)
+        statements = []
+        backend.connection.set_trace_callback(statements.append)
+        for i in range(10):
+            backend.set(f"k{i}", (1.0, i, None))
+
+        assert sum("COUNT(*)" in statement for statement in statements) == 1
+        assert len(backend) == 4
+        assert sorted(backend.keys()) == ["k6", "k7", "k8", "k9"]
+
+    def test_locked_database_is_skipped(self, sqlite_path):
+        """Test a write that would wait on another worker's lock is dropped instead of blocking"""
+        backend = SQLiteBackend(sqlite_path, "test", 4, busy_timeout=0.05)
+        backend.set("a", (1.0, "A", None))
+        other = sqlite3.connect(sqlite_path, isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")
+        try:
+            assert backend.set("b", (1.0, "B", None)) == 0
+        finally:
+            other.execute("ROLLBACK")
+            other.close()
+
+        assert backend.get("a") == (1.0, "A", None)
+        assert backend.get("b") is None
+
+    def test_unknown_backend(self):
+        """Test an unknown CACHE_BACKEND value is rejected"""
+        with pytest.raises(ValueError):
+            create_cache_backend("pokemon", 8, backend="redis")
+
+
+@pytest.mark.unit
+class TestSharedAsyncCache:
+    """Unit tests for AsyncTTLCache and the LLM answer cache over a shared backend"""
+
+    async def test_value_loaded_once_across_workers(self, sqlite_path):
+        """Test a value loaded by one worker's cache is a hit for another's"""
+        clock = FakeClock()
+        first = AsyncTTLCache("pokemon", 8, ttl=60.0, backend=SQLiteBackend(sqlite_path, "pokemon", 8), clock=clock)
+        second = AsyncTTLCache("pokemon", 8, ttl=60.0, backend=SQLiteBackend(sqlite_path, "pokemon", 8), clock=clock)
+        loads = []
+
+        async def loader():
+            loads.append(1)
+            return {"pokemon_name": "pikachu"}
+
+        assert await first.get_or_load("pikachu", loader) == {"pokemon_name": "pikachu"}
+        assert await second.get_or_load("pikachu", loader) == {"pokemon_name": "pikachu"}
+        assert len(loads) == 1
+
+        clock.now += 61.0
+        assert await second.peek("pikachu") is None
+
+    async def test_shared_backend_is_used_off_the_event_loop(self, sqlite_path):
+        """Test reads and writes of a shared backend run in worker threads, not on the loop's thread"""
+        backend = SQLiteBackend(sqlite_path, "pokemon", 8)
+        threads = []
+        for method in ("get", "set"):
+            original = getattr(backend, method)
+
+            def recorded(*args, original=original):
+                threads.append(threading.get_ident())
+                return original(*args)
+            setattr(backend, method, recorded)
+        cache = AsyncTTLCache("pokemon", 8, ttl=60.0, backend=backend)
+
+        async def loader():
+            return "value"
+
+        assert await cache.get_or_load("k", loader) == "value"
+        assert await cache.peek("k") == "value"
+        assert len(threads) == 3
+        assert threading.get_ident() not in threads
+
+    async def test_negative_entries_are_shared(self, sqlite_path):
+        """Test a cached "not found" error survives the trip through the shared backend"""
+        backend = SQLiteBackend(sqlite_path, "pokemon", 8)
+        cache = AsyncTTLCache("pokemon", 8, ttl=60.0, negative_ttl=60.0,
+                              negative_exceptions=(PokemonNotFoundError,), backend=backend)
+
+        async def missing():
+            raise PokemonNotFoundError("Pokemon missingno not found")
+
+        with pytest.raises(PokemonNotFoundError):
+            await cache.get_or_load("missingno", missing)
+        other = AsyncTTLCache("pokemon", 8, ttl=60.0, backend=SQLiteBackend(sqlite_path, "pokemon", 8))
+
+        with pytest.raises(PokemonNotFoundError, match="missingno"):
+            await other.get_or_load("missingno", missing)
+
+    async def test_similar_llm_answers_are_shared(self, sqlite_path):
+        """Test a near-identical query finds an answer another worker cached"""
+        writer = LLMResponseCache(8, 60.0, similarity_threshold=0.5, backend=SQLiteBackend(sqlite_path, "llm", 8))
+        reader = LLMResponseCache(8, 60.0, similarity_threshold=0.5, backend=SQLiteBackend(sqlite_path, "llm", 8))
+        await writer.set(strategy_prompt, "best fire type sweepers", "prompt", "Use Charizard")
+
+        assert await reader.get(strategy_prompt, "best fire type sweepers for rain") == ("Use Charizard", "similar")
+        assert await reader.get(strategy_prompt, "Best fire-type sweepers?") == ("Use Charizard", "exact")
+        assert await reader.get(strategy_prompt, "water walls") is None
+
+    async def test_similarity_candidates_stay_in_memory(self, sqlite_path, monkeypatch):
+        """Test keys are read from the shared backend once, not on every similarity lookup"""
+        backend = SQLiteBackend(sqlite_path, "llm", 8)
+        cache = LLMResponseCache(8, 60.0, similarity_threshold=0.5, backend=backend)
+        reads = []
+        keys = backend.keys
+        monkeypatch.setattr(backend, "keys", lambda: reads.append(1) or keys())
+        await cache.set(strategy_prompt, "best fire type sweepers", "prompt", "Use Charizard")
+
+        for query in ("best fire type sweepers for rain", "fast fire type sweepers", "water walls"):
+            await cache.get(strategy_prompt, query)
+        assert await cache.get(strategy_prompt, "fire type sweepers in sun") == ("Use Charizard", "similar")
+        assert len(reads) == 1
@@ -0,0 +1,153 @@
+import pytest
+from app.service.pokedex import PokedexStore
+from app.service.counters import CounterEngine, CounterQueryError
+from app.utils.type_chart import EFFECTIVENESS, TYPE_INDEX, defensive_profile
+
+
+def pokemon(name, pokemon_id, types, speed=80, total=480):
+    stat = total // 6
+    return {
+        "pokemon_name": name,
+        "pokemon_species": name.split("-")[0],
+        "pokemon_id": pokemon_id,
+        "types": types,
+        "stats": {"hp": stat, "attack": stat, "defense": stat, "special-attack": stat, "special-defense": stat, "speed": speed},
+    }
+
+
+@pytest.fixture
+def counter_engine():
+    """Counter engine over a small store with clear-cut matchups"""
+    return CounterEngine(PokedexStore([
+        pokemon("dragonite", 149, ["dragon", "flying"], speed=80, total=600),
+        pokemon("mamoswine", 473, ["ice", "ground"], speed=80),
+        pokemon("clefable", 36, ["fairy"], speed=60),
+        pokemon("charizard", 6, ["fire", "flying"], speed=100),
+        pokemon("bulbasaur", 1, ["grass", "poison"], speed=45, total=318),
+        pokemon("glalie-mega", 10074, ["ice"], speed=100, total=580),
+    ]))
+
+
+@pytest.mark.unit
+class TestTypeChart:
+    """Unit tests for the type-effectiveness matrix"""
+
+    def test_known_matchups(self):
+        """Test a few single-type multipliers, including immunities"""
+        assert EFFECTIVENESS[TYPE_INDEX["water"], TYPE_INDEX["fire"]] == 2.0
+        assert EFFECTIVENESS[TYPE_INDEX["normal"], TYPE_INDEX["ghost"]] == 0.0
+        assert EFFECTIVENESS[TYPE_INDEX["dragon"], TYPE_INDEX["steel"]] == 0.5
+
+    def test_dual_type_profile(self):
+        """Test multipliers against two types are multiplied"""
+        profile = defensive_profile(["dragon", "flying"])
+
+        assert profile[TYPE_INDEX["ice"]] == 4.0
+        assert profile[TYPE_INDEX["ground"]] == 0.0
+        assert profile[TYPE_INDEX["grass"]] == 0.25
+
+
+@pytest.mark.unit
+class TestCounterEngine:
+    """Unit tests for the vectorized counter ranking"""
+
+    def test_rank_pokemon(self, counter_engine):
+        """Test counters are ranked on type matchups and the target and alternate forms are excluded"""
+        result = counter_engine.rank("dragonite")
+
+        assert result["target"]["types"] == ["dragon", "flying"]
+        assert result["target"]["weaknesses"]["ice"] == 4.0
+        assert result["target"]["immunities"] == ["ground"]
+        ranked = [c["pokemon_name"] for c in result["counters"]]
+        assert ranked[:2] == ["mamoswine", "clefable"]
+        assert "dragonite" not in ranked
+        assert "glalie-mega" not in ranked
+        assert result["counters"][0]["offense"] == 4.0
+
+    def test_rank_types_with_forms(self, counter_engine):
+        """Test a bare type combination can be countered, including alternate forms on request"""
+        result = counter_engine.rank(types=["Grass"], include_forms=True)
+
+        assert result["target"]["pokemon_name"] is None
+        assert [c["pokemon_name"] for c in result["counters"]][:4] == ["dragonite", "charizard", "bulbasaur", "glalie-mega"]
+        assert "glalie-mega" not in [c["pokemon_name"] for c in counter_engine.rank(types=["grass"])["counters"]]
+
+    def test_rank_errors(self, counter_engine):
+        """Test unknown Pokemon, unknown types and empty targets are rejected"""
+        with pytest.raises(CounterQueryError):
+            counter_engine.rank("missingno")
+        with pytest.raises(CounterQueryError):
+            counter_engine.rank(types=["sound"])
+        with pytest.raises(CounterQueryError):
+            counter_engine.rank()
+
+    def test_find_target(self, counter_engine):
+        """Test counter questions are recognised and other strategy queries are left alone"""
+        assert counter_engine.find_target("How do I counter Dragonite?") == ("dragonite", [])
+        assert counter_engine.find_target("what beats dragon-type and fairy types") == (None, ["dragon", "fairy"])
+        assert counter_engine.find_target("Create a strategy using charizard") == (None, [])
+        assert counter_engine.find_target("How to beat Elite Four?") == (None, [])
+
+    def test_find_target_takes_the_object_of_the_verb(self, counter_engine):
+        """Test types in the subject or in a with/using/against clause are not taken as the target"""
+        assert counter_engine.find_target("what fire pokemon counter grass types") == (None, ["grass"])
+        assert counter_engine.find_target("how to counter dragon types with a steel type") == (None, ["dragon"])
+        assert counter_engine.find_target("counter dragonite using ice types") == ("dragonite", [])
+        assert counter_engine.find_target("what is dragonite weak to") == ("dragonite", [])
+        assert counter_engine.find_target("counter fire, water and grass types") == (None, [])
+
+    def test_describe(self, counter_engine):
+        """Test the local answer names the weaknesses and the top counters"""
+        answer = counter_engine.describe(counter_engine.rank("dragonite", limit=1))
+
+        assert answer.startswith("Dragonite is dragon/flying type. It is weak to ice (4x)")
+        assert "Recommended counters: Mamoswine (ice/ground, hits for 4x" in answer
+
+
+    def test_extended_engine_matches_rebuild(self, counter_engine):
+        """Test Pokemon added to the store after the build are ranked as by a fresh engine"""
+        counter_engine.store.add(pokemon("weavile", 461, ["dark", "ice"], speed=125, total=510))
+        counter_engine.store.add(pokemon("kyurem-black", 10022, ["dragon", "ice"], speed=95, total=700))
+        extended, rebuilt = counter_engine.extended(), CounterEngine(counter_engine.store)
+
+        for target in ("dragonite", "weavile"):
+            assert extended.rank(target, include_forms=True) == rebuilt.rank(target, include_forms=True)
+        assert extended.rank(types=["dragon"]) == rebuilt.rank(types=["dragon"])
+
+@pytest.mark.integration
+class TestCounterEndpoints:
+    """Integration tests for the counters endpoint and counter-aware strategy queries"""
+
+    def test_counters_endpoint(self, client):
+        """Test counters are returned for a misspelt Pokemon name"""
+        response = client.get("/api/v1/pokemon/counters?pokemon=dragonit&limit=5")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["target"]["pokemon_name"] == "dragonite"
+        assert len(data["counters"]) == 5
+        assert all(c["offense"] >= 2 for c in data["counters"])
+
+    def test_counters_endpoint_errors(self, client):
+        """Test unknown types are a 400 and unknown Pokemon a 404"""
+        assert client.get("/api/v1/pokemon/counters?type=sound").status_code == 400
+        assert client.get("/api/v1/pokemon/counters").status_code == 400
+        assert client.get("/api/v1/pokemon/counters?pokemon=xyzzyx").status_code == 404
+
+    def test_strategy_answers_counter_query_locally(self, client, mock_llm):
+        """Test local=true answers counter questions from the type chart without calling the LLM"""
+        response = client.post("/api/v1/pokemon/strategy?local=true", json="How to counter Dragonite?")
+
+        assert response.status_code == 200
+        assert response.headers["X-Strategy-Source"] == "counters"
+        assert response.json().startswith("Dragonite is dragon/flying type.")
+        mock_llm.generate_content.assert_not_called()
+
+    def test_strategy_context_uses_counters(self, client, mock_llm):
+        """Test counter questions send the target and its ranked counters to the LLM"""
+        response = client.post("/api/v1/pokemon/strategy", json="What beats Garchomp?")
+
+        assert response.status_code == 200
+        assert response.headers["X-Counter-Target"] == "garchomp"
+        prompt = mock_llm.generate_content.call_args[0][0]
+        assert "\nGarchomp|dragon/ground|" in prompt
@@ -0,0 +1,154 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from app.service.pokedex import get_pokedex_store
+from app.service.pokemon import PokemonNotFoundError
+from app.utils.http_cache import etag_matches, make_etag
+from app.utils.parse_pokemon_data import pokemon_cache, pokemon_version
+
+FAKEMON = {
+    "pokemon_name": "fakemon",
+    "abilities": {"static": False},
+    "moves": ["tackle"],
+    "types": ["normal"],
+    "stats": {"hp": 50, "attack": 50, "defense": 50, "special-attack": 50, "special-defense": 50, "speed": 50},
+    "base_experience": 100,
+    "pokemon_height": 10,
+    "pokemon_id": 99999,
+    "pokemon_species": "fakemon",
+    "pokemon_weight": 100,
+    "role_type": ["Generic"],
+}
+
+
+@pytest.mark.unit
+class TestValidators:
+    """Unit tests for ETag construction, If-None-Match matching and record versions"""
+
+    def test_etag_is_weak_and_deterministic(self):
+        """Test equal versions give the same weak ETag and different versions a different one"""
+        etag = make_etag("abc:1")
+
+        assert etag == make_etag("abc:1")
+        assert etag.startswith('W/"') and etag.endswith('"')
+        assert etag != make_etag("abc:2")
+        assert make_etag("a", "b") != make_etag("b", "a")
+
+    def test_if_none_match(self):
+        """Test lists, weak tags and the wildcard all match, and other tags do not"""
+        etag = make_etag("abc:1")
+
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'"other", {etag}', etag)
+        assert etag_matches(etag.removeprefix("W/"), etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('"other"', etag)
+        assert not etag_matches(None, etag)
+
+    async def test_bundled_version_needs_no_record(self):
+        """Test bundled Pokemon are versioned by dataset and row, and aliases share a version"""
+        store = get_pokedex_store()
+
+        assert store.is_bundled("pikachu")
+        assert await pokemon_version("pikachu") == await pokemon_version("25")
+        assert await pokemon_version("pikachu") != await pokemon_version("charizard")
+        assert await pokemon_version("not-a-pokemon") is None
+
+    async def test_fetched_version_follows_content(self):
+        """Test a Pokemon fetched from PokeAPI is versioned by its cached content"""
+        await pokemon_cache.set("fakemon", FAKEMON)
+        version = await pokemon_version("fakemon")
+        await pokemon_cache.set("fakemon", {**FAKEMON, "base_experience": 101})
+
+        assert version is not None
+        assert await pokemon_version("fakemon") != version
+
+    async def test_expired_version_is_not_confirmed(self, monkeypatch):
+        """Test a cached Pokemon past its TTL has no version until it is reloaded"""
+        await pokemon_cache.set("fakemon", FAKEMON)
+        expired = pokemon_cache.clock() + pokemon_cache.ttl + 1
+        monkeypatch.setattr(pokemon_cache, "clock", lambda: expired)
+
+        assert await pokemon_cache.contains("fakemon")
+        assert await pokemon_version("fakemon") is None
+
+
+@pytest.mark.integration
+class TestConditionalRequests:
+    """Integration tests for ETag, Cache-Control and 304 responses on the lookup endpoints"""
+
+    def test_lookup_sends_validators(self, client, monkeypatch):
+        """Test a lookup carries a weak ETag and the configured max-age"""
+        monkeypatch.setattr("app.config.env.settings.HTTP_CACHE_MAX_AGE_SECONDS", 120)
+        response = client.get("/api/v1/pokemon/pikachu")
+
+        assert response.status_code == 200
+        assert response.headers["ETag"] == make_etag(asyncio.run(pokemon_version("pikachu")))
+        assert response.headers["Cache-Control"] == "public, max-age=120"
+
+    def test_matching_etag_skips_all_work(self, client):
+        """Test If-None-Match with the current ETag is a 304 without parsing or generating a description"""
+        etag = client.get("/api/v1/pokemon/pikachu").headers["ETag"]
+
+        with patch("app.api.endpoints.parse_pokemon_data") as parse, \
+                patch("app.api.endpoints.generate_descriptions") as describe:
+            response = client.get("/api/v1/pokemon/pikachu", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+        assert "max-age" in response.headers["Cache-Control"]
+        parse.assert_not_called()
+        describe.assert_not_called()
+
+    def test_stale_etag_gets_full_response(self, client):
+        """Test an ETag of other content is answered with the full description"""
+        response = client.get("/api/v1/pokemon/pikachu", headers={"If-None-Match": make_etag("old")})
+
+        assert response.status_code == 200
+        assert "Pikachu" in response.json()
+
+    def test_corrected_name_keeps_resolution_header(self, client):
+        """Test a 304 for a corrected name still reports the name it resolved to"""
+        etag = client.get("/api/v1/pokemon/charzard").headers["ETag"]
+        response = client.get("/api/v1/pokemon/charzard", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.headers["X-Resolved-Pokemon"] == "charizard"
+
+    def test_fetched_pokemon_validated_after_first_load(self, client):
+        """Test a Pokemon from PokeAPI gets an ETag once loaded and a new one when its data changes"""
+        asyncio.run(pokemon_cache.set("fakemon", FAKEMON))
+        etag = client.get("/api/v1/pokemon/fakemon").headers["ETag"]
+
+        assert client.get("/api/v1/pokemon/fakemon", headers={"If-None-Match": etag}).status_code == 304
+        asyncio.run(pokemon_cache.set("fakemon", {**FAKEMON, "base_experience": 101}))
+        assert client.get("/api/v1/pokemon/fakemon", headers={"If-None-Match": etag}).status_code == 200
+
+    def test_compare_is_conditional(self, client):
+        """Test the comparison ETag covers both Pokemon and their order"""
+        etag = client.get("/api/v1/pokemon/compare/pikachu/charizard").headers["ETag"]
+
+        with patch("app.api.endpoints.parse_pokemon_data") as parse:
+            response = client.get("/api/v1/pokemon/compare/pikachu/charizard", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        parse.assert_not_called()
+        assert client.get("/api/v1/pokemon/compare/charizard/pikachu").headers["ETag"] != etag
+
+    def test_unknown_pokemon_not_cached(self, client):
+        """Test a 404 carries no validators"""
+        with patch("app.api.endpoints.parse_pokemon_data", side_effect=PokemonNotFoundError("Pokemon missingno not found")):
+            response = client.get("/api/v1/pokemon/missingno", headers={"If-None-Match": "*"})
+
+        assert response.status_code == 404
+        assert "ETag" not in response.headers
+
+    def test_large_responses_are_compressed(self, client):
+        """Test large payloads are gzipped for clients that accept it and small ones are not"""
+        names = ["pikachu", "charizard", "bulbasaur", "squirtle", "dragonite", "mewtwo"]
+        large = client.post("/api/v1/pokemon/batch", json=names, headers={"Accept-Encoding": "gzip"})
+        small = client.get("/api/v1/pokemon/pikachu", headers={"Accept-Encoding": "gzip"})
+
+        assert large.headers["Content-Encoding"] == "gzip"
+        assert len(large.json()["results"]) == 6
+        assert "Content-Encoding" not in small.headers
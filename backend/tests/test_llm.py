@@ -0,0 +1,115 @@
+import pytest
+import asyncio
+from unittest.mock import MagicMock
+from app.config.llm import GeminiLLM, ClientDisconnectedError
+
+
+def make_llm(delay: float = 0.0, **kwargs) -> tuple[GeminiLLM, dict]:
+    """GeminiLLM whose async client sleeps for ``delay`` and tracks concurrency"""
+    llm = GeminiLLM(**kwargs)
+    stats = {"active": 0, "peak": 0, "cancelled": 0}
+
+    async def fake_generate(model, contents):
+        stats["active"] += 1
+        stats["peak"] = max(stats["peak"], stats["active"])
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            stats["cancelled"] += 1
+            raise
+        finally:
+            stats["active"] -= 1
+        return MagicMock(text=f"answer to {contents}")
+
+    llm.gemini_client = MagicMock()
+    llm.gemini_client.aio.models.generate_content = fake_generate
+    return llm, stats
+
+
+@pytest.mark.unit
+class TestGeminiLLM:
+    """Unit tests for the async Gemini client wrapper"""
+
+    @pytest.mark.asyncio
+    async def test_generate_content_returns_text(self):
+        """Test generation awaits the async client and returns its text"""
+        llm, _ = make_llm()
+
+        assert await llm.generate_content("hi") == "answer to hi"
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        """Test no more than max_concurrency calls run at the same time"""
+        llm, stats = make_llm(delay=0.01, max_concurrency=2)
+
+        results = await asyncio.gather(*(llm.generate_content(str(i)) for i in range(6)))
+
+        assert len(results) == 6
+        assert stats["peak"] == 2
+
+    @pytest.mark.asyncio
+    async def test_timeout(self):
+        """Test slow calls are abandoned after the timeout"""
+        llm, stats = make_llm(delay=1.0, timeout=0.01)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await llm.generate_content("slow")
+        assert stats["cancelled"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_when_client_disconnects(self, monkeypatch):
+        """Test generation is cancelled once the client is gone"""
+        llm, stats = make_llm(delay=1.0)
+        monkeypatch.setattr('app.config.llm.settings.LLM_DISCONNECT_POLL_SECONDS', 0.01)
+
+        async def is_disconnected():
+            return True
+
+        with pytest.raises(ClientDisconnectedError):
+            await llm.generate_content("bye", is_disconnected=is_disconnected)
+
+        assert stats["cancelled"] == 1
+        assert stats["active"] == 0
+
+    @pytest.mark.asyncio
+    async def test_stream_content_yields_chunks(self):
+        """Test streaming iterates the async client stream chunk by chunk"""
+        llm = GeminiLLM()
+
+        async def fake_stream():
+            for text in ["Use ", None, "ice moves"]:
+                await asyncio.sleep(0)
+                yield MagicMock(text=text)
+
+        async def fake_generate_stream(model, contents):
+            return fake_stream()
+
+        llm.gemini_client = MagicMock()
+        llm.gemini_client.aio.models.generate_content_stream = fake_generate_stream
+
+        chunks = [chunk async for chunk in llm.stream_content("counter garchomp")]
+
+        assert chunks == ["Use ", "ice moves"]
+
+    @pytest.mark.asyncio
+    async def test_stream_content_timeout(self):
+        """Test a stream that stalls past the timeout is abandoned"""
+        llm = GeminiLLM(timeout=0.01)
+
+        async def stalled_stream():
+            yield MagicMock(text="Use ")
+            await asyncio.sleep(1)
+            yield MagicMock(text="ice moves")
+
+        async def fake_generate_stream(model, contents):
+            return stalled_stream()
+
+        llm.gemini_client = MagicMock()
+        llm.gemini_client.aio.models.generate_content_stream = fake_generate_stream
+
+        chunks = []
+        with pytest.raises(asyncio.TimeoutError):
+            async for chunk in llm.stream_content("counter garchomp"):
+                chunks.append(chunk)
+
+        assert chunks == ["Use "]
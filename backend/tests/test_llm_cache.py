@@ -0,0 +1,106 @@
+import pytest
+from app.utils.llm_cache import LLMResponseCache, normalize_query
+from app.utils.prompts import strategy_prompt, team_creation_prompt
+
+
+@pytest.fixture
+def cache():
+    """Response cache with the similarity layer enabled"""
+    return LLMResponseCache(maxsize=10, ttl=60, similarity_threshold=0.6)
+
+
+@pytest.mark.unit
+class TestLLMResponseCache:
+    """Unit tests for the LLM response cache"""
+
+    def test_normalize_query_folds_rephrasings(self):
+        """Test punctuation, stopwords, hyphens and plurals do not change the key"""
+        assert normalize_query("how to counter dragon types") == normalize_query("counter dragon-type pokemon?")
+
+    async def test_exact_hit(self, cache):
+        """Test a rephrased query is served by the exact layer"""
+        await cache.set(strategy_prompt, "how to counter dragon types", "prompt", "Use ice moves")
+
+        assert await cache.get(strategy_prompt, "Counter dragon-type Pokemon?") == ("Use ice moves", "exact")
+
+    async def test_word_order_is_part_of_exact_key(self):
+        """Test queries with the same words in another order are not exact hits"""
+        cache = LLMResponseCache(maxsize=10, ttl=60)
+        await cache.set(strategy_prompt, "counter garchomp with dragonite", "prompt", "Dragonite wins")
+
+        assert normalize_query("counter garchomp with dragonite") != normalize_query("counter dragonite with garchomp")
+        assert await cache.get(strategy_prompt, "counter dragonite with garchomp") is None
+        assert await cache.get(strategy_prompt, "Counter Garchomp with Dragonite!") == ("Dragonite wins", "exact")
+
+    async def test_similar_hit(self, cache):
+        """Test a close but not identical query is served by the similarity layer"""
+        await cache.set(strategy_prompt, "counter dragon types with ice moves", "prompt", "Use ice moves")
+
+        assert await cache.get(strategy_prompt, "counter dragon types with ice attacks") == ("Use ice moves", "similar")
+
+    async def test_reversed_roles_are_not_similar(self, cache):
+        """Test queries naming the same Pokemon or types in other roles miss the similarity layer"""
+        await cache.set(strategy_prompt, "counter garchomp with dragonite", "prompt", "Dragonite wins")
+        await cache.set(strategy_prompt, "is fire strong against water", "prompt", "No, water resists fire")
+
+        assert await cache.get(strategy_prompt, "counter dragonite with garchomp") is None
+        assert await cache.get(strategy_prompt, "is water strong against fire") is None
+
+    async def test_different_query_misses(self, cache):
+        """Test a query about another type is not served a cached answer"""
+        await cache.set(strategy_prompt, "how to counter dragon types", "prompt", "Use ice moves")
+
+        assert await cache.get(strategy_prompt, "how to counter fairy types") is None
+
+    async def test_similarity_layer_disabled(self):
+        """Test only exact matches hit when no threshold is configured"""
+        cache = LLMResponseCache(maxsize=10, ttl=60)
+        await cache.set(strategy_prompt, "counter dragon types with ice moves", "prompt", "Use ice moves")
+
+        assert await cache.get(strategy_prompt, "counter dragon types with ice attacks") is None
+
+    async def test_templates_are_isolated(self, cache):
+        """Test a strategy answer is never returned for a team query"""
+        await cache.set(strategy_prompt, "dragon team", "prompt", "Use ice moves")
+
+        assert await cache.get(team_creation_prompt, "dragon team") is None
+
+    async def test_empty_answers_are_not_cached(self, cache):
+        """Test missing LLM output is not stored"""
+        await cache.set(strategy_prompt, "counter dragons", "prompt", None)
+
+        assert len(cache) == 0
+
+    async def test_size_bound(self):
+        """Test the cache never holds more than maxsize answers"""
+        cache = LLMResponseCache(maxsize=2, ttl=60, similarity_threshold=0.9)
+        for query in ["counter dragons", "counter fairies", "counter ghosts"]:
+            await cache.set(strategy_prompt, query, "prompt", f"answer to {query}")
+
+        assert len(cache) == 2
+        assert await cache.get(strategy_prompt, "counter dragons") is None
+
+
+@pytest.mark.integration
+class TestLLMResponseCacheEndpoints:
+    """Integration tests for cached strategy and team answers"""
+
+    def test_repeated_strategy_query_served_from_cache(self, client, mock_llm):
+        """Test a rephrased strategy query does not call the LLM again"""
+        first = client.post("/api/v1/pokemon/strategy", json="how to counter dragon types")
+        second = client.post("/api/v1/pokemon/strategy", json="counter dragon-type pokemon?")
+
+        assert first.headers["X-LLM-Cache"] == "miss"
+        assert second.headers["X-LLM-Cache"] == "exact"
+        assert second.json() == "Mock LLM response"
+        mock_llm.generate_content.assert_called_once()
+
+    def test_failed_generation_is_not_cached(self, client, mock_llm):
+        """Test an LLM error is retried on the next request"""
+        mock_llm.generate_content.side_effect = [Exception("LLM Error"), "Team: Pikachu"]
+
+        first = client.post("/api/v1/pokemon/team-building", json="Build a team")
+        second = client.post("/api/v1/pokemon/team-building", json="Build a team")
+
+        assert first.status_code == 500
+        assert second.json() == "Team: Pikachu"
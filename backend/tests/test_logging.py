@@ -0,0 +1,138 @@
+import pytest
+import json
+import logging
+import subprocess
+import sys
+import threading
+import time
+from app.config import logging as app_logging
+from app.config.logging import JsonFormatter, SamplingFilter, queue_handler, setup_logger
+
+
+class RecordingHandler(logging.Handler):
+    """Collects records and the thread that handled them"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.threads = []
+
+    def emit(self, record):
+        self.records.append(record)
+        self.threads.append(threading.current_thread())
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+@pytest.fixture
+def recording_handler(monkeypatch):
+    """Handler added to the queue listener for the duration of a test"""
+    handler = RecordingHandler()
+    monkeypatch.setattr(app_logging.listener, "handlers", app_logging.listener.handlers + (handler,))
+    app_logging.start_logging()
+    return handler
+
+
+@pytest.mark.unit
+class TestLoggingPipeline:
+    """Unit tests for queue-based logging"""
+
+    def test_handlers_registered_once(self):
+        """Test repeated setup_logger calls do not attach duplicate handlers"""
+        logger = setup_logger("test_logging.once")
+        setup_logger("test_logging.once")
+
+        assert logger.handlers == [queue_handler]
+
+    def test_import_starts_no_thread(self):
+        """Test importing the app defines loggers without starting the listener thread"""
+        script = (
+            "import threading\n"
+            "from app.main import app\n"
+            "from app.config import logging\n"
+            "assert not logging._listener_started\n"
+            "assert threading.active_count() == 1, threading.enumerate()\n"
+        )
+        subprocess.run([sys.executable, "-c", script], check=True, timeout=60)
+
+    def test_lifespan_starts_listener(self, client):
+        """Test the FastAPI lifespan starts the listener and stops it on shutdown"""
+        with client:
+            assert app_logging._listener_started
+        assert not app_logging._listener_started
+
+    def test_records_handled_off_the_calling_thread(self, recording_handler):
+        """Test records are formatted and written by the listener thread"""
+        logger = setup_logger("test_logging.thread")
+        args = ["original"]
+        logger.info("value %s", args)
+        args.append("mutated later")
+
+        assert wait_for(lambda: any(r.name == "test_logging.thread" for r in recording_handler.records))
+        index = next(i for i, r in enumerate(recording_handler.records) if r.name == "test_logging.thread")
+        assert recording_handler.records[index].getMessage() == "value ['original']"
+        assert recording_handler.threads[index] is not threading.current_thread()
+
+    def test_records_before_start_are_written_directly(self, monkeypatch):
+        """Test records logged while no listener runs are handled on the calling thread, not queued"""
+        handler = RecordingHandler()
+        monkeypatch.setattr(app_logging.listener, "handlers", (handler,))
+        monkeypatch.setattr(app_logging, "_listener_started", False)
+
+        setup_logger("test_logging.early").info("before start")
+
+        assert app_logging.log_queue.empty()
+        assert [r.getMessage() for r in handler.records] == ["before start"]
+        assert handler.threads == [threading.current_thread()]
+
+    def test_json_formatter(self):
+        """Test JSON lines carry extra fields and the traceback"""
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord("api", logging.ERROR, __file__, 1, "failed %s", ("lookup",), None)
+            record.exc_info = sys.exc_info()
+        record.path = "/pokemon/pikachu"
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        assert entry["message"] == "failed lookup"
+        assert entry["level"] == "ERROR"
+        assert entry["path"] == "/pokemon/pikachu"
+        assert "ValueError: boom" in entry["exc_info"]
+
+    def test_sampling_filter(self):
+        """Test info records are sampled while warnings always pass"""
+        info = logging.LogRecord("access", logging.INFO, __file__, 1, "ok", (), None)
+        warning = logging.LogRecord("access", logging.WARNING, __file__, 1, "slow", (), None)
+
+        assert not SamplingFilter(0.0).filter(info)
+        assert SamplingFilter(0.0).filter(warning)
+        assert SamplingFilter(1.0).filter(info)
+
+    def test_endpoint_logs_are_sampled(self, client, recording_handler, monkeypatch):
+        """Test the per-request info lines of the endpoints go through the sampling filter"""
+        logger = logging.getLogger("api_endpoints")
+        sampler = next(f for f in logger.filters if isinstance(f, SamplingFilter))
+        monkeypatch.setattr(sampler, "rate", 0.0)
+
+        client.get("/api/v1/health")
+        logger.warning("always kept")
+
+        assert wait_for(lambda: any(r.getMessage() == "always kept" for r in recording_handler.records))
+        assert [r.levelno for r in recording_handler.records if r.name == "api_endpoints"] == [logging.WARNING]
+
+    def test_access_log_has_request_fields(self, client, recording_handler):
+        """Test the middleware writes one structured access line per request"""
+        client.get("/api/v1/health")
+
+        assert wait_for(lambda: any(r.name == "access" for r in recording_handler.records))
+        record = next(r for r in recording_handler.records if r.name == "access")
+        assert record.path == "/api/v1/health"
+        assert record.status == 200
+        assert record.duration_ms >= 0
@@ -0,0 +1,85 @@
+import pytest
+import asyncio
+from unittest.mock import MagicMock
+from prometheus_client import REGISTRY
+from app.config.llm import GeminiLLM
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def stage_count(stage):
+    return sample("pokebase_stage_duration_seconds_count", stage=stage)
+
+
+@pytest.mark.integration
+class TestRequestMetrics:
+    """Integration tests for request, stage and token metrics"""
+
+    def test_request_status_labels(self, client, mock_parse_pokemon_data):
+        """Test requests are counted with the status actually returned"""
+        mock_parse_pokemon_data.side_effect = Exception("PokeAPI down")
+        labels = {"method": "GET", "path": "/pokemon/{pokemon_name}"}
+        errors_before = sample("pokebase_requests_total", status="404", **labels)
+        ok_before = sample("pokebase_requests_total", status="200", **labels)
+
+        response = client.get("/api/v1/pokemon/pikachu")
+
+        assert response.status_code == 404
+        assert sample("pokebase_requests_total", status="404", **labels) == errors_before + 1
+        assert sample("pokebase_requests_total", status="200", **labels) == ok_before
+
+    def test_request_duration_observed(self, client):
+        """Test the request histogram is observed per route template"""
+        before = sample("pokebase_request_duration_seconds_count", method="GET", path="/health")
+
+        client.get("/api/v1/health")
+
+        assert sample("pokebase_request_duration_seconds_count", method="GET", path="/health") == before + 1
+
+    def test_strategy_stages_and_tokens(self, client, mock_llm):
+        """Test prompt construction time and prompt/response token sizes are recorded"""
+        prompt_build = stage_count("prompt_build")
+        prompt_tokens = sample("pokebase_llm_tokens_total", endpoint="strategy", direction="prompt")
+        response_tokens = sample("pokebase_llm_tokens_total", endpoint="strategy", direction="response")
+
+        client.post("/api/v1/pokemon/strategy", json="How to counter Dragonite?")
+
+        assert stage_count("prompt_build") == prompt_build + 1
+        assert sample("pokebase_llm_tokens_total", endpoint="strategy", direction="prompt") > prompt_tokens + 100
+        assert sample("pokebase_llm_tokens_total", endpoint="strategy", direction="response") == response_tokens + 4
+
+    def test_lookup_stages(self, client):
+        """Test Pokemon lookups time parsing and description generation"""
+        parse = stage_count("parse_pokemon_data")
+        describe = stage_count("generate_descriptions")
+
+        client.get("/api/v1/pokemon/pikachu")
+
+        assert stage_count("parse_pokemon_data") == parse + 1
+        assert stage_count("generate_descriptions") == describe + 1
+
+
+@pytest.mark.unit
+class TestLLMMetrics:
+    """Unit tests for Gemini call instrumentation"""
+
+    @pytest.mark.asyncio
+    async def test_gemini_timeouts_counted(self):
+        """Test a timed-out Gemini call is timed and counted as an upstream timeout"""
+        async def slow_generate(model, contents):
+            await asyncio.sleep(1)
+
+        llm = GeminiLLM(timeout=0.01)
+        llm.gemini_client = MagicMock()
+        llm.gemini_client.aio.models.generate_content = slow_generate
+        timeouts = sample("pokebase_upstream_errors_total", upstream="gemini", kind="timeout")
+        generate = stage_count("llm_generate")
+
+        with pytest.raises(asyncio.TimeoutError):
+            await llm.generate_content("prompt")
+
+        assert sample("pokebase_upstream_errors_total", upstream="gemini", kind="timeout") == timeouts + 1
+        assert stage_count("llm_generate") == generate + 1
+        assert stage_count("llm_queue") >= 1
@@ -0,0 +1,108 @@
+import pytest
+from app.main import app
+from app.service.pokedex import PokedexStore
+from app.service.names import DeletionIndex, PokemonNameIndex, edit_distance, get_name_index
+
+
+@pytest.fixture
+def name_index():
+    """Name index over a few species, forms and look-alike names"""
+    return PokemonNameIndex(PokedexStore([
+        {"pokemon_name": "pikachu", "pokemon_species": "pikachu", "pokemon_id": 25},
+        {"pokemon_name": "pichu", "pokemon_species": "pichu", "pokemon_id": 172},
+        {"pokemon_name": "charizard", "pokemon_species": "charizard", "pokemon_id": 6},
+        {"pokemon_name": "mr-mime", "pokemon_species": "mr-mime", "pokemon_id": 122},
+        {"pokemon_name": "deoxys-normal", "pokemon_species": "deoxys", "pokemon_id": 386},
+        {"pokemon_name": "deoxys-attack", "pokemon_species": "deoxys", "pokemon_id": 10001},
+        {"pokemon_name": "charizard-mega-x", "pokemon_species": "charizard", "pokemon_id": 10034},
+    ]))
+
+
+@pytest.mark.unit
+class TestNameIndex:
+    """Unit tests for name completion and typo-tolerant resolution"""
+
+    def test_edit_distance(self):
+        """Test insertions, substitutions and adjacent swaps each cost one edit"""
+        assert edit_distance("pikchu", "pikachu") == 1
+        assert edit_distance("pikahcu", "pikachu") == 1
+        assert edit_distance("charzard", "charizard") == 1
+        assert edit_distance("mewtwo", "mew") == 3
+        assert edit_distance("mewtwo", "mew", limit=1) == 2
+
+    def test_deletion_index_matches_full_scan(self):
+        """Test the delete index finds exactly the terms a brute-force comparison finds"""
+        terms = ["pikachu", "pichu", "raichu", "charizard", "charmander", "mew", "mewtwo"]
+        index = DeletionIndex(terms, max_distance=2)
+
+        for query in ["pikchu", "raichuu", "mewto", "charmandr", "xyz"]:
+            expected = sorted((edit_distance(query, term), term) for term in terms if edit_distance(query, term) <= 2)
+            assert index.search(query, 2) == expected
+
+    def test_complete_by_prefix(self, name_index):
+        """Test prefixes complete names, species and name parts, base forms first"""
+        assert name_index.complete("char") == ["charizard", "charizard-mega-x"]
+        assert name_index.complete("DEOX") == ["deoxys-normal", "deoxys-attack"]
+        assert name_index.complete("mime") == ["mr-mime"]
+        assert name_index.complete("pi", limit=1) == ["pikachu"]
+        assert name_index.complete("zz") == []
+
+    def test_resolve(self, name_index):
+        """Test known names pass through, unique near-misses are corrected and ties are suggested"""
+        assert name_index.resolve("Pikachu") == ("pikachu", [])
+        assert name_index.resolve("25") == ("25", [])
+        assert name_index.resolve("charzard") == ("charizard", [])
+        assert name_index.resolve("deoxis") == ("deoxys-normal", [])
+        assert name_index.resolve("pikchu") == (None, ["pikachu", "pichu"])
+        assert name_index.resolve("missingno") == (None, [])
+
+    def test_short_names_are_not_corrected(self, name_index):
+        """Test very short queries never resolve to a different name"""
+        assert name_index.suggest("mew") == []
+
+
+    def test_extended_index_matches_rebuild(self, name_index):
+        """Test Pokemon added to the store after the build are indexed as a fresh build would index them"""
+        name_index.store.add({"pokemon_name": "raichu", "pokemon_species": "raichu", "pokemon_id": 26})
+        name_index.store.add({"pokemon_name": "pikachu-rock-star", "pokemon_species": "pikachu", "pokemon_id": 10080})
+        extended, rebuilt = name_index.extended(), PokemonNameIndex(name_index.store)
+
+        assert (extended.keys, extended.key_targets, extended.targets) == (rebuilt.keys, rebuilt.key_targets, rebuilt.targets)
+        assert extended.complete("pika") == ["pikachu", "pikachu-rock-star"]
+        assert extended.resolve("raichuu") == ("raichu", [])
+        assert name_index.resolve("raichuu") == (None, [])
+
+@pytest.mark.integration
+class TestNameEndpoints:
+    """Integration tests for autocompletion and name resolution in get_pokemon"""
+
+    @pytest.fixture(autouse=True)
+    def override_index(self, name_index):
+        app.dependency_overrides[get_name_index] = lambda: name_index
+        yield
+        app.dependency_overrides.pop(get_name_index, None)
+
+    def test_autocomplete(self, client):
+        """Test completions are returned for a prefix and typo suggestions when nothing matches"""
+        assert client.get("/api/v1/pokemon/autocomplete?q=pik").json() == {
+            "query": "pik", "completions": ["pikachu"], "suggestions": []
+        }
+        assert client.get("/api/v1/pokemon/autocomplete?q=charzard").json()["suggestions"] == ["charizard"]
+
+    def test_get_pokemon_resolves_typo_locally(self, client, mock_parse_pokemon_data, mock_generate_descriptions):
+        """Test a near-miss is looked up under the corrected name"""
+        mock_parse_pokemon_data.return_value = {"pokemon_name": "charizard"}
+
+        response = client.get("/api/v1/pokemon/charzard")
+
+        assert response.status_code == 200
+        assert response.headers["X-Resolved-Pokemon"] == "charizard"
+        mock_parse_pokemon_data.assert_called_once_with("charizard")
+
+    def test_get_pokemon_suggests_on_ambiguous_typo(self, client, mock_parse_pokemon_data):
+        """Test an ambiguous near-miss returns suggestions without any upstream lookup"""
+        response = client.get("/api/v1/pokemon/pikchu")
+
+        assert response.status_code == 404
+        assert response.json()["detail"]["suggestions"] == ["pikachu", "pichu"]
+        mock_parse_pokemon_data.assert_not_called()
@@ -0,0 +1,135 @@
+import pytest
+import json
+from aioresponses import aioresponses
+from unittest.mock import patch, AsyncMock
+from app.service.pokedex import PokedexStore
+from app.utils.parse_pokemon_data import parse_pokemon_data
+
+
+@pytest.fixture
+def pokedex_records():
+    """Parsed records in the same shape as all_parsed_data.json"""
+    return [
+        {
+            "pokemon_name": "deoxys-normal",
+            "pokemon_species": "deoxys",
+            "pokemon_id": 386,
+            "types": ["psychic"],
+        },
+        {
+            "pokemon_name": "deoxys-attack",
+            "pokemon_species": "deoxys",
+            "pokemon_id": 10001,
+            "types": ["psychic"],
+        },
+    ]
+
+
+@pytest.mark.unit
+class TestPokedexStore:
+    """Unit tests for the local Pokedex store"""
+
+    def test_lookup_by_name_species_and_id(self, pokedex_records):
+        """Test records are reachable by name, species and pokemon_id"""
+        store = PokedexStore(pokedex_records)
+
+        assert store.get("deoxys-attack")["pokemon_id"] == 10001
+        assert store.get("DEOXYS")["pokemon_name"] == "deoxys-normal"
+        assert store.get(10001)["pokemon_name"] == "deoxys-attack"
+        assert store.get("386")["pokemon_name"] == "deoxys-normal"
+
+    def test_missing_name_returns_none(self, pokedex_records):
+        """Test unknown names are reported as misses"""
+        store = PokedexStore(pokedex_records)
+
+        assert store.get("missingno") is None
+        assert "missingno" not in store
+
+    def test_add_with_alias(self, pokedex_records):
+        """Test written-back records are indexed under the requested alias"""
+        store = PokedexStore(pokedex_records)
+        store.add({"pokemon_name": "pikachu", "pokemon_species": "pikachu", "pokemon_id": 25}, "Sparky")
+
+        assert len(store) == 3
+        assert store.get("sparky")["pokemon_id"] == 25
+
+    def test_records_round_trip(self):
+        """Test record views decode back to the dict that was stored"""
+        record = {
+            "pokemon_name": "pikachu",
+            "abilities": {"static": False, "lightning-rod": True},
+            "moves": ["thunder-shock", "tail-whip"],
+            "types": ["electric"],
+            "stats": {"hp": 35, "attack": 55, "defense": 40,
+                      "special-attack": 50, "special-defense": 50, "speed": 90},
+            "base_experience": None,
+            "pokemon_height": 4,
+            "pokemon_id": 25,
+            "pokemon_species": "pikachu",
+            "pokemon_weight": 60,
+            "role_type": ["Support", "Generic"],
+        }
+        store = PokedexStore([record])
+
+        view = store.get("pikachu")
+        assert view.to_dict() == record
+        assert list(view) == list(record)
+        assert dict(view.items()) == record
+
+    def test_vocabularies_are_shared(self):
+        """Test repeated moves are stored once as integer codes"""
+        store = PokedexStore.from_file("all_parsed_data.json")
+
+        assert len(store.moves) < 1000
+        assert len(store.move_lists.codes) > 100 * len(store.moves)
+        assert store.move_lists.codes.itemsize == 2
+
+    def test_full_dataset_round_trips(self):
+        """Test every bundled record reads back unchanged"""
+        with open("all_parsed_data.json") as f:
+            records = json.load(f)
+        store = PokedexStore(records)
+
+        assert [view.to_dict() for view in store.records] == records
+
+    def test_from_file_loads_full_dataset(self):
+        """Test the bundled dataset loads every record"""
+        store = PokedexStore.from_file("all_parsed_data.json")
+
+        assert len(store) == 1302
+        assert store.get("pikachu")["types"] == ["electric"]
+
+
+@pytest.mark.unit
+class TestParsePokemonDataStore:
+    """Unit tests for store-first lookups in parse_pokemon_data"""
+
+    @pytest.mark.asyncio
+    async def test_store_hit_skips_upstream(self, pokedex_records):
+        """Test a known Pokemon is served without contacting PokeAPI"""
+        store = PokedexStore(pokedex_records)
+
+        with patch('app.utils.parse_pokemon_data.get_pokedex_store', return_value=store), \
+             patch('app.utils.parse_pokemon_data.get_pokemon_service', new_callable=AsyncMock) as mock_service:
+            result = await parse_pokemon_data("deoxys")
+
+        assert result["pokemon_name"] == "deoxys-normal"
+        mock_service.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_store_miss_falls_back_and_writes_back(self, sample_pokemon_data, test_settings):
+        """Test a missing Pokemon is fetched upstream once and then stored"""
+        store = PokedexStore()
+        url = f"{test_settings.POKEMON_API_URL}/pokemon/pikachu"
+
+        with patch('app.utils.parse_pokemon_data.get_pokedex_store', return_value=store), \
+             aioresponses() as m:
+            m.get(url, payload=sample_pokemon_data)
+
+            first = await parse_pokemon_data("pikachu")
+            second = await parse_pokemon_data("pikachu")
+
+        assert first["pokemon_name"] == "pikachu"
+        assert first["stats"]["speed"] == 90
+        assert second == first
+        assert store.get(25) == first
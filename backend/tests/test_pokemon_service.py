@@ -2,7 +2,14 @@ import pytest
 import aiohttp
 from aioresponses import aioresponses
 from unittest.mock import patch
-from app.service.pokemon import PokemonService, get_pokemon_service
+from app.service.pokemon import (
+    PokemonService,
+    get_pokemon_service,
+    open_http_session,
+    close_http_session,
+    create_http_session,
+    get_pokeapi_caller,
+)
 
 
 @pytest.mark.unit
@@ -12,6 +19,7 @@ class TestPokemonService:
     @pytest.fixture
     def pokemon_service(self, test_settings):
         """Create a PokemonService instance for testing"""
+        test_settings.POKEAPI_RETRY_BACKOFF = 0.01
         with patch('app.service.pokemon.settings', test_settings):
             return PokemonService()
 
@@ -41,16 +49,18 @@ class TestPokemonService:
 
     @pytest.mark.asyncio
     async def test_get_pokemon_data_http_error(self, pokemon_service):
-        """Test handling of HTTP errors"""
+        """Test server errors are retried and then raised instead of returned as data"""
         pokemon_name = "pikachu"
         url = f"{pokemon_service.base_url}/pokemon/{pokemon_name}"
         error_response = {"error": "Server error"}
         
         with aioresponses() as m:
-            m.get(url, status=500, payload=error_response)
+            m.get(url, status=500, payload=error_response, repeat=True)
             
-            result = await pokemon_service.get_pokemon_data(pokemon_name)
-            assert result == error_response
+            with pytest.raises(aiohttp.ClientResponseError) as error:
+                await pokemon_service.get_pokemon_data(pokemon_name)
+            assert error.value.status == 500
+            assert len(next(iter(m.requests.values()))) == pokemon_service.caller.retries + 1
 
     @pytest.mark.asyncio
     async def test_get_pokemon_data_network_error(self, pokemon_service):
@@ -59,7 +69,7 @@ class TestPokemonService:
         url = f"{pokemon_service.base_url}/pokemon/{pokemon_name}"
         
         with aioresponses() as m:
-            m.get(url, exception=aiohttp.ClientError("Network error"))
+            m.get(url, exception=aiohttp.ClientError("Network error"), repeat=True)
             
             with pytest.raises(aiohttp.ClientError, match="Network error"):
                 await pokemon_service.get_pokemon_data(pokemon_name)
@@ -89,6 +99,20 @@ class TestPokemonService:
         service = await get_pokemon_service()
         assert isinstance(service, PokemonService)
 
+    @pytest.mark.asyncio
+    async def test_services_share_one_circuit_breaker(self):
+        """Test sessionless and session-backed services count failures against the same breaker"""
+        first = await get_pokemon_service()
+        second = await get_pokemon_service()
+        await open_http_session()
+        try:
+            shared = await get_pokemon_service()
+        finally:
+            await close_http_session()
+
+        assert first.caller is second.caller is shared.caller
+        assert first.caller.breaker is get_pokeapi_caller().breaker
+
     @pytest.mark.asyncio
     async def test_pokemon_data_with_special_characters(self, pokemon_service, sample_pokemon_data):
         """Test Pokemon data retrieval with special characters in name"""
@@ -122,4 +146,54 @@ class TestPokemonService:
             
             # Verify all requests succeeded
             assert len(results) == 3
-            assert all(result == sample_pokemon_data for result in results) 
+            assert all(result == sample_pokemon_data for result in results)
+
+
+@pytest.mark.unit
+class TestSharedHttpSession:
+    """Unit tests for the application-lifetime PokeAPI session"""
+
+    @pytest.mark.asyncio
+    async def test_service_reuses_injected_session(self, test_settings, sample_pokemon_data):
+        """Test lookups go through the injected session instead of opening new ones"""
+        url = f"{test_settings.POKEMON_API_URL}/pokemon/pikachu"
+        session = create_http_session()
+        try:
+            service = PokemonService(session=session)
+            with aioresponses() as m, patch('app.service.pokemon.aiohttp.ClientSession') as new_session:
+                m.get(url, payload=sample_pokemon_data, repeat=True)
+
+                await service.get_pokemon_data("pikachu")
+                await service.get_pokemon_data("pikachu")
+
+            new_session.assert_not_called()
+            assert not session.closed
+        finally:
+            await session.close()
+
+    @pytest.mark.asyncio
+    async def test_session_connector_is_tuned(self, test_settings):
+        """Test the pooled connector uses the configured limits and DNS cache"""
+        session = create_http_session()
+        try:
+            connector = session.connector
+            assert connector.limit_per_host == test_settings.HTTP_POOL_LIMIT_PER_HOST
+            assert connector.use_dns_cache
+            assert session.timeout.sock_connect == test_settings.HTTP_CONNECT_TIMEOUT
+        finally:
+            await session.close()
+
+    @pytest.mark.asyncio
+    async def test_open_and_close_lifecycle(self):
+        """Test get_pokemon_service hands out one shared service while the session is open"""
+        await open_http_session()
+        try:
+            first = await get_pokemon_service()
+            second = await get_pokemon_service()
+            assert first is second
+            assert first.session is not None and not first.session.closed
+        finally:
+            await close_http_session()
+
+        assert first.session.closed
+        assert (await get_pokemon_service()).session is None
@@ -0,0 +1,106 @@
+import pytest
+from app.service.retrieval import estimate_tokens
+from app.utils.prompt_builder import TABLE_HEADER, TABLE_PREAMBLE, build_prompt, encode_pokemon
+from app.utils.prompts import strategy_prompt, team_creation_prompt
+
+DRAGONITE = {
+    "pokemon_name": "dragonite",
+    "pokemon_species": "dragonite",
+    "abilities": {"inner-focus": False, "multiscale": True},
+    "types": ["dragon", "flying"],
+    "stats": {"hp": 91, "attack": 134, "defense": 95, "special-attack": 100, "special-defense": 100, "speed": 80},
+    "base_experience": 300,
+    "pokemon_height": 22,
+    "pokemon_weight": 2100,
+    "role_type": ["Balanced", "Tank"],
+}
+
+
+def ranked_records(count):
+    return [{**DRAGONITE, "pokemon_name": f"dragonite{i}"} for i in range(count)]
+
+
+@pytest.mark.unit
+class TestPromptBuilder:
+    """Unit tests for compact context encoding and the prompt token budget"""
+
+    def test_encode_pokemon_row(self):
+        """Test a record becomes one row with hidden abilities marked and stats in header order"""
+        assert encode_pokemon(DRAGONITE) == "Dragonite|dragon/flying|inner-focus,multiscale*|Balanced,Tank|91/134/95/100/100/80"
+        assert TABLE_HEADER.count("|") == encode_pokemon(DRAGONITE).count("|")
+
+    def test_encode_pokemon_tolerates_sparse_records(self):
+        """Test records missing abilities, roles or stats still encode"""
+        assert encode_pokemon({"pokemon_name": "pikachu", "types": ["electric"]}) == "Pikachu|electric|||"
+
+    def test_table_is_smaller_than_prose(self):
+        """Test the table encoding needs far fewer tokens than the English descriptions"""
+        records = ranked_records(25)
+        table = build_prompt(strategy_prompt, "counter dragonite", records, token_budget=100000, context_format="table")
+        prose = build_prompt(strategy_prompt, "counter dragonite", records, token_budget=100000, context_format="prose")
+
+        assert table["pokemon"] == prose["pokemon"] == 25
+        assert table["context_tokens"] * 2 < prose["context_tokens"]
+        assert TABLE_HEADER in table["prompt"]
+        assert "Dragonite is a Dragon, Flying type Pokémon" in prose["prompt"]
+
+    @pytest.mark.parametrize("template", [strategy_prompt, team_creation_prompt])
+    def test_only_table_context_is_described_as_a_table(self, template):
+        """Test the column description comes with the table rows and prose context keeps the templates' wording"""
+        table = build_prompt(template, "counter dragonite", ranked_records(3), token_budget=100000, context_format="table")
+        prose = build_prompt(template, "counter dragonite", ranked_records(3), token_budget=100000, context_format="prose")
+
+        assert f"{TABLE_PREAMBLE}\n{TABLE_HEADER}\nDragonite0|" in table["prompt"]
+        assert "table" not in prose["prompt"] and "columns" not in prose["prompt"]
+        assert "DESCRIPTION" in prose["prompt"]
+
+    def test_budget_drops_least_relevant_rows(self):
+        """Test the prompt stays within budget by cutting rows from the end of the ranking"""
+        records = ranked_records(40)
+        budget = estimate_tokens(strategy_prompt) + 200
+        built = build_prompt(strategy_prompt, "counter dragonite", records, token_budget=budget)
+
+        assert built["prompt_tokens"] <= budget
+        assert 0 < built["pokemon"] < 40
+        assert built["dropped"] == 40 - built["pokemon"]
+        assert "Dragonite0|" in built["prompt"]
+        assert f"Dragonite{built['pokemon'] - 1}|" in built["prompt"]
+        assert f"Dragonite{built['pokemon']}|" not in built["prompt"]
+        assert built["prompt_tokens"] == estimate_tokens(built["prompt"])
+
+    def test_budget_smaller_than_template_sends_no_context(self):
+        """Test a budget the template alone exceeds leaves the context out entirely"""
+        built = build_prompt(strategy_prompt, "counter dragonite", ranked_records(3), token_budget=10)
+
+        assert built["pokemon"] == 0
+        assert built["context_tokens"] == 0
+        assert TABLE_HEADER not in built["prompt"]
+
+    def test_unknown_context_format(self):
+        """Test an unknown context format is rejected"""
+        with pytest.raises(ValueError):
+            build_prompt(strategy_prompt, "counter dragonite", [], context_format="yaml")
+
+
+@pytest.mark.integration
+class TestPromptBudgetEndpoints:
+    """Integration tests for prompt token reporting on the LLM endpoints"""
+
+    def test_strategy_reports_prompt_tokens(self, client, mock_llm):
+        """Test the strategy endpoint reports the estimated size of the prompt it sent"""
+        response = client.post("/api/v1/pokemon/strategy", json="Which fire types are fast sweepers?")
+
+        assert response.status_code == 200
+        prompt = mock_llm.generate_content.call_args[0][0]
+        assert int(response.headers["X-Prompt-Tokens"]) == estimate_tokens(prompt)
+        assert TABLE_HEADER in prompt
+        assert "X-Context-Dropped" not in response.headers
+
+    def test_team_building_respects_budget(self, client, mock_llm, monkeypatch):
+        """Test a small budget trims the team-building context and reports what was dropped"""
+        monkeypatch.setattr("app.config.env.settings.PROMPT_TOKEN_BUDGET", 700)
+        response = client.post("/api/v1/pokemon/team-building", json="Build a rain team with swift swim sweepers")
+
+        assert response.status_code == 200
+        assert int(response.headers["X-Prompt-Tokens"]) <= 700
+        assert int(response.headers["X-Context-Pokemon"]) + int(response.headers["X-Context-Dropped"]) == 25
@@ -0,0 +1,263 @@
+import pytest
+import asyncio
+import time
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from prometheus_client import REGISTRY
+from unittest.mock import patch
+from app.service.pokemon import PokemonNotFoundError, PokemonService
+from app.service.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientCaller,
+    backoff_delay,
+    is_retryable,
+)
+from app.utils.cache import AsyncTTLCache
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakePokeAPI:
+    """Local stand-in for PokeAPI whose next answers can be scripted.
+
+    Each scripted step is an HTTP status to fail with or a number of seconds
+    to stall before answering; once the script runs out every request
+    succeeds, except for ``missingno`` which is always a 404.
+    """
+
+    def __init__(self):
+        self.script: list[int | float] = []
+        self.calls = 0
+        self.app = web.Application()
+        self.app.router.add_get("/pokemon/{name}", self.handle)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.calls += 1
+        name = request.match_info["name"]
+        if name == "missingno":
+            return web.json_response({"detail": "Not found"}, status=404)
+        step = self.script.pop(0) if self.script else None
+        if isinstance(step, int):
+            return web.json_response({"detail": "Upstream failure"}, status=step)
+        if isinstance(step, float):
+            await asyncio.sleep(step)
+        return web.json_response({"name": name})
+
+
+@pytest.fixture
+async def fake_pokeapi():
+    """Fake PokeAPI served over real HTTP on a local port"""
+    upstream = FakePokeAPI()
+    server = TestServer(upstream.app)
+    await server.start_server()
+    upstream.base_url = str(server.make_url("")).rstrip("/")
+    yield upstream
+    await server.close()
+
+
+def make_service(upstream, clock=None, **policy):
+    policy = {"retries": 2, "backoff": 0.0, **policy}
+    breaker = CircuitBreaker("pokeapi", policy.pop("failure_threshold", 5), policy.pop("reset_timeout", 30.0), clock or time.monotonic)
+    service = PokemonService(caller=ResilientCaller("pokeapi", breaker, **policy))
+    service.base_url = upstream.base_url
+    return service
+
+
+@pytest.mark.unit
+class TestResiliencePrimitives:
+    """Unit tests for retry classification, backoff and the circuit breaker"""
+
+    def test_retryable_errors(self):
+        """Test timeouts, connection errors and 429/5xx are retried but 4xx are not"""
+        def response_error(status):
+            return aiohttp.ClientResponseError(None, (), status=status)
+
+        assert is_retryable(asyncio.TimeoutError())
+        assert is_retryable(aiohttp.ClientConnectionError())
+        assert is_retryable(response_error(503))
+        assert is_retryable(response_error(429))
+        assert not is_retryable(response_error(400))
+        assert not is_retryable(PokemonNotFoundError("x"))
+        assert not is_retryable(ValueError("bad json"))
+
+    def test_backoff_is_jittered_and_capped(self):
+        """Test the delay is a random fraction of an exponentially growing, capped window"""
+        assert backoff_delay(0, 0.2, 2.0, rng=lambda: 1.0) == pytest.approx(0.2)
+        assert backoff_delay(3, 0.2, 2.0, rng=lambda: 1.0) == pytest.approx(1.6)
+        assert backoff_delay(10, 0.2, 2.0, rng=lambda: 1.0) == pytest.approx(2.0)
+        assert backoff_delay(3, 0.2, 2.0, rng=lambda: 0.5) == pytest.approx(0.8)
+
+    def test_breaker_opens_probes_and_closes(self):
+        """Test the breaker opens after consecutive failures and a successful probe closes it"""
+        clock = FakeClock()
+        breaker = CircuitBreaker("test-upstream", failure_threshold=2, reset_timeout=10.0, clock=clock)
+        breaker.before_call()
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_failure()
+
+        assert breaker.state == "open"
+        assert REGISTRY.get_sample_value("pokebase_circuit_breaker_state", {"upstream": "test-upstream"}) == 2
+        with pytest.raises(CircuitOpenError) as error:
+            breaker.before_call()
+        assert error.value.retry_after == pytest.approx(10.0)
+
+        clock.now = 10.0
+        breaker.before_call()
+        assert breaker.state == "half_open"
+        # Only one probe at a time
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_success()
+        assert breaker.state == "closed"
+        assert REGISTRY.get_sample_value("pokebase_circuit_breaker_state", {"upstream": "test-upstream"}) == 0
+        breaker.before_call()
+
+    def test_failed_probe_reopens(self):
+        """Test a failing half-open probe opens the circuit for another reset period"""
+        clock = FakeClock()
+        breaker = CircuitBreaker("test-upstream", failure_threshold=1, reset_timeout=10.0, clock=clock)
+        breaker.record_failure()
+        clock.now = 10.0
+        breaker.before_call()
+        breaker.record_failure()
+
+        assert breaker.state == "open"
+        clock.now = 15.0
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+
+@pytest.mark.integration
+class TestResilientPokemonService:
+    """Integration tests for PokemonService against a local fake PokeAPI"""
+
+    async def test_transient_failures_are_retried(self, fake_pokeapi):
+        """Test 503s are retried until PokeAPI answers"""
+        fake_pokeapi.script = [503, 503]
+        service = make_service(fake_pokeapi)
+
+        assert await service.get_pokemon_data("pikachu") == {"name": "pikachu"}
+        assert fake_pokeapi.calls == 3
+        assert service.caller.breaker.state == "closed"
+
+    async def test_not_found_is_not_retried(self, fake_pokeapi):
+        """Test a 404 fails at once and does not count against the breaker"""
+        service = make_service(fake_pokeapi, failure_threshold=1)
+
+        with pytest.raises(PokemonNotFoundError):
+            await service.get_pokemon_data("missingno")
+        assert fake_pokeapi.calls == 1
+        assert service.caller.breaker.state == "closed"
+
+    async def test_slow_attempt_times_out_and_is_retried(self, fake_pokeapi):
+        """Test an attempt that exceeds its deadline is abandoned and retried"""
+        fake_pokeapi.script = [1.0]
+        service = make_service(fake_pokeapi)
+        service.attempt_timeout = aiohttp.ClientTimeout(total=0.1)
+
+        started = time.perf_counter()
+        assert await service.get_pokemon_data("pikachu") == {"name": "pikachu"}
+        assert time.perf_counter() - started < 0.8
+        assert fake_pokeapi.calls == 2
+
+    async def test_breaker_fails_fast_while_open(self, fake_pokeapi):
+        """Test an open breaker rejects lookups without contacting PokeAPI until the reset timeout passes"""
+        clock = FakeClock()
+        fake_pokeapi.script = [500] * 4
+        service = make_service(fake_pokeapi, clock=clock, retries=1, failure_threshold=4, reset_timeout=30.0)
+
+        for _ in range(2):
+            with pytest.raises(aiohttp.ClientResponseError):
+                await service.get_pokemon_data("pikachu")
+        assert fake_pokeapi.calls == 4
+        with pytest.raises(CircuitOpenError):
+            await service.get_pokemon_data("pikachu")
+        assert fake_pokeapi.calls == 4
+
+        clock.now = 30.0
+        assert await service.get_pokemon_data("pikachu") == {"name": "pikachu"}
+        assert service.caller.breaker.state == "closed"
+
+    async def test_hedged_request_beats_stalled_attempt(self, fake_pokeapi):
+        """Test a second copy of a stalled request is sent and its answer used"""
+        fake_pokeapi.script = [2.0]
+        service = make_service(fake_pokeapi, hedge_delay=0.05)
+
+        started = time.perf_counter()
+        assert await service.get_pokemon_data("pikachu") == {"name": "pikachu"}
+        assert time.perf_counter() - started < 1.0
+        assert fake_pokeapi.calls == 2
+
+
+@pytest.mark.unit
+class TestStaleCache:
+    """Unit tests for serving expired cache entries while the upstream is down"""
+
+    async def test_stale_value_served_when_upstream_down(self):
+        """Test an expired entry is served when reloading it hits an open circuit"""
+        clock = FakeClock()
+        cache = AsyncTTLCache("stale-test", maxsize=8, ttl=10.0, stale_ttl=100.0,
+                              stale_exceptions=(CircuitOpenError,), clock=clock)
+
+        async def fresh():
+            return "fresh"
+
+        async def down():
+            raise CircuitOpenError("pokeapi", 5.0)
+
+        assert await cache.get_or_load("pikachu", fresh) == "fresh"
+        clock.now = 50.0
+        assert await cache.get_or_load("pikachu", down) == "fresh"
+
+        clock.now = 200.0
+        with pytest.raises(CircuitOpenError):
+            await cache.get_or_load("pikachu", down)
+
+    async def test_other_errors_do_not_serve_stale(self):
+        """Test failures not listed as stale exceptions still propagate"""
+        clock = FakeClock()
+        cache = AsyncTTLCache("stale-test", maxsize=8, ttl=10.0, stale_ttl=100.0,
+                              stale_exceptions=(CircuitOpenError,), clock=clock)
+
+        async def fresh():
+            return "fresh"
+
+        async def broken():
+            raise ValueError("bad payload")
+
+        await cache.get_or_load("pikachu", fresh)
+        clock.now = 50.0
+        with pytest.raises(ValueError):
+            await cache.get_or_load("pikachu", broken)
+
+
+@pytest.mark.integration
+class TestUpstreamErrorResponses:
+    """Integration tests for how upstream failures surface from the lookup endpoints"""
+
+    def test_open_circuit_is_503(self, client):
+        """Test a lookup rejected by the breaker is a 503 with Retry-After, not a 404"""
+        with patch("app.api.endpoints.parse_pokemon_data", side_effect=CircuitOpenError("pokeapi", 12.3)):
+            response = client.get("/api/v1/pokemon/pikachu")
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "13"
+
+    def test_upstream_errors_are_5xx(self, client):
+        """Test timeouts and failed PokeAPI calls are 504 and 502"""
+        with patch("app.api.endpoints.parse_pokemon_data", side_effect=asyncio.TimeoutError()):
+            assert client.get("/api/v1/pokemon/pikachu").status_code == 504
+        with patch("app.api.endpoints.parse_pokemon_data", side_effect=aiohttp.ClientConnectionError("refused")):
+            assert client.get("/api/v1/pokemon/pikachu").status_code == 502
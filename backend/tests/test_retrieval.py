@@ -0,0 +1,58 @@
+import pytest
+from app.service.retrieval import DescriptionRetriever, tokenize, estimate_tokens
+
+
+@pytest.fixture
+def retriever():
+    """Small retriever over hand-written records"""
+    records = [
+        {"pokemon_name": "pikachu", "pokemon_species": "pikachu", "types": ["electric"],
+         "role_type": ["Generic"], "abilities": {"static": False}, "stats": {"speed": 90}},
+        {"pokemon_name": "dragonite", "pokemon_species": "dragonite", "types": ["dragon", "flying"],
+         "role_type": ["Tank", "Sweeper"], "abilities": {"inner-focus": False}, "stats": {"speed": 80, "attack": 134}},
+        {"pokemon_name": "rotom", "pokemon_species": "rotom", "types": ["electric", "ghost"],
+         "role_type": ["Support"], "abilities": {"levitate": False}, "stats": {"speed": 91}},
+    ]
+    descriptions = [
+        "Pikachu is a Electric type Pokémon.",
+        "Dragonite is a Dragon, Flying type Pokémon.",
+        "Rotom is a Electric, Ghost type Pokémon.",
+    ]
+    return DescriptionRetriever(descriptions, records)
+
+
+@pytest.mark.unit
+class TestDescriptionRetriever:
+    """Unit tests for BM25 context selection"""
+
+    def test_tokenize_splits_hyphenated_words(self):
+        """Test hyphenated names keep the full token and its parts"""
+        assert tokenize("Counter dragon-type Pokémon") == ["counter", "dragon-type", "dragon", "type"]
+
+    def test_ranks_by_type(self, retriever):
+        """Test a type in the query selects matching Pokemon first"""
+        assert retriever.top_k_ids("how to counter dragons", 1) == [1]
+
+    def test_ranks_by_ability_and_type(self, retriever):
+        """Test abilities outrank a type shared by several Pokemon"""
+        assert retriever.top_k_ids("electric pokemon with levitate", 2) == [2, 0]
+
+    def test_ranks_by_role(self, retriever):
+        """Test plural role names are folded onto the indexed role"""
+        assert retriever.top_k_ids("fast sweepers", 1) == [1]
+
+    def test_unmatched_query_falls_back_to_strongest(self, retriever):
+        """Test a query with no matches still returns K descriptions"""
+        assert retriever.top_k_ids("hello there", 2) == [1, 2]
+
+    def test_select_modes(self, retriever):
+        """Test "all" returns every description and unknown modes are rejected"""
+        assert retriever.select("pikachu", k=1, mode="bm25") == ["Pikachu is a Electric type Pokémon."]
+        assert len(retriever.select("pikachu", mode="all")) == 3
+        with pytest.raises(ValueError):
+            retriever.select("pikachu", mode="vector")
+
+    def test_estimate_tokens(self):
+        """Test the token estimate never reports zero"""
+        assert estimate_tokens("") == 1
+        assert estimate_tokens("a" * 400) == 100
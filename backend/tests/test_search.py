@@ -0,0 +1,130 @@
+import pytest
+from app.main import app
+from app.service.pokedex import PokedexStore
+from app.service.search import PokedexSearchIndex, SearchQueryError, get_search_index
+
+
+def pokemon(name, pokemon_id, types, abilities, moves, roles, speed, attack=80):
+    return {
+        "pokemon_name": name,
+        "pokemon_id": pokemon_id,
+        "types": types,
+        "abilities": {ability: False for ability in abilities},
+        "moves": moves,
+        "role_type": roles,
+        "stats": {"hp": 60, "attack": attack, "defense": 60, "special-attack": 60, "special-defense": 60, "speed": speed},
+    }
+
+
+@pytest.fixture
+def search_index():
+    """Search index over a handful of hand-written records"""
+    return PokedexSearchIndex(PokedexStore([
+        pokemon("charizard", 6, ["fire", "flying"], ["blaze"], ["flamethrower", "roost"], ["Glass Cannon"], 100, 84),
+        pokemon("arcanine", 59, ["fire"], ["intimidate"], ["flamethrower", "extreme-speed"], ["Sweeper"], 95, 110),
+        pokemon("golem", 76, ["rock", "ground"], ["sturdy"], ["stealth-rock", "earthquake"], ["Tank"], 45, 120),
+        pokemon("starmie", 121, ["water", "psychic"], ["natural-cure"], ["surf", "recover"], ["Sweeper"], 115, 75),
+        {"pokemon_name": "missingno", "pokemon_id": 0, "types": ["bird"]},
+    ]))
+
+
+def names(index, result):
+    return [index.summary(position)["pokemon_name"] for position in result["positions"]]
+
+
+@pytest.mark.unit
+class TestPokedexSearchIndex:
+    """Unit tests for the inverted and sorted search indexes"""
+
+    def test_term_filters_intersect(self, search_index):
+        """Test repeated filters are ANDed and 'a|b' alternatives are ORed"""
+        assert names(search_index, search_index.search({"type": ["fire"], "move": ["flamethrower"]})) == ["charizard", "arcanine"]
+        assert names(search_index, search_index.search({"type": ["fire", "flying"]})) == ["charizard"]
+        assert names(search_index, search_index.search({"type": ["rock|water"]})) == ["golem", "starmie"]
+        assert search_index.search({"ability": ["levitate"]})["total"] == 0
+
+    def test_role_names_are_normalized(self, search_index):
+        """Test role and move filters match regardless of case, spaces or underscores"""
+        assert names(search_index, search_index.search({"role": ["glass_cannon"]})) == ["charizard"]
+        assert names(search_index, search_index.search({"move": ["Stealth Rock"]})) == ["golem"]
+
+    def test_stat_ranges(self, search_index):
+        """Test range predicates use inclusive and exclusive bounds and skip missing stats"""
+        assert names(search_index, search_index.search(predicates=["speed>=100"])) == ["charizard", "starmie"]
+        assert names(search_index, search_index.search(predicates=["speed>100"])) == ["starmie"]
+        assert names(search_index, search_index.search(predicates=["speed<50"])) == ["golem"]
+        assert names(search_index, search_index.search(predicates=["attack=110"])) == ["arcanine"]
+        assert search_index.search(predicates=["hp<=60"])["total"] == 4
+
+    def test_sort_and_pagination(self, search_index):
+        """Test results sort by any stat in either direction and are paged after sorting"""
+        result = search_index.search(sort="-speed", offset=1, limit=2)
+
+        assert result["total"] == 5
+        assert names(search_index, result) == ["charizard", "arcanine"]
+        assert names(search_index, search_index.search(sort="special_attack", limit=10))[-1] == "missingno"
+
+    def test_free_text_keywords(self, search_index):
+        """Test query words naming types, roles and moves become filters and the rest are reported"""
+        result = search_index.search(query="fire sweepers with flamethrower please go")
+
+        assert names(search_index, result) == ["arcanine"]
+        assert result["filters"] == [
+            {"field": "type", "value": "fire"},
+            {"field": "role", "value": "sweeper"},
+            {"field": "move", "value": "flamethrower"},
+        ]
+        assert result["ignored_terms"] == ["go"]
+        assert names(search_index, search_index.search(query="glass cannon")) == ["charizard"]
+
+    def test_invalid_queries(self, search_index):
+        """Test malformed predicates and unknown stats raise SearchQueryError"""
+        with pytest.raises(SearchQueryError):
+            search_index.search(predicates=["speed fast"])
+        with pytest.raises(SearchQueryError):
+            search_index.search(predicates=["luck>5"])
+        with pytest.raises(SearchQueryError):
+            search_index.search(sort="-luck")
+
+
+    def test_extended_index_matches_rebuild(self, search_index):
+        """Test Pokemon added to the store after the build are searchable as after a fresh build"""
+        search_index.store.add(pokemon("jolteon", 135, ["electric"], ["volt-absorb"], ["thunderbolt"], ["Sweeper"], 130, 65))
+        extended, rebuilt = search_index.extended(), PokedexSearchIndex(search_index.store)
+
+        for query, sort in (({"role": ["sweeper"]}, "-speed"), ({"type": ["electric|fire"]}, "attack"), ({}, "-total")):
+            assert names(extended, extended.search(query, sort=sort)) == names(rebuilt, rebuilt.search(query, sort=sort))
+        assert search_index.search({"type": ["electric"]})["total"] == 0
+
+@pytest.mark.integration
+class TestSearchEndpoint:
+    """Integration tests for the search/filter endpoint"""
+
+    @pytest.fixture(autouse=True)
+    def override_index(self, search_index):
+        app.dependency_overrides[get_search_index] = lambda: search_index
+        yield
+        app.dependency_overrides.pop(get_search_index, None)
+
+    def test_search_endpoint(self, client):
+        """Test repeated query parameters, sorting and the compact result shape"""
+        response = client.get("/api/v1/pokemon/search?type=fire&stat=speed>=90&sort=-attack")
+
+        assert response.status_code == 200
+        assert response.headers["Server-Timing"].startswith("search;dur=")
+        data = response.json()
+        assert data["total"] == 2
+        assert [r["pokemon_name"] for r in data["results"]] == ["arcanine", "charizard"]
+        assert data["results"][0]["total"] == 445
+        assert "moves" not in data["results"][0]
+
+    def test_search_bad_predicate(self, client):
+        """Test malformed filters are rejected with a 400"""
+        response = client.get("/api/v1/pokemon/search?stat=speed~100")
+
+        assert response.status_code == 400
+        assert "speed~100" in response.json()["detail"]
+
+    def test_search_limit_bounds(self, client):
+        """Test page sizes above SEARCH_MAX_LIMIT are rejected"""
+        assert client.get("/api/v1/pokemon/search?limit=1000").status_code == 422
@@ -0,0 +1,112 @@
+import pytest
+import json
+import os
+from app.service import snapshot as snapshot_module
+from app.service.pokedex import PokedexStore
+from app.service.retrieval import DescriptionRetriever
+from app.service.snapshot import Snapshot, SnapshotError, SnapshotWriter, get_snapshot
+from app.utils.build_snapshot import build_snapshot
+from app.utils.bulk_pokedex import generate_descriptions_bulk
+
+
+@pytest.fixture(scope="module")
+def snapshot_path(tmp_path_factory):
+    """Snapshot compiled from the bundled datasets"""
+    path = tmp_path_factory.mktemp("snapshot") / "pokedex.snapshot"
+    build_snapshot("all_parsed_data.json", "all_pokemon_descriptions.json", str(path))
+    return str(path)
+
+
+@pytest.fixture
+def fresh_snapshot_getter(monkeypatch):
+    """Reset the process-wide snapshot so get_snapshot re-reads settings"""
+    monkeypatch.setattr(snapshot_module, "_snapshot", None)
+    monkeypatch.setattr(snapshot_module, "_snapshot_checked", False)
+
+
+@pytest.mark.unit
+class TestSnapshot:
+    """Unit tests for the binary Pokedex snapshot"""
+
+    def test_store_round_trips(self, snapshot_path):
+        """Test a snapshot-backed store reads back every bundled record unchanged"""
+        with open("all_parsed_data.json") as f:
+            records = json.load(f)
+        store = PokedexStore.from_snapshot(Snapshot(snapshot_path))
+
+        assert [view.to_dict() for view in store.records] == records
+        assert store.get("deoxys")["pokemon_name"] == "deoxys-normal"
+        assert store.get(25)["pokemon_name"] == "pikachu"
+
+    def test_columns_are_memory_mapped(self, snapshot_path):
+        """Test numeric columns are zero-copy views rather than parsed arrays"""
+        store = PokedexStore.from_snapshot(Snapshot(snapshot_path))
+
+        assert isinstance(store.pokemon_ids, memoryview)
+        assert isinstance(store.move_lists.codes, memoryview)
+        assert store.pokemon_ids.readonly
+
+    def test_retriever_matches_built_index(self, snapshot_path):
+        """Test the prebuilt index ranks exactly like one built from JSON"""
+        store = PokedexStore.from_file("all_parsed_data.json")
+        with open("all_pokemon_descriptions.json") as f:
+            built = DescriptionRetriever(json.load(f), store.records)
+        loaded = DescriptionRetriever.from_snapshot(Snapshot(snapshot_path))
+
+        for query in ("How to counter Dragonite?", "fast electric sweepers", "hello there"):
+            assert loaded.top_k_ids(query, 25) == built.top_k_ids(query, 25)
+        assert loaded.descriptions == built.descriptions
+        assert loaded.full_context_tokens == built.full_context_tokens
+
+    def test_bulk_pipeline_reads_snapshot_columns(self, snapshot_path):
+        """Test the vectorized description pipeline works on memory-mapped columns"""
+        with open("all_pokemon_descriptions.json") as f:
+            descriptions = json.load(f)
+        store = PokedexStore.from_snapshot(Snapshot(snapshot_path))
+
+        assert generate_descriptions_bulk(store) == descriptions
+
+    def test_write_back_copies_columns(self, snapshot_path):
+        """Test adding a record to a snapshot-backed store copies it instead of touching the file"""
+        store = PokedexStore.from_snapshot(Snapshot(snapshot_path))
+        size = os.path.getsize(snapshot_path)
+
+        store.add({"pokemon_name": "missingno", "pokemon_species": "missingno", "pokemon_id": 0}, "glitch")
+
+        assert store.get("glitch")["pokemon_id"] == 0
+        assert store.get("pikachu")["types"] == ["electric"]
+        assert len(store) == 1303
+        assert os.path.getsize(snapshot_path) == size
+
+    def test_rejects_other_files(self, tmp_path):
+        """Test JSON or truncated files are not mistaken for a snapshot"""
+        path = tmp_path / "not-a-snapshot"
+        path.write_text("[]")
+        with pytest.raises(SnapshotError):
+            Snapshot(str(path))
+
+        writer = SnapshotWriter()
+        writer.add_strings("names", ["bulbasaur", "ivysaur"])
+        writer.write(str(path))
+        path.write_bytes(path.read_bytes()[:-4])
+        with pytest.raises(SnapshotError):
+            Snapshot(str(path)).strings("names")
+
+    def test_stale_snapshot_is_ignored(self, tmp_path, monkeypatch, fresh_snapshot_getter):
+        """Test a snapshot older than its JSON sources falls back to JSON"""
+        data = tmp_path / "data.json"
+        descriptions = tmp_path / "descriptions.json"
+        data.write_text(json.dumps([{"pokemon_name": "bulbasaur", "pokemon_id": 1}]))
+        descriptions.write_text(json.dumps(["Bulbasaur is a Grass type Pokémon."]))
+        path = tmp_path / "pokedex.snapshot"
+        build_snapshot(str(data), str(descriptions), str(path))
+
+        monkeypatch.setattr("app.service.snapshot.settings.POKEDEX_SNAPSHOT_PATH", str(path))
+        monkeypatch.setattr("app.service.snapshot.settings.POKEDEX_DATA_PATH", str(data))
+        monkeypatch.setattr("app.service.snapshot.settings.POKEMON_DESCRIPTIONS_PATH", str(descriptions))
+        assert get_snapshot() is not None
+
+        data.write_text(json.dumps([{"pokemon_name": "ivysaur", "pokemon_id": 2}]))
+        monkeypatch.setattr(snapshot_module, "_snapshot", None)
+        monkeypatch.setattr(snapshot_module, "_snapshot_checked", False)
+        assert get_snapshot() is None
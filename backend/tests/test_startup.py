@@ -0,0 +1,52 @@
+import pytest
+import os
+import subprocess
+import sys
+from pathlib import Path
+from app.config.llm import GeminiLLM, get_llm
+from app.main import app
+from app.service.retrieval import DescriptionRetriever, get_description_retriever
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.mark.unit
+class TestLazyStartup:
+    """Unit tests for import-time side effects and injected dependencies"""
+
+    def test_import_has_no_side_effects(self, tmp_path):
+        """Test importing app.main neither loads google-genai nor creates a logs directory"""
+        code = "import sys, app.main; print('google.genai' in sys.modules)"
+        env = {**os.environ, "PYTHONPATH": str(BACKEND_DIR)}
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, text=True, check=True
+        )
+
+        assert result.stdout.strip() == "False"
+        assert not (tmp_path / "logs").exists()
+
+    def test_llm_client_is_created_on_first_use(self):
+        """Test the genai client is only built when the LLM is first used"""
+        llm = GeminiLLM()
+        assert llm._gemini_client is None
+
+        client = llm.gemini_client
+        assert client is llm.gemini_client
+        assert get_llm() is get_llm()
+
+    def test_dependencies_can_be_overridden(self, client, mock_llm):
+        """Test endpoints use a local retriever and LLM supplied through dependency overrides"""
+        retriever = DescriptionRetriever(
+            ["Pikachu is a Electric type Pokémon.", "Eevee is a Normal type Pokémon."],
+            [{"pokemon_name": "pikachu", "types": ["electric"]}, {"pokemon_name": "eevee", "types": ["normal"]}],
+        )
+        app.dependency_overrides[get_description_retriever] = lambda: retriever
+        try:
+            response = client.post("/api/v1/pokemon/team-building", json="Build an electric team")
+        finally:
+            app.dependency_overrides.pop(get_description_retriever, None)
+
+        assert response.status_code == 200
+        assert response.headers["X-Context-Pokemon"] == "2"
+        prompt = mock_llm.generate_content.call_args[0][0]
+        assert "Pikachu|electric|" in prompt
@@ -0,0 +1,181 @@
+import pytest
+from app.service.counters import CounterEngine
+from app.service.pokedex import PokedexStore
+from app.service.team import TEAM_SIZE, TeamOptimizer, TeamQueryError
+
+
+def pokemon(name, pokemon_id, types, stats=(80, 80, 80, 80, 80, 80)):
+    keys = ("hp", "attack", "defense", "special-attack", "special-defense", "speed")
+    return {
+        "pokemon_name": name,
+        "pokemon_species": name.split("-")[0],
+        "pokemon_id": pokemon_id,
+        "types": types,
+        "stats": dict(zip(keys, stats)),
+    }
+
+
+@pytest.fixture
+def optimizer():
+    """Optimizer over a small store spanning most types, with one alternate form"""
+    return TeamOptimizer(CounterEngine(PokedexStore([
+        pokemon("charizard", 6, ["fire", "flying"], (78, 84, 78, 109, 85, 100)),
+        pokemon("blastoise", 9, ["water"], (79, 83, 100, 85, 105, 78)),
+        pokemon("venusaur", 3, ["grass", "poison"], (80, 82, 83, 100, 100, 80)),
+        pokemon("pikachu", 25, ["electric"], (35, 55, 40, 50, 50, 90)),
+        pokemon("garchomp", 445, ["dragon", "ground"], (108, 130, 95, 80, 85, 102)),
+        pokemon("lucario", 448, ["fighting", "steel"], (70, 110, 70, 115, 70, 90)),
+        pokemon("gengar", 94, ["ghost", "poison"], (60, 65, 60, 130, 75, 110)),
+        pokemon("tyranitar", 248, ["rock", "dark"], (100, 134, 110, 95, 100, 61)),
+        pokemon("gardevoir", 282, ["psychic", "fairy"], (68, 65, 65, 125, 115, 80)),
+        pokemon("snorlax", 143, ["normal"], (160, 110, 65, 65, 110, 30)),
+        pokemon("scizor", 212, ["bug", "steel"], (70, 130, 100, 55, 80, 65)),
+        pokemon("weavile", 461, ["dark", "ice"], (70, 120, 50, 45, 85, 125)),
+        pokemon("mewtwo-mega-x", 10043, ["psychic", "fighting"], (106, 190, 100, 154, 100, 130)),
+    ])))
+
+
+def names(team):
+    return {member["pokemon_name"] for member in team["members"]}
+
+
+@pytest.mark.unit
+class TestTeamOptimizer:
+    """Unit tests for the beam-search team optimizer"""
+
+    def test_builds_six_distinct_members(self, optimizer):
+        """Test teams have six distinct base-form members and are ranked best first"""
+        teams = optimizer.optimize(limit=3)
+
+        assert len(teams) == 3
+        assert all(len(names(team)) == TEAM_SIZE for team in teams)
+        assert all("mewtwo-mega-x" not in names(team) for team in teams)
+        assert teams[0]["score"] >= teams[1]["score"] >= teams[2]["score"]
+        assert len(teams[0]["coverage"]) + len(teams[0]["uncovered"]) == 18
+
+    def test_required_types_and_roles(self, optimizer):
+        """Test required types and roles are present on the best team"""
+        team = optimizer.optimize(required_types=["Electric", "normal"], required_roles=["glass cannon"])[0]
+
+        types = {t for member in team["members"] for t in member["types"]}
+        assert {"electric", "normal"} <= types
+        assert "Glass Cannon" in team["roles"]
+
+    def test_include_exclude_and_min_speed(self, optimizer):
+        """Test included Pokemon are kept, banned ones and slow ones left out"""
+        team = optimizer.optimize(include=["snorlax"], exclude=["garchomp"], min_speed=80)[0]
+
+        assert "snorlax" in names(team)
+        assert "garchomp" not in names(team)
+        assert all(m["pokemon_name"] == "snorlax" or m["pokemon_name"] not in {"tyranitar", "scizor"} for m in team["members"])
+
+    def test_forms_on_request(self, optimizer):
+        """Test alternate forms are only considered when asked for"""
+        with pytest.raises(TeamQueryError):
+            optimizer.optimize(required_types=["fighting"], exclude=["lucario"])
+        team = optimizer.optimize(required_types=["fighting"], exclude=["lucario"], include_forms=True)[0]
+
+        assert "mewtwo-mega-x" in names(team)
+
+    def test_invalid_constraints(self, optimizer):
+        """Test unknown names and types and unsatisfiable constraints raise TeamQueryError"""
+        with pytest.raises(TeamQueryError):
+            optimizer.optimize(include=["missingno"])
+        with pytest.raises(TeamQueryError):
+            optimizer.optimize(required_types=["sound"])
+        with pytest.raises(TeamQueryError):
+            optimizer.optimize(min_speed=120)
+
+    def test_too_few_species(self):
+        """Test a pool of forms of one species raises TeamQueryError instead of returning no team"""
+        optimizer = TeamOptimizer(CounterEngine(PokedexStore([
+            pokemon(f"rotom-{form}", 10008 + i, ["electric", form_type])
+            for i, (form, form_type) in enumerate(
+                [("heat", "fire"), ("wash", "water"), ("frost", "ice"), ("fan", "flying"), ("mow", "grass"), ("x", "ghost")]
+            )
+        ])))
+
+        with pytest.raises(TeamQueryError):
+            optimizer.optimize(include_forms=True)
+        with pytest.raises(TeamQueryError):
+            TeamOptimizer.describe([])
+
+    def test_parse_constraints(self):
+        """Test types and roles are read from a free-text request"""
+        constraints = TeamOptimizer.parse_constraints("A rain team with water-types, a glass cannon and sweepers")
+
+        assert constraints == {"required_types": ["water"], "required_roles": ["glass-cannon", "sweeper"]}
+
+    def test_describe(self, optimizer):
+        """Test the local answer follows the team-building prompt's output format"""
+        answer = TeamOptimizer.describe(optimizer.optimize())
+
+        assert answer.startswith("Team: ")
+        assert answer.split(".")[0].count(",") == TEAM_SIZE - 1
+
+
+    def test_extended_optimizer_matches_rebuild(self, optimizer):
+        """Test Pokemon added to the store after the build are team candidates as for a fresh optimizer"""
+        optimizer.store.add(pokemon("dragapult", 887, ["dragon", "ghost"], (88, 120, 75, 100, 75, 142)))
+        optimizer.store.add(pokemon("toxapex", 748, ["poison", "water"], (50, 63, 152, 53, 142, 35)))
+        engine = optimizer.engine.extended()
+        extended, rebuilt = optimizer.extended(engine), TeamOptimizer(CounterEngine(optimizer.store))
+
+        for constraints in ({}, {"include": ["dragapult"]}, {"required_roles": ["tank"], "min_speed": 30}):
+            assert extended.optimize(**constraints) == rebuilt.optimize(**constraints)
+
+@pytest.mark.integration
+class TestTeamEndpoints:
+    """Integration tests for the team optimizer endpoint and team-building modes"""
+
+    def test_team_optimizer_endpoint(self, client):
+        """Test constrained teams are returned from the bundled Pokedex"""
+        response = client.get("/api/v1/pokemon/team-optimizer?type=water&role=sweeper&exclude=arceus&limit=2")
+
+        assert response.status_code == 200
+        assert response.headers["Server-Timing"].startswith("team;dur=")
+        teams = response.json()["teams"]
+        assert len(teams) == 2
+        assert all("arceus" not in names(team) for team in teams)
+        assert any("water" in member["types"] for member in teams[0]["members"])
+
+    def test_team_optimizer_bad_constraint(self, client):
+        """Test unknown types are rejected with a 400"""
+        assert client.get("/api/v1/pokemon/team-optimizer?type=sound").status_code == 400
+
+    def test_team_building_local(self, client, mock_llm):
+        """Test local=true builds the team without calling the LLM"""
+        response = client.post("/api/v1/pokemon/team-building?local=true", json="Build a team with a fire sweeper")
+
+        assert response.status_code == 200
+        assert response.headers["X-Team-Source"] == "optimizer"
+        assert response.json().startswith("Team: ")
+        mock_llm.generate_content.assert_not_called()
+
+    def test_team_building_local_without_teams(self, client, mock_llm, monkeypatch):
+        """Test local=true answers 400 when the optimizer returns no team"""
+        monkeypatch.setattr("app.config.env.settings.TEAM_CANDIDATES", 0)
+        response = client.post("/api/v1/pokemon/team-building?local=true", json="Build a team with a fire sweeper")
+
+        assert response.status_code == 400
+        mock_llm.generate_content.assert_not_called()
+
+    def test_team_building_candidates_as_context(self, client, mock_llm):
+        """Test candidates=true sends only the candidate teams' members to the LLM"""
+        response = client.post("/api/v1/pokemon/team-building?candidates=true", json="Build a balanced team")
+
+        assert response.status_code == 200
+        assert 6 <= int(response.headers["X-Context-Pokemon"]) <= 18
+        mock_llm.generate_content.assert_called_once()
+
+    def test_team_building_cache_keeps_context_modes_apart(self, client, mock_llm):
+        """Test an answer built from keyword context is not served for a candidates request, or vice versa"""
+        query = "Build a balanced team"
+        first = client.post("/api/v1/pokemon/team-building", json=query)
+        with_candidates = client.post("/api/v1/pokemon/team-building?candidates=true", json=query)
+        repeated = client.post("/api/v1/pokemon/team-building?candidates=true", json=query)
+
+        assert first.headers["X-LLM-Cache"] == "miss"
+        assert with_candidates.headers["X-LLM-Cache"] == "miss"
+        assert repeated.headers["X-LLM-Cache"] == "exact"
+        assert mock_llm.generate_content.call_count == 2
@@ -221,30 +221,10 @@ export default function Home() {
         setResult(res);
       } else if (cmd === "/strategy" && args.length >= 1) {
         const query = args.join(" ");
-        const res = await fetch(
-          `${process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000/api/v1"}/pokemon/strategy`,
-          {
-            method: "POST",
-            headers: { "Content-Type": "application/json" },
-            body: JSON.stringify(query),
-          }
-        );
-        if (!res.ok) throw new Error("API call failed");
-        const data = await res.json();
-        setResult(data);
+        await api.stream("/pokemon/strategy?stream=true", query, setResult);
       } else if (cmd === "/team" && args.length >= 1) {
         const query = args.join(" ");
-        const res = await fetch(
-          `${process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000/api/v1"}/pokemon/team-building`,
-          {
-            method: "POST",
-            headers: { "Content-Type": "application/json" },
-            body: JSON.stringify(query),
-          }
-        );
-        if (!res.ok) throw new Error("API call failed");
-        const data = await res.json();
-        setResult(data);
+        await api.stream("/pokemon/team-building?stream=true", query, setResult);
       } else {
         setError("Invalid command or arguments.");
       }
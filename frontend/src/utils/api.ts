@@ -22,4 +22,47 @@ export const api = {
     }
     return response.json();
   },
-}; 
+
+  // POST to an endpoint that streams server-sent events, calling onChunk with the text received so far
+  async stream(endpoint: string, data: any, onChunk: (text: string) => void): Promise<string> {
+    const response = await fetch(`${API_BASE_URL}${endpoint}`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify(data),
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`API call failed: ${response.statusText}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let text = '';
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const rawEvent = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+
+        const lines = rawEvent.split('\n');
+        const event = lines.find((line) => line.startsWith('event: '))?.slice(7);
+        const payload = lines
+          .filter((line) => line.startsWith('data: '))
+          .map((line) => line.slice(6))
+          .join('\n');
+
+        if (event === 'done') return text;
+        if (event === 'error') throw new Error(payload);
+        text += payload;
+        onChunk(text);
+      }
+    }
+    return text;
+  },
+};